@@ -0,0 +1,216 @@
+"""
+Recall vs latency of the HNSW index compared with exact brute-force search.
+
+Vectors come from an existing KB store's chunk collection (the real corpus)
+or, with --synthetic N, from N clustered random unit vectors. Queries are
+corpus vectors with added noise, so every query has true near neighbours.
+For every M / construction_ef combination a scratch Chroma collection is
+built in a temporary directory (the source store is only read); each
+search_ef is then timed with single-vector queries, the shape of a
+mw_kb_search call. Recall@k is measured against exact cosine top-k.
+The same queries are then run against the NumPy vector backend
+(--vector-backend numpy) in each storage dtype (float32, float16, int8),
+reporting its open time and matrix size. For the reduced-precision
+dtypes the recall column is the recall lost to quantization.
+
+Run:
+    python3 benchmarks/bench_ann.py
+    python3 benchmarks/bench_ann.py --synthetic 50000 --m 16 32 --search-ef 10 50 100 200
+    python3 benchmarks/bench_ann.py --db-path /path/to/chroma_db --output ann.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+DIM = 384
+
+
+def load_corpus(db_path: str) -> np.ndarray:
+    from moveworks_mcp.kb.indexer import CHUNK_COLLECTION, ID_BATCH_SIZE
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(path=db_path, settings=Settings(anonymized_telemetry=False))
+    collection = client.get_collection(CHUNK_COLLECTION)
+    batches, offset = [], 0
+    while True:
+        batch = collection.get(include=["embeddings"], limit=ID_BATCH_SIZE, offset=offset)
+        if not batch["ids"]:
+            break
+        batches.append(np.asarray(batch["embeddings"], dtype=np.float32))
+        offset += len(batch["ids"])
+    if not batches:
+        sys.exit(f"No vectors in {db_path}; index some documentation or use --synthetic N.")
+    return np.concatenate(batches)
+
+
+def synthetic_corpus(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 50, 1), DIM))
+    vectors = centers[rng.integers(len(centers), size=n)] + rng.normal(scale=0.6, size=(n, DIM))
+    return vectors.astype(np.float32)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(len(ordered) * pct / 100)) - 1)]
+
+
+def set_search_ef(client, collection, ef: int, metadata: dict, vectors, ids):
+    """Change ef_search in place where supported, otherwise rebuild the scratch collection."""
+    if isinstance(getattr(collection, "configuration", None), dict):
+        collection.modify(configuration={"hnsw": {"ef_search": ef}})
+        return collection
+    client.delete_collection(collection.name)
+    collection = client.create_collection(collection.name, metadata={**metadata, "hnsw:search_ef": ef})
+    add_all(collection, vectors, ids)
+    return collection
+
+
+def add_all(collection, vectors: np.ndarray, ids: list[str]):
+    from moveworks_mcp.kb.indexer import ID_BATCH_SIZE
+
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        collection.add(
+            ids=ids[start:start + ID_BATCH_SIZE],
+            embeddings=vectors[start:start + ID_BATCH_SIZE],
+        )
+
+
+def main():
+    from moveworks_mcp.kb.indexer import DB_PATH, ID_BATCH_SIZE
+    from moveworks_mcp.kb.vector_store import VECTOR_DTYPES, NumpyVectorStore
+
+    parser = argparse.ArgumentParser(description="Vector index recall/latency benchmark")
+    parser.add_argument("--db-path", default=DB_PATH, help="KB store whose chunk vectors form the corpus")
+    parser.add_argument("--synthetic", type=int, help="Use N synthetic vectors instead of a store")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=40, help="Neighbours per query (mw_kb_search default depth)")
+    parser.add_argument("--m", type=int, nargs="+", default=[16, 32])
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[100])
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[10, 40, 100, 200])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    import chromadb
+    from chromadb.config import Settings
+
+    corpus = synthetic_corpus(args.synthetic, args.seed) if args.synthetic else load_corpus(args.db_path)
+    corpus = normalize(corpus).astype(np.float32)
+    rng = np.random.default_rng(args.seed)
+    picks = rng.integers(len(corpus), size=args.queries)
+    noise = rng.normal(scale=0.02, size=(args.queries, corpus.shape[1]))
+    queries = normalize(corpus[picks] + noise).astype(np.float32)
+    k = min(args.k, len(corpus))
+    ids = [str(i) for i in range(len(corpus))]
+
+    brute_ms, exact = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        sims = corpus @ query
+        top = np.argpartition(-sims, k - 1)[:k]
+        brute_ms.append((time.perf_counter() - t0) * 1000)
+        exact.append({str(i) for i in top})
+
+    results = {
+        "corpus": len(corpus),
+        "dim": int(corpus.shape[1]),
+        "queries": len(queries),
+        "k": k,
+        "brute_force_ms": {"p50": round(statistics.median(brute_ms), 3), "p95": round(percentile(brute_ms, 95), 3)},
+        "hnsw": [],
+    }
+    print(f"\n  corpus {len(corpus)} x {corpus.shape[1]}, {len(queries)} queries, recall@{k}")
+    print(f"  brute force (numpy)  p50 {results['brute_force_ms']['p50']:.3f} ms  "
+          f"p95 {results['brute_force_ms']['p95']:.3f} ms\n")
+    print(f"  {'M':>4s}{'c_ef':>6s}{'s_ef':>6s}{'build s':>9s}{'recall':>8s}{'p50 ms':>9s}{'p95 ms':>9s}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        client = chromadb.PersistentClient(path=scratch, settings=Settings(anonymized_telemetry=False))
+        for m in args.m:
+            for construction_ef in args.construction_ef:
+                metadata = {"hnsw:space": "cosine", "hnsw:M": m, "hnsw:construction_ef": construction_ef}
+                name = f"bench_m{m}_c{construction_ef}"
+                t0 = time.perf_counter()
+                collection = client.create_collection(name, metadata=metadata)
+                add_all(collection, corpus, ids)
+                build_s = time.perf_counter() - t0
+
+                for search_ef in args.search_ef:
+                    collection = set_search_ef(client, collection, search_ef, metadata, corpus, ids)
+                    latencies, recalls = [], []
+                    for query, truth in zip(queries, exact):
+                        t0 = time.perf_counter()
+                        found = collection.query(query_embeddings=[query], n_results=k, include=[])
+                        latencies.append((time.perf_counter() - t0) * 1000)
+                        recalls.append(len(truth & set(found["ids"][0])) / k)
+
+                    row = {
+                        "M": m,
+                        "construction_ef": construction_ef,
+                        "search_ef": search_ef,
+                        "build_s": round(build_s, 2),
+                        "recall": round(float(np.mean(recalls)), 4),
+                        "p50_ms": round(statistics.median(latencies), 3),
+                        "p95_ms": round(percentile(latencies, 95), 3),
+                    }
+                    results["hnsw"].append(row)
+                    print(f"  {m:4d}{construction_ef:6d}{search_ef:6d}{build_s:9.2f}"
+                          f"{row['recall']:8.4f}{row['p50_ms']:9.3f}{row['p95_ms']:9.3f}")
+                client.delete_collection(name)
+
+        print(f"\n  {'numpy':>10s}{'MB':>8s}{'open ms':>10s}{'build s':>9s}"
+              f"{'recall':>8s}{'p50 ms':>9s}{'p95 ms':>9s}")
+        results["numpy"] = []
+        for dtype in VECTOR_DTYPES:
+            t0 = time.perf_counter()
+            store = NumpyVectorStore(scratch, f"bench_{dtype}", dtype=dtype)
+            for start in range(0, len(ids), ID_BATCH_SIZE):
+                store.upsert(ids[start:start + ID_BATCH_SIZE], corpus[start:start + ID_BATCH_SIZE])
+            build_s = time.perf_counter() - t0
+            store.close()
+            t0 = time.perf_counter()
+            store = NumpyVectorStore(scratch, f"bench_{dtype}", dtype=dtype)
+            open_ms = (time.perf_counter() - t0) * 1000
+
+            latencies, recalls = [], []
+            for query, truth in zip(queries, exact):
+                t0 = time.perf_counter()
+                found = store.query(query_embeddings=[query], n_results=k)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                recalls.append(len(truth & set(found["ids"][0])) / k)
+            size_mb = store.stats()["matrix_bytes"] / 2**20
+            store.close()
+
+            row = {
+                "dtype": dtype,
+                "matrix_mb": round(size_mb, 2),
+                "open_ms": round(open_ms, 2),
+                "build_s": round(build_s, 2),
+                "recall": round(float(np.mean(recalls)), 4),
+                "p50_ms": round(statistics.median(latencies), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+            }
+            results["numpy"].append(row)
+            print(f"  {dtype:>10s}{size_mb:8.1f}{open_ms:10.2f}{build_s:9.2f}"
+                  f"{row['recall']:8.4f}{row['p50_ms']:9.3f}{row['p95_ms']:9.3f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
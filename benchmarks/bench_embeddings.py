@@ -0,0 +1,119 @@
+"""
+Compare embedding backends for the Moveworks KB on this host.
+
+For every backend the model is loaded in a fresh subprocess, so resident
+memory is not shared between runs. Reports load time, single-query encode
+latency (the mw_kb_search path), batch throughput (the indexing path),
+peak RSS, and cosine agreement with the torch backend's vectors.
+
+Run:
+    python3 benchmarks/bench_embeddings.py
+    python3 benchmarks/bench_embeddings.py --backends torch onnx-int8 --output emb.json
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+QUERIES = [
+    "compound actions",
+    "how do I trigger a plugin from a slack message",
+    "script actions python reference",
+    "switch expression in compound action",
+    "configure http connector authentication",
+    "what is an activity in agent studio",
+    "ingest knowledge articles from servicenow",
+    "debugging a conversational process",
+]
+PASSAGE = (
+    "Navigation: Agent Studio > Actions > Compound Actions\nTitle: Compound Actions\n\n"
+    "Compound actions let you chain multiple actions together, branch on the output "
+    "of earlier steps with switch statements, loop over lists and return a result. "
+) * 8
+
+
+def run_backend(backend: str, repeats: int) -> dict:
+    from moveworks_mcp.kb.embeddings import create_embedding_backend
+
+    start = time.perf_counter()
+    embedder = create_embedding_backend(backend=backend)
+    load_s = time.perf_counter() - start
+
+    embedder.encode_one("warm-up")
+    latencies = []
+    for _ in range(repeats):
+        for query in QUERIES:
+            t0 = time.perf_counter()
+            embedder.encode_one(query)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    batch = [PASSAGE] * 96
+    t0 = time.perf_counter()
+    embedder.encode(batch)
+    batch_s = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 3),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "batch_vectors_per_s": round(len(batch) / batch_s, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "query_vectors": embedder.encode(QUERIES).tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.repeats)))
+        return
+
+    import numpy as np
+
+    results = []
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--repeats", str(args.repeats)],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            print(f"  {backend:10s}  FAILED\n{proc.stderr.strip()[-600:]}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    vectors = {r["backend"]: np.array(r.pop("query_vectors")) for r in results}
+    if "torch" in vectors:
+        for result in results:
+            agreement = (vectors[result["backend"]] * vectors["torch"]).sum(axis=1)
+            result["cosine_vs_torch_min"] = round(float(agreement.min()), 4)
+
+    header = ("backend", "load s", "p50 ms", "p95 ms", "vec/s", "RSS MB", "cos")
+    print(f"\n{header[0]:10s}" + "".join(f"{h:>9s}" for h in header[1:]))
+    for r in results:
+        row = (
+            r["load_s"], r["query_p50_ms"], r["query_p95_ms"], r["batch_vectors_per_s"],
+            r["peak_rss_mb"], r.get("cosine_vs_torch_min", float("nan")),
+        )
+        print(f"{r['backend']:10s}" + "".join(f"{v:9.2f}" for v in row))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
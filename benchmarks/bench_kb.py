@@ -0,0 +1,455 @@
+"""
+Offline end-to-end benchmark of the KB pipeline: crawl, parse, embed, index
+and search.
+
+A seeded generator builds a synthetic documentation site and serves it from
+a local HTTP server:
+- sections of pages with breadcrumbs, cross links and a sitemap;
+- print-view aliases carrying <link rel="canonical">.
+
+DocCrawler crawls it through the sitemap and KBIndexer indexes the result
+into a temporary store. KBSearch then runs a fixed query set whose relevant
+pages are known from the generator. Nothing touches the network or the
+bundled store, so two runs with the same seed see the same site and the
+same queries.
+
+Stage times come from the KB's debug timings (kb/tracing.py). Reported:
+  crawl    pages/s through DocCrawler.crawl_domain
+  parse    ms/page for DocCrawler._parse_page, timed alone over the fetched HTML
+  embed    vectors/s in KBIndexer's embed stage
+  index    pages/s overall, and pages/s in the store-write stage
+  search   p50/p95/p99 ms per mw_kb_search-shaped call, recall@1/5/10 and MRR
+  memory   peak RSS after each phase (and the Python heap peak with --tracemalloc)
+
+--embedder hashing (the default) uses a deterministic feature-hashing
+embedder, so runs need no model download and are comparable across
+machines. Relevance then mostly measures the lexical side and the fusion.
+--embedder model loads the configured sentence-transformers model for real
+numbers. --baseline compares against an earlier --output file and exits
+non-zero when a metric regressed by more than --tolerance.
+
+Run:
+    python3 benchmarks/bench_kb.py
+    python3 benchmarks/bench_kb.py --pages 1000 --output kb.json
+    python3 benchmarks/bench_kb.py --baseline kb.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.embeddings import EmbeddingBackend
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DIM = 384
+FILLER = (
+    "the a to of and in for with your you can this that is are on by from when each "
+    "configure set up enable open select choose save settings option page users admin "
+    "workflow request field value default example step create update review access"
+).split()
+SYLLABLES = "ba ko ri tel mun sar vi do pex lu qua zen mor fi tas gal ne rub cor ly".split()
+
+# Metrics compared by --baseline, with whether higher is better
+TRACKED = {
+    "crawl.pages_per_s": True,
+    "parse.ms_per_page_p50": False,
+    "embed.vectors_per_s": True,
+    "index.pages_per_s": True,
+    "index.write_pages_per_s": True,
+    "search.latency_ms.p50": False,
+    "search.latency_ms.p95": False,
+    "search.latency_ms.p99": False,
+    "search.recall.at_1": True,
+    "search.recall.at_5": True,
+    "search.recall.at_10": True,
+    "search.mrr": True,
+    "memory.peak_rss_mb": False,
+}
+
+
+class HashingEmbedder(EmbeddingBackend):
+    """Deterministic bag-of-words embedder: signed feature hashing of words and word pairs."""
+
+    name = "hashing"
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r"[a-z0-9]+", text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                digest = hashlib.blake2b(feature.encode(), digest_size=4).digest()
+                value = int.from_bytes(digest, "little")
+                matrix[row, value % DIM] += 1.0 if value & (1 << 31) else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+
+# ── synthetic site ───────────────────────────────────────────────────────────
+
+
+def make_site(n_pages: int, n_sections: int, seed: int) -> tuple[dict[str, str], list[dict]]:
+    """
+    Return ({path: html}, queries). Each page has a unique subject term and
+    shares a feature term with two other pages of its section; queries name
+    a subject (one relevant page) or a feature and section (all pages with it).
+    """
+    rng = random.Random(seed)
+    used: set[str] = set()
+
+    def term() -> str:
+        while True:
+            word = "".join(rng.choice(SYLLABLES) for _ in range(3))
+            if word not in used:
+                used.add(word)
+                return word
+
+    sections = [term() for _ in range(n_sections)]
+    pages = []
+    for i in range(n_pages):
+        section = sections[i % n_sections]
+        pages.append({
+            "path": f"/docs/{section}/p{i}",
+            "section": section,
+            "feature": None,
+            "subject": term(),
+        })
+    by_section: dict[str, list[dict]] = {}
+    for page in pages:
+        by_section.setdefault(page["section"], []).append(page)
+    for members in by_section.values():
+        for start in range(0, len(members), 3):
+            feature = term()
+            for page in members[start:start + 3]:
+                page["feature"] = feature
+
+    site: dict[str, str] = {}
+    for i, page in enumerate(pages):
+        siblings = by_section[page["section"]]
+        position = siblings.index(page)
+        links = [p["path"] for p in siblings[position + 1:position + 4]]
+        if i % 10 == 0:
+            links.append(page["path"] + "?view=print")
+        paragraphs = []
+        for _ in range(rng.randint(4, 8)):
+            words = [rng.choice(FILLER) for _ in range(rng.randint(40, 90))]
+            for term_ in (page["subject"], page["feature"], page["section"]):
+                words.insert(rng.randrange(len(words)), term_)
+            paragraphs.append("<p>" + " ".join(words) + ".</p>")
+        title = f"{page['subject'].title()} {page['feature']}"
+        body = (
+            f'<nav aria-label="breadcrumb"><a href="/docs">Docs</a> &gt; '
+            f'<a href="/docs/{page["section"]}">{page["section"].title()}</a> &gt; {title}</nav>'
+            f"<main><h1>{title}</h1>{''.join(paragraphs)}"
+            + "".join(f'<a href="{link}">{link}</a>' for link in links)
+            + "</main>"
+        )
+        site[page["path"]] = (
+            f"<html><head><title>{title}</title>"
+            f'<link rel="canonical" href="{page["path"]}"></head><body>{body}</body></html>'
+        )
+        if i % 10 == 0:
+            site[page["path"] + "?view=print"] = site[page["path"]]
+
+    # Breadcrumb targets: a docs landing page and one index page per section
+    for section, members in by_section.items():
+        site[f"/docs/{section}"] = (
+            f"<html><head><title>{section.title()}</title></head><body><main><h1>{section.title()}</h1>"
+            + "".join(f'<a href="{p["path"]}">{p["subject"].title()}</a>' for p in members)
+            + "</main></body></html>"
+        )
+    site["/docs"] = (
+        "<html><head><title>Docs</title></head><body><main><h1>Docs</h1>"
+        + "".join(f'<a href="/docs/{section}">{section.title()}</a>' for section in sections)
+        + "</main></body></html>"
+    )
+
+    queries = []
+    for page in rng.sample(pages, min(len(pages), 60)):
+        queries.append({"query": f"how do I set up {page['subject']}", "relevant": [page["path"]]})
+        queries.append({"query": f"{page['subject']} {page['feature']} settings", "relevant": [page["path"]]})
+    for section, members in list(by_section.items())[:10]:
+        feature = members[0]["feature"]
+        relevant = [p["path"] for p in members if p["feature"] == feature]
+        queries.append({"query": f"{feature} in {section}", "relevant": relevant})
+    return site, queries
+
+
+def serve(site: dict[str, str]) -> tuple[ThreadingHTTPServer, str]:
+    sitemap = (
+        '<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join(f"<url><loc>{{base}}{path}</loc></url>" for path in site if "?" not in path)
+        + "</urlset>"
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path == "/sitemap.xml":
+                body, kind = sitemap.replace("{base}", base).encode(), "application/xml"
+            elif self.path in site:
+                body, kind = site[self.path].encode(), "text/html; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base
+
+
+# ── measurement helpers ──────────────────────────────────────────────────────
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(len(ordered) * pct / 100)) - 1)]
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def stage_seconds(timings, stage: str) -> float:
+    return timings.as_dict()["stages"].get(stage, {}).get("ms", 0.0) / 1000
+
+
+def lookup(results: dict, path: str):
+    value = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    print(f"\n{'metric':28s}{'baseline':>12s}{'now':>12s}{'change':>9s}")
+    for path, higher_is_better in TRACKED.items():
+        old, new = lookup(baseline, path), lookup(results, path)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old == 0:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSED" if worse > tolerance else ""
+        print(f"{path:28s}{old:12.2f}{new:12.2f}{change * 100:8.1f}%{flag}")
+        if flag:
+            regressions.append(path)
+    return regressions
+
+
+# ── phases ───────────────────────────────────────────────────────────────────
+
+
+def run(args) -> dict:
+    from moveworks_mcp.kb.crawler import CrawlerClient, DocCrawler
+    from moveworks_mcp.kb.embeddings import create_embedding_backend
+    from moveworks_mcp.kb.indexer import KBIndexer
+    from moveworks_mcp.kb.search import KBSearch
+    from moveworks_mcp.kb.tracing import collect_timings
+
+    site, queries = make_site(args.pages, args.sections, args.seed)
+    server, base = serve(site)
+    results: dict = {
+        "config": {
+            "pages": args.pages,
+            "sections": args.sections,
+            "seed": args.seed,
+            "embedder": args.embedder,
+            "vector_backend": args.vector_backend,
+            "queries": len(queries),
+            "repeats": args.repeats,
+        },
+        "memory": {},
+    }
+
+    def end_phase(name: str):
+        entry = {"peak_rss_mb": peak_rss_mb()}
+        if args.tracemalloc:
+            entry["python_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            tracemalloc.reset_peak()
+        results["memory"][name] = entry
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    # crawl
+    async def crawl():
+        client = CrawlerClient(limit_per_host=args.concurrency)
+        try:
+            crawler = DocCrawler(base_url=f"{base}/docs", max_pages=args.pages * 2, client=client)
+            return await crawler.crawl_domain(sitemap_url=f"{base}/sitemap.xml")
+        finally:
+            await client.close()
+
+    with collect_timings() as timings:
+        t0 = time.perf_counter()
+        pages = asyncio.run(crawl())
+        elapsed = time.perf_counter() - t0
+    fetches = timings.as_dict()["stages"].get("kb.crawl.fetch", {}).get("calls", 0)
+    results["crawl"] = {
+        "pages": len(pages),
+        "fetches": fetches,
+        "seconds": round(elapsed, 3),
+        "pages_per_s": round(len(pages) / elapsed, 1),
+    }
+    end_phase("crawl")
+    server.shutdown()
+
+    # parse, timed alone so event-loop scheduling does not blur it
+    parser = DocCrawler(base_url=f"{base}/docs")
+    parse_ms = []
+    for path, html in site.items():
+        t0 = time.perf_counter()
+        parser._parse_page(base + path, html)
+        parse_ms.append((time.perf_counter() - t0) * 1000)
+    results["parse"] = {
+        "ms_per_page_p50": round(statistics.median(parse_ms), 3),
+        "ms_per_page_p95": round(percentile(parse_ms, 95), 3),
+    }
+    end_phase("parse")
+
+    # index
+    if args.embedder == "hashing":
+        embedder = HashingEmbedder()
+    else:
+        embedder = create_embedding_backend(backend=args.backend)
+        embedder.encode_one("warm-up")
+    db_path = tempfile.mkdtemp(prefix="bench_kb_")
+    indexer = KBIndexer(embedder=embedder, db_path=db_path, vector_backend=args.vector_backend)
+    with collect_timings() as timings:
+        t0 = time.perf_counter()
+        indexed = indexer.index_pages(pages)
+        elapsed = time.perf_counter() - t0
+    vectors = indexer.chunks.count()
+    embed_s, write_s = stage_seconds(timings, "kb.index.embed"), stage_seconds(timings, "kb.index.write")
+    results["embed"] = {
+        "vectors": vectors,
+        "seconds": round(embed_s, 3),
+        "vectors_per_s": round(vectors / embed_s, 1) if embed_s else None,
+    }
+    results["index"] = {
+        "indexed": len(indexed["indexed"]),
+        "duplicates": len(indexed["duplicates"]),
+        "seconds": round(elapsed, 3),
+        "pages_per_s": round(len(indexed["indexed"]) / elapsed, 1),
+        "write_pages_per_s": round(len(indexed["indexed"]) / write_s, 1) if write_s else None,
+        "dedup_ms": round(stage_seconds(timings, "kb.index.dedup") * 1000, 2),
+    }
+    end_phase("index")
+
+    # search
+    searcher = KBSearch(indexer=indexer)
+    searcher.search("warm-up", top_k=10)
+    latencies = []
+    recall = {1: [], 5: [], 10: []}
+    reciprocal_ranks = []
+    with collect_timings() as timings:
+        for repeat in range(args.repeats):
+            for item in queries:
+                t0 = time.perf_counter()
+                hits = searcher.search(item["query"], top_k=10)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if repeat:
+                    continue
+                ranked = [hit["url"].removeprefix(base) for hit in hits]
+                relevant = set(item["relevant"])
+                for k in recall:
+                    recall[k].append(len(relevant & set(ranked[:k])) / min(len(relevant), k))
+                first = next((rank for rank, url in enumerate(ranked, 1) if url in relevant), None)
+                reciprocal_ranks.append(1 / first if first else 0.0)
+    stages = timings.as_dict()["stages"]
+    results["search"] = {
+        "searches": len(latencies),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+        "recall": {f"at_{k}": round(statistics.mean(values), 4) for k, values in recall.items()},
+        "mrr": round(statistics.mean(reciprocal_ranks), 4),
+        "stage_ms_mean": {
+            stage: round(entry["ms"] / len(latencies), 3) for stage, entry in stages.items()
+        },
+    }
+    end_phase("search")
+    results["memory"]["peak_rss_mb"] = peak_rss_mb()
+    indexer.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl/index/search benchmark")
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the synthetic site")
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=5, help="Passes over the query set")
+    parser.add_argument("--concurrency", type=int, default=8, help="Crawler connections per host")
+    parser.add_argument("--embedder", choices=["hashing", "model"], default="hashing")
+    parser.add_argument("--backend", default="torch", help="Embedding runtime with --embedder model")
+    parser.add_argument("--vector-backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report Python heap peaks (slower)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args)
+
+    crawl, index, search = results["crawl"], results["index"], results["search"]
+    print(f"\ncrawl   {crawl['pages']} pages in {crawl['seconds']}s ({crawl['pages_per_s']} pages/s)")
+    print(f"parse   p50 {results['parse']['ms_per_page_p50']} ms/page, p95 {results['parse']['ms_per_page_p95']}")
+    print(f"embed   {results['embed']['vectors']} vectors, {results['embed']['vectors_per_s']} vectors/s")
+    print(f"index   {index['indexed']} pages, {index['pages_per_s']} pages/s "
+          f"(writes {index['write_pages_per_s']} pages/s), {index['duplicates']} duplicates")
+    latency = search["latency_ms"]
+    print(f"search  p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+    print(f"        recall@1 {search['recall']['at_1']}, @5 {search['recall']['at_5']}, "
+          f"@10 {search['recall']['at_10']}, MRR {search['mrr']}")
+    print(f"memory  peak RSS {results['memory']['peak_rss_mb']} MB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            sys.exit(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Measure the latency cost of cross-encoder re-ranking in mw_kb_search.
+
+Runs every query against an existing KB store three ways:
+
+  fused        hybrid retrieval + fusion only
+  rerank-cold  plus re-ranking with an empty score cache (first time a query is seen)
+  rerank-warm  plus re-ranking with the query's scores already cached
+
+and reports p50/p95 search latency, the p95 added by re-ranking, and how
+often re-ranking changed the top result. Models are loaded and warmed up
+before timing starts.
+
+Run:
+    python3 benchmarks/bench_rerank.py
+    python3 benchmarks/bench_rerank.py --candidates 30 --budget-ms 80 --output rerank.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+QUERIES = [
+    "compound actions",
+    "how do I trigger a plugin from a slack message",
+    "script actions python reference",
+    "switch expression in compound action",
+    "configure http connector authentication",
+    "what is an activity in agent studio",
+    "ingest knowledge articles from servicenow",
+    "debugging a conversational process",
+    "return a list of records from an http action",
+    "slot resolver strategies",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(len(ordered) * pct / 100)) - 1)]
+
+
+def main():
+    from moveworks_mcp.kb.indexer import DB_PATH, KBIndexer
+    from moveworks_mcp.kb.rerank import RERANK_MODEL, create_reranker
+    from moveworks_mcp.kb.search import KBSearch
+
+    parser = argparse.ArgumentParser(description="Re-ranking latency benchmark")
+    parser.add_argument("--db-path", default=DB_PATH, help="KB store to search")
+    parser.add_argument("--model", default=RERANK_MODEL, help="CrossEncoder model")
+    parser.add_argument("--candidates", type=int, default=20, help="Fused candidates re-ranked")
+    parser.add_argument("--budget-ms", type=float, default=60.0, help="Re-ranking budget per search")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    indexer = KBIndexer(db_path=args.db_path)
+    if indexer.pages.count() == 0:
+        sys.exit(f"No pages indexed in {args.db_path}; index some documentation first.")
+    searcher = KBSearch(
+        indexer=indexer,
+        reranker_factory=lambda: create_reranker(model_name=args.model),
+        rerank_candidates=args.candidates,
+        rerank_budget_ms=args.budget_ms,
+    )
+    indexer.embedder.encode_one("warm-up")
+    searcher.reranker.score([("warm-up", "warm-up")])
+
+    timings: dict[str, list[float]] = {"fused": [], "rerank-cold": [], "rerank-warm": []}
+    top1_changed = 0
+    for _ in range(args.repeats):
+        for query in QUERIES:
+            t0 = time.perf_counter()
+            fused = searcher.search(query, top_k=args.top_k, rerank=False)
+            timings["fused"].append((time.perf_counter() - t0) * 1000)
+
+            searcher.reranker.clear_cache()
+            t0 = time.perf_counter()
+            reranked = searcher.search(query, top_k=args.top_k, rerank=True)
+            timings["rerank-cold"].append((time.perf_counter() - t0) * 1000)
+
+            t0 = time.perf_counter()
+            searcher.search(query, top_k=args.top_k, rerank=True)
+            timings["rerank-warm"].append((time.perf_counter() - t0) * 1000)
+
+            if fused and reranked and fused[0]["url"] != reranked[0]["url"]:
+                top1_changed += 1
+
+    summary = {
+        "db_path": args.db_path,
+        "model": args.model,
+        "candidates": args.candidates,
+        "budget_ms": args.budget_ms,
+        "searches": len(timings["fused"]),
+        "top1_changed_pct": round(100 * top1_changed / len(timings["fused"]), 1),
+        "latency_ms": {},
+    }
+    print(f"\n{'mode':12s}{'p50 ms':>9s}{'p95 ms':>9s}")
+    for mode, values in timings.items():
+        p50, p95 = statistics.median(values), percentile(values, 95)
+        summary["latency_ms"][mode] = {"p50": round(p50, 2), "p95": round(p95, 2)}
+        print(f"{mode:12s}{p50:9.2f}{p95:9.2f}")
+
+    added = summary["latency_ms"]["rerank-cold"]["p95"] - summary["latency_ms"]["fused"]["p95"]
+    summary["added_p95_ms"] = round(added, 2)
+    print(f"\n  re-ranking adds {added:.1f} ms at p95 (cold cache); "
+          f"top result changed in {summary['top1_changed_pct']}% of searches")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
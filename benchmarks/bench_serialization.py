@@ -0,0 +1,152 @@
+"""
+Cost of serializing representative tool results in each output format.
+
+Payloads mirror real tool output: a ServiceNow list_records page (records
+with reference fields), an mw_kb_search response (full page content per
+result) and a tool that returns an already-serialized JSON string. Each is
+encoded with:
+
+  legacy          the previous behaviour: json.dumps(indent=2), JSON strings re-parsed
+  pretty          output_format=pretty
+  compact-stdlib  output_format=compact with orjson unavailable
+  compact         output_format=compact (orjson when installed)
+
+and the mean time per call and output size are reported.
+
+Run:
+    python3 benchmarks/bench_serialization.py
+    python3 benchmarks/bench_serialization.py --records 500 --repeats 200 --output ser.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_common import serialization
+
+
+def legacy_serialize(result):
+    if isinstance(result, str):
+        try:
+            return json.dumps(json.loads(result), indent=2)
+        except json.JSONDecodeError:
+            return result
+    return json.dumps(result, indent=2)
+
+
+def list_records_payload(n: int) -> dict:
+    records = []
+    for i in range(n):
+        records.append({
+            "sys_id": f"{i:032x}",
+            "number": f"INC{i:07d}",
+            "short_description": f"Email not syncing on mobile device for user {i}",
+            "description": "User reports that email stopped syncing after the latest update. " * 3,
+            "state": "2",
+            "priority": "3",
+            "impact": "2",
+            "urgency": "2",
+            "category": "software",
+            "subcategory": "email",
+            "opened_at": "2024-05-01 09:12:44",
+            "sys_updated_on": "2024-05-02 16:40:02",
+            "assigned_to": {"link": f"https://example.service-now.com/api/now/table/sys_user/{i:032x}", "value": f"{i:032x}"},
+            "assignment_group": {"link": "https://example.service-now.com/api/now/table/sys_user_group/abc", "value": "abc"},
+            "caller_id": {"link": f"https://example.service-now.com/api/now/table/sys_user/{i + 1:032x}", "value": f"{i + 1:032x}"},
+            "active": "true",
+            "work_notes": "",
+            "close_code": "",
+        })
+    return {"success": True, "message": f"Found {n} records", "records": records}
+
+
+def kb_search_payload(results: int) -> dict:
+    content = (
+        "Navigation: Agent Studio > Actions > Compound Actions\nTitle: Compound Actions\n\n"
+        + "Compound actions chain actions together, branch with switch statements and loop over lists. "
+        * 60
+    )
+    return {
+        "query": "compound actions",
+        "total_results": results,
+        "results": [
+            {
+                "rank": i + 1,
+                "title": f"Compound Actions {i}",
+                "navigation_path": "Agent Studio > Actions > Compound Actions",
+                "url": f"https://help.moveworks.com/docs/compound-actions-{i}",
+                "relevance_score": round(0.05 - i * 0.001, 4),
+                "content": content,
+            }
+            for i in range(results)
+        ],
+    }
+
+
+def timed(fn, payload, repeats: int) -> tuple[float, int]:
+    out = fn(payload)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(payload)
+        times.append((time.perf_counter() - t0) * 1e6)
+    return statistics.mean(times), len(out.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool output serialization benchmark")
+    parser.add_argument("--records", type=int, default=200, help="Records in the list_records payload")
+    parser.add_argument("--results", type=int, default=10, help="Results in the mw_kb_search payload")
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    payloads = {
+        "list_records": list_records_payload(args.records),
+        "mw_kb_search": kb_search_payload(args.results),
+    }
+    payloads["json_string"] = json.dumps(payloads["list_records"])
+
+    fast = serialization.orjson
+
+    def with_stdlib(fn):
+        def run(payload):
+            serialization.orjson = None
+            try:
+                return fn(payload)
+            finally:
+                serialization.orjson = fast
+        return run
+
+    modes = {
+        "legacy": legacy_serialize,
+        "pretty": lambda p: serialization.serialize_tool_output(p, "bench", "pretty"),
+        "compact-stdlib": with_stdlib(lambda p: serialization.serialize_tool_output(p, "bench", "compact")),
+        "compact": lambda p: serialization.serialize_tool_output(p, "bench", "compact"),
+    }
+
+    print(f"\n  orjson {'available' if fast is not None else 'not installed'}")
+    print(f"\n  {'payload':14s}{'mode':16s}{'us/call':>10s}{'bytes':>10s}{'speedup':>9s}")
+    results = {"orjson": fast is not None, "payloads": {}}
+    for payload_name, payload in payloads.items():
+        rows = {}
+        for mode, fn in modes.items():
+            mean_us, size = timed(fn, payload, args.repeats)
+            rows[mode] = {"us": round(mean_us, 1), "bytes": size}
+        base = rows["legacy"]["us"]
+        for mode, row in rows.items():
+            row["speedup"] = round(base / row["us"], 1) if row["us"] else None
+            print(f"  {payload_name:14s}{mode:16s}{row['us']:10.1f}{row['bytes']:10d}{row['speedup']:8.1f}x")
+        results["payloads"][payload_name] = rows
+        print()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
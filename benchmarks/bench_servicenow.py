@@ -0,0 +1,304 @@
+"""
+Load test for the ServiceNow MCP tools against the local REST simulator.
+
+Starts benchmarks/servicenow_sim.py in a subprocess, so the client and the
+"instance" do not share a GIL. It then drives ServiceNowMCP._call_tool_impl
+(argument validation, REST calls, retries and response rendering) from
+--workers concurrent callers. Each worker makes --calls calls drawn from a
+weighted tool mix with arguments taken from the simulator's dataset; with a
+fixed --seed every run issues the same calls.
+
+--mode loop (the default) runs every worker as a task on one event loop,
+as the SSE server runs its sessions, so the report reflects how the
+server's shared loop copes with concurrent calls. --mode threads gives each
+worker its own thread and event loop; the loop is then never contended,
+and the run measures the tool and HTTP layer alone.
+
+The report covers:
+- calls/s and latency p50/p95/p99 overall and per tool;
+- tool errors: raised, or a result with success false;
+- REST attempts by status and the retries the shared HTTP client made;
+- the simulator's own counts of injected errors and rate-limited requests.
+
+--latency-ms, --jitter-ms, --error-rate and --rate-limit are passed to the
+simulator. --instance-url targets a simulator that is already running; it
+must use the same --seed and --records.
+
+Run:
+    python3 benchmarks/bench_servicenow.py
+    python3 benchmarks/bench_servicenow.py --workers 8 --latency-ms 40 --jitter-ms 20 --output sn.json
+    python3 benchmarks/bench_servicenow.py --auth oauth --error-rate 0.05 --rate-limit 200
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from servicenow_sim import OAUTH_CLIENTS, USERS, build_dataset
+
+DEFAULT_MIX = (
+    "list_records=4,get_record=3,list_articles=2,get_article=3,list_categories=1,"
+    "list_knowledge_bases=1,list_tables=1,get_table=1,update_article=1"
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(round(len(ordered) * pct / 100)) - 1)]
+
+
+def start_simulator(args) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    command = [
+        sys.executable, str(Path(__file__).parent / "servicenow_sim.py"),
+        "--port", str(port),
+        "--seed", str(args.seed),
+        "--records", str(args.records),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit", str(args.rate_limit),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            requests.get(f"{url}/sim/stats", timeout=1).raise_for_status()
+            return process, url
+        except requests.RequestException:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("simulator did not start")
+            time.sleep(0.1)
+
+
+def make_calls(args, count: int, rng: random.Random) -> list[tuple[str, dict]]:
+    """A reproducible list of (tool, arguments) drawn from the mix."""
+    tables = build_dataset(args.seed, args.records)
+    articles = list(tables["kb_knowledge"])
+    incidents = list(tables["incident"])
+    bases = list(tables["kb_knowledge_base"])
+    table_names = [row["name"] for row in tables["sys_db_object"].values()]
+    words = ["password", "vpn", "laptop", "access", "policy", "wifi"]
+
+    arguments = {
+        "list_records": lambda: {
+            "table_name": "incident",
+            "limit": rng.choice([10, 25, 50]),
+            "offset": rng.randrange(0, 100, 10),
+            "query": rng.choice(["", "active=true^priority<=2", f"short_descriptionLIKE{rng.choice(words)}"]) or None,
+        },
+        "get_record": lambda: {"table_name": "incident", "sys_id": rng.choice(incidents)},
+        "list_articles": lambda: {
+            "limit": rng.choice([10, 20]),
+            "knowledge_base": rng.choice([None, rng.choice(bases)]),
+            "query": rng.choice([None, rng.choice(words)]),
+        },
+        "get_article": lambda: {"article_id": rng.choice(articles)},
+        "list_categories": lambda: {"knowledge_base": rng.choice(bases), "limit": 20},
+        "list_knowledge_bases": lambda: {"limit": 10},
+        "list_tables": lambda: {"limit": 20, "query": rng.choice([None, "sim"]), "include_system": True},
+        "get_table": lambda: {"table_name": rng.choice(table_names)},
+        "update_article": lambda: {"article_id": rng.choice(articles), "keywords": " ".join(rng.sample(words, 2))},
+    }
+    mix = {}
+    for entry in args.mix.split(","):
+        name, _, weight = entry.partition("=")
+        if name.strip() not in arguments:
+            raise SystemExit(f"Unknown tool in --mix: {name} (choose from {', '.join(arguments)})")
+        mix[name.strip()] = float(weight or 1)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    return [(name, {k: v for k, v in arguments[name]().items() if v is not None}) for name in names]
+
+
+def build_server(args, url: str):
+    os.environ.setdefault("MCP_TOOL_PACKAGE", "full")
+    from servicenow_mcp.server import ServiceNowMCP
+
+    user, password = next(iter(USERS.items()))
+    if args.auth == "oauth":
+        client_id, client_secret = next(iter(OAUTH_CLIENTS.items()))
+        auth = {"type": "oauth", "oauth": {
+            "client_id": client_id, "client_secret": client_secret,
+            "username": user, "password": password, "token_url": f"{url}/oauth_token.do",
+        }}
+    else:
+        auth = {"type": "basic", "basic": {"username": user, "password": password}}
+    return ServiceNowMCP({
+        "instance_url": url,
+        "auth": auth,
+        "timeout": 30,
+        "http_retries": args.http_retries,
+        "http_retry_backoff": args.http_retry_backoff,
+        "http_pool_size": max(args.http_pool_size, args.workers),
+    })
+
+
+async def drive(server, calls: list[tuple[str, dict]]) -> list[tuple[str, float, bool]]:
+    """Make the calls one after another, returning (tool, latency ms, ok) for each."""
+    samples = []
+    for name, arguments in calls:
+        start = time.perf_counter()
+        try:
+            content = await server._call_tool_impl(name, dict(arguments))
+            ok = json.loads(content[0].text).get("success", True) is not False
+        except Exception:
+            ok = False
+        samples.append((name, (time.perf_counter() - start) * 1000, ok))
+    return samples
+
+
+def run_on_one_loop(server, plans: list) -> list:
+    async def run():
+        results = await asyncio.gather(*(drive(server, plan) for plan in plans))
+        return [sample for result in results for sample in result]
+
+    return asyncio.run(run())
+
+
+def run_in_threads(server, plans: list) -> list:
+    samples = []
+    lock = threading.Lock()
+
+    def worker(plan):
+        local = asyncio.run(drive(server, plan))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(latencies: list[float], errors: int) -> dict:
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ServiceNow tool load test against a local simulator")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent callers")
+    parser.add_argument(
+        "--mode",
+        choices=["loop", "threads"],
+        default="loop",
+        help="Workers as tasks on one shared event loop, or one loop per thread",
+    )
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per worker")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="tool=weight,... (default: %(default)s)")
+    parser.add_argument("--auth", choices=["basic", "oauth"], default="basic")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated instance latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Simulator requests/s; 0 = unlimited")
+    parser.add_argument("--http-retries", type=int, default=0, help="REST read retries (server default: 0)")
+    parser.add_argument("--http-retry-backoff", type=float, default=0.05)
+    parser.add_argument("--http-pool-size", type=int, default=10)
+    parser.add_argument("--instance-url", help="Use a running simulator instead of starting one")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    process = None
+    if args.instance_url:
+        url = args.instance_url.rstrip("/")
+    else:
+        process, url = start_simulator(args)
+    try:
+        # Failed calls are counted in the report rather than logged one by one
+        logging.disable(logging.ERROR)
+        server = build_server(args, url)
+        from servicenow_mcp.utils.http_client import HTTP_REQUESTS, HTTP_RETRIES
+
+        rng = random.Random(args.seed)
+        for name, arguments in make_calls(args, args.warmup, rng):
+            asyncio.run(server._call_tool_impl(name, arguments))
+        baseline_attempts = {labels: value for labels, value in HTTP_REQUESTS.items()}
+        baseline_retries = sum(value for _, value in HTTP_RETRIES.items())
+        if process is not None:
+            sim_before = requests.get(f"{url}/sim/stats", timeout=5).json()
+
+        plans = [make_calls(args, args.calls, random.Random(args.seed * 1000 + i)) for i in range(args.workers)]
+        start = time.perf_counter()
+        if args.mode == "loop":
+            samples = run_on_one_loop(server, plans)
+        else:
+            samples = run_in_threads(server, plans)
+        elapsed = time.perf_counter() - start
+
+        statuses: dict[str, int] = {}
+        for labels, value in HTTP_REQUESTS.items():
+            delta = value - baseline_attempts.get(labels, 0)
+            if delta:
+                status = dict(zip(HTTP_REQUESTS.labelnames, labels))["status"]
+                statuses[status] = statuses.get(status, 0) + int(delta)
+        sim_stats = None
+        if process is not None:
+            sim_after = requests.get(f"{url}/sim/stats", timeout=5).json()
+            sim_stats = {
+                key: sim_after[key] - sim_before[key] for key in ("requests", "injected_errors", "rate_limited")
+            }
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    per_tool = {}
+    for name in sorted({s[0] for s in samples}):
+        rows = [s for s in samples if s[0] == name]
+        per_tool[name] = summarize([s[1] for s in rows], sum(1 for s in rows if not s[2]))
+    results = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "seconds": round(elapsed, 3),
+        "calls_per_s": round(len(samples) / elapsed, 1),
+        "overall": summarize([s[1] for s in samples], sum(1 for s in samples if not s[2])),
+        "tools": per_tool,
+        "http": {
+            "attempts_by_status": statuses,
+            "retries": int(sum(value for _, value in HTTP_RETRIES.items()) - baseline_retries),
+        },
+        "simulator": sim_stats,
+    }
+
+    overall = results["overall"]
+    print(f"\n{len(samples)} calls in {results['seconds']}s from {args.workers} workers ({args.mode}): "
+          f"{results['calls_per_s']} calls/s, {overall['errors']} errors")
+    print(f"\n{'tool':24s}{'calls':>7s}{'errors':>8s}{'p50 ms':>9s}{'p95 ms':>9s}{'p99 ms':>9s}")
+    for name, row in [*per_tool.items(), ("overall", overall)]:
+        print(f"{name:24s}{row['calls']:7d}{row['errors']:8d}{row['p50_ms']:9.1f}{row['p95_ms']:9.1f}{row['p99_ms']:9.1f}")
+    print(f"\nREST attempts by status: {statuses}; retries: {results['http']['retries']}")
+    if sim_stats:
+        print(f"simulator: {sim_stats}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
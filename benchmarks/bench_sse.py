@@ -0,0 +1,207 @@
+"""
+Load test for the Moveworks MCP SSE server.
+
+Opens --sessions concurrent MCP client sessions over SSE and holds them for
+--duration seconds. Each session repeatedly lists tools and makes a tool
+call, pausing --think-time seconds between requests. Sessions are spread
+round-robin across the worker ports. The report covers sessions opened,
+rejected (503) and failed, request throughput, latency percentiles, and
+each worker's /health counters.
+
+By default a server is started on a free port with a throwaway store
+(--workers, --max-sessions and --idle-timeout are passed through); --url
+targets a running server instead and may be repeated, once per worker.
+
+Run:
+    python3 benchmarks/bench_sse.py
+    python3 benchmarks/bench_sse.py --sessions 200 --workers 2 --duration 30 --output sse.json
+    python3 benchmarks/bench_sse.py --url http://localhost:8001 --sessions 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+SRC = str(Path(__file__).parent.parent / "src")
+
+
+def free_port_block(count: int) -> int:
+    """First of `count` consecutive ports that are free right now."""
+    for _ in range(50):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            base = probe.getsockname()[1]
+        if base + count > 65535:
+            continue
+        try:
+            for port in range(base, base + count):
+                with socket.socket() as s:
+                    s.bind(("127.0.0.1", port))
+            return base
+        except OSError:
+            continue
+    raise RuntimeError("no free port block found")
+
+
+def start_server(args, db_path: str) -> tuple[subprocess.Popen, list[str]]:
+    port = free_port_block(args.workers)
+    command = [
+        sys.executable, "-m", "moveworks_mcp.server_sse",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers),
+        "--max-sessions", str(args.max_sessions),
+        "--idle-timeout", str(args.idle_timeout),
+        "--db-path", db_path,
+    ]
+    env = {**os.environ, "PYTHONPATH": SRC + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    urls = [f"http://127.0.0.1:{port + i}" for i in range(args.workers)]
+
+    deadline = time.monotonic() + 60
+    for url in urls:
+        while True:
+            try:
+                httpx.get(f"{url}/health", timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    process.kill()
+                    raise RuntimeError(f"server on {url} did not start")
+                time.sleep(0.2)
+    return process, urls
+
+
+async def run_session(url: str, args, stop_at: float, stats: dict, opened: asyncio.Event):
+    try:
+        async with sse_client(f"{url}/sse", timeout=30) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                stats["opened"] += 1
+                stats["open_now"] += 1
+                stats["peak_open"] = max(stats["peak_open"], stats["open_now"])
+                if stats["opened"] + stats["rejected"] + stats["failed"] == args.sessions:
+                    opened.set()
+                try:
+                    calls = 0
+                    while time.monotonic() < stop_at:
+                        t0 = time.perf_counter()
+                        if calls % 2 == 0:
+                            await session.list_tools()
+                        else:
+                            # Unknown token: exercises the full call path without touching the store
+                            await session.call_tool("fetch_continuation", {"continuation": "bench"})
+                        stats["latencies"].append((time.perf_counter() - t0) * 1000)
+                        calls += 1
+                        await asyncio.sleep(args.think_time)
+                finally:
+                    stats["open_now"] -= 1
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status is None and isinstance(e, BaseExceptionGroup):
+            for inner in e.exceptions:
+                status = getattr(getattr(inner, "response", None), "status_code", None) or status
+        if status == 503:
+            stats["rejected"] += 1
+        else:
+            stats["failed"] += 1
+            stats["errors"].append(repr(e)[:200])
+        if stats["opened"] + stats["rejected"] + stats["failed"] == args.sessions:
+            opened.set()
+
+
+async def load(urls: list[str], args) -> dict:
+    stats = {
+        "opened": 0, "rejected": 0, "failed": 0,
+        "open_now": 0, "peak_open": 0, "latencies": [], "errors": [],
+    }
+    opened = asyncio.Event()
+    start, cpu_start = time.monotonic(), time.process_time()
+    stop_at = start + args.ramp + args.duration
+    tasks = []
+    for i in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(urls[i % len(urls)], args, stop_at, stats, opened)))
+        await asyncio.sleep(args.ramp / args.sessions)
+    await asyncio.wait_for(opened.wait(), timeout=args.ramp + 60)
+    connected = time.monotonic()
+    async with httpx.AsyncClient() as client:
+        health = [(await client.get(f"{url}/health")).json() for url in urls]
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - start
+    # The client shares the machine with the server; high client CPU inflates latencies
+    client_cpu = time.process_time() - cpu_start
+
+    latencies = sorted(stats["latencies"])
+    q = statistics.quantiles(latencies, n=100) if len(latencies) >= 2 else [0.0] * 99
+    return {
+        "sessions": args.sessions,
+        "opened": stats["opened"],
+        "rejected": stats["rejected"],
+        "failed": stats["failed"],
+        "peak_open": stats["peak_open"],
+        "connect_s": round(connected - start, 2),
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(q[49], 2),
+        "p95_ms": round(q[94], 2),
+        "p99_ms": round(q[98], 2),
+        "client_cpu_s": round(client_cpu, 1),
+        "workers": health,
+        "errors": stats["errors"][:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moveworks MCP SSE load test")
+    parser.add_argument("--url", action="append", help="Base URL of a running server (repeat per worker)")
+    parser.add_argument("--sessions", type=int, default=100, help="Concurrent client sessions")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds to hold all sessions open")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which sessions are opened")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Pause between a session's requests")
+    parser.add_argument("--workers", type=int, default=1, help="Workers of the started server")
+    parser.add_argument("--max-sessions", type=int, default=100, help="Session limit per worker of the started server")
+    parser.add_argument("--idle-timeout", type=float, default=900.0, help="Idle timeout of the started server")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as db_path:
+        if args.url:
+            urls = [url.rstrip("/") for url in args.url]
+        else:
+            process, urls = start_server(args, db_path)
+        try:
+            results = asyncio.run(load(urls, args))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    print(f"\n  sessions   {results['opened']}/{results['sessions']} opened, "
+          f"{results['rejected']} rejected (503), {results['failed']} failed, peak {results['peak_open']} open")
+    print(f"  requests   {results['requests']} in {args.ramp + args.duration:.0f}s "
+          f"({results['requests_per_s']}/s), connect {results['connect_s']}s, client cpu {results['client_cpu_s']}s")
+    print(f"  latency    p50 {results['p50_ms']} ms, p95 {results['p95_ms']} ms, p99 {results['p99_ms']} ms")
+    for url, health in zip(urls, results["workers"]):
+        print(f"  {url}  active {health['active_sessions']}/{health['max_sessions']}, "
+              f"rejected {health['rejected_sessions']}, evicted {health['evicted_sessions']}")
+    for error in results["errors"]:
+        print(f"  error      {error}")
+    print()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure Moveworks MCP server startup and first-call latency.
+
+Each repetition runs in a fresh interpreter and times:
+
+  import       import moveworks_mcp.server
+  init         construct MoveworksMCP
+  list_tools   first list_tools request
+  first_list   first mw_kb_list call (store only)
+  first_search first mw_kb_search call (store + embedding model), with --search
+
+and records which heavy modules were loaded after each stage. Point --src at
+another checkout (e.g. `git worktree add /tmp/mw-before <rev>`) to compare
+two revisions on the same machine.
+
+Run:
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --search --src /tmp/mw-before/src --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_SRC = str(Path(__file__).parent.parent / "src")
+HEAVY_MODULES = ["chromadb", "sentence_transformers", "torch", "onnxruntime"]
+STAGES = ["import", "init", "list_tools", "first_list", "first_search"]
+
+
+def run_once(search: bool, db_path: str) -> dict:
+    timings: dict[str, float] = {}
+    loaded: dict[str, list[str]] = {}
+
+    def mark(stage: str, start: float):
+        timings[stage] = round(time.perf_counter() - start, 4)
+        loaded[stage] = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    t0 = time.perf_counter()
+    from moveworks_mcp.server import MoveworksMCP
+    from moveworks_mcp.utils.config import ServerConfig
+    mark("import", t0)
+
+    t0 = time.perf_counter()
+    fields = ServerConfig.model_fields
+    controller = MoveworksMCP(ServerConfig(**({"db_path": db_path} if "db_path" in fields else {})))
+    mark("init", t0)
+
+    async def calls():
+        t0 = time.perf_counter()
+        await controller._list_tools_impl()
+        mark("list_tools", t0)
+
+        t0 = time.perf_counter()
+        await controller._call_tool_impl("mw_kb_list", {})
+        mark("first_list", t0)
+
+        if search:
+            t0 = time.perf_counter()
+            await controller._call_tool_impl("mw_kb_search", {"query": "compound actions"})
+            mark("first_search", t0)
+
+    asyncio.run(calls())
+    return {"timings": timings, "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moveworks MCP startup benchmark")
+    parser.add_argument("--src", default=DEFAULT_SRC, help="Source tree containing moveworks_mcp")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--search", action="store_true", help="Also time the first search call")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, args.src)
+        print(json.dumps(run_once(args.search, args.db_path)))
+        return
+
+    runs = []
+    with tempfile.TemporaryDirectory() as db_path:
+        for _ in range(args.repeats):
+            cmd = [sys.executable, __file__, "--child", "--src", args.src, "--db-path", db_path]
+            if args.search:
+                cmd.append("--search")
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                sys.exit(f"Benchmark run failed:\n{proc.stderr.strip()[-1000:]}")
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    summary = {"src": args.src, "repeats": args.repeats, "median_s": {}, "loaded": runs[-1]["loaded"]}
+    print(f"\n  src: {args.src}  ({args.repeats} runs, median seconds)")
+    for stage in STAGES:
+        values = [r["timings"][stage] for r in runs if stage in r["timings"]]
+        if not values:
+            continue
+        summary["median_s"][stage] = round(statistics.median(values), 4)
+        modules = ", ".join(runs[-1]["loaded"][stage]) or "-"
+        print(f"  {stage:13s} {summary['median_s'][stage]:8.3f}   loaded: {modules}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
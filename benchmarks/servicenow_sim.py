@@ -0,0 +1,577 @@
+"""
+Local stand-in for a ServiceNow instance, for load tests of the ServiceNow
+MCP tools.
+
+Implements the part of the REST API that tools/knowledge_base.py and
+tools/table_tools.py call:
+- GET /api/now/table/<table> with sysparm_query, sysparm_fields,
+  sysparm_limit, sysparm_offset and sysparm_display_value;
+- GET and PATCH /api/now/table/<table>/<sys_id>, and POST /api/now/table/<table>;
+- POST /oauth_token.do (client_credentials and password grants).
+
+Requests need Basic auth for a known user or a bearer token from
+oauth_token.do. The tables are kb_knowledge_base, kb_category,
+kb_knowledge, incident, sys_user, sys_scope, sys_db_object and
+sys_dictionary, filled from --seed. The same seed and --records always
+produce the same records and sys_ids.
+
+Encoded queries support:
+- ^ (and), ^OR (or), ^NQ (new query);
+- ORDERBY and ORDERBYDESC;
+- dot-walks through references;
+- the operators =, !=, <, <=, >, >=, LIKE, NOTLIKE, STARTSWITH, ENDSWITH,
+  IN, NOT IN, ISEMPTY and ISNOTEMPTY.
+Display values follow the real instance:
+- false: a reference is {link, value};
+- true: a reference is {link, display_value} and a choice gives its label;
+- all: every field is {display_value, value}.
+
+Fault injection:
+  --latency-ms / --jitter-ms  delay before each response
+  --error-rate                fraction of API requests answered with --error-status
+  --rate-limit                requests/s allowed (token bucket); excess get 429 + Retry-After
+
+GET /sim/stats returns request counts by status, injected errors and rate-limited requests.
+
+Run:
+    python3 benchmarks/servicenow_sim.py --port 8089 --latency-ms 40 --rate-limit 50
+    SERVICENOW_INSTANCE_URL=http://127.0.0.1:8089 SERVICENOW_AUTH_TYPE=basic \\
+        SERVICENOW_USERNAME=admin SERVICENOW_PASSWORD=admin servicenow-mcp
+"""
+import argparse
+import base64
+import json
+import math
+import random
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+USERS = {"admin": "admin"}
+OAUTH_CLIENTS = {"sim-client": "sim-secret"}
+DEFAULT_LIMIT = 10000
+
+# Reference fields per table and the table they point to
+REFERENCES = {
+    "kb_knowledge_base": {"owner": "sys_user", "kb_managers": "sys_user"},
+    "kb_category": {"kb_knowledge_base": "kb_knowledge_base", "parent": "kb_category"},
+    "kb_knowledge": {
+        "kb_knowledge_base": "kb_knowledge_base",
+        "kb_category": "kb_category",
+        "author": "sys_user",
+    },
+    "incident": {"caller_id": "sys_user", "assigned_to": "sys_user"},
+    "sys_db_object": {"sys_scope": "sys_scope", "super_class": "sys_db_object"},
+}
+CHOICES = {
+    "kb_knowledge": {
+        "workflow_state": {"draft": "Draft", "review": "Review", "published": "Published", "retired": "Retired"},
+    },
+    "incident": {
+        "state": {"1": "New", "2": "In Progress", "6": "Resolved", "7": "Closed"},
+        "priority": {"1": "1 - Critical", "2": "2 - High", "3": "3 - Moderate", "4": "4 - Low"},
+    },
+}
+# Field shown as a record's display value when another record references it
+DISPLAY_FIELDS = {
+    "sys_user": "name",
+    "sys_scope": "scope",
+    "kb_knowledge_base": "title",
+    "kb_category": "label",
+    "kb_knowledge": "number",
+    "incident": "number",
+    "sys_db_object": "label",
+}
+WORDS = (
+    "password reset vpn laptop printer email access request onboarding benefits payroll "
+    "travel expense policy network wifi software license install account locked badge "
+    "office equipment security phishing mobile device calendar meeting storage backup"
+).split()
+
+
+@dataclass
+class SimulatorConfig:
+    seed: int = 7
+    # Articles; the other tables scale from it
+    records: int = 500
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    # Requests per second across all clients; 0 disables the limit
+    rate_limit: float = 0.0
+
+
+# ── dataset ──────────────────────────────────────────────────────────────────
+
+
+def build_dataset(seed: int = 7, records: int = 500) -> dict[str, dict[str, dict]]:
+    """Return {table: {sys_id: record}}; deterministic for a seed and size."""
+    rng = random.Random(seed)
+    epoch = datetime(2024, 1, 1)
+    tables: dict[str, dict[str, dict]] = {}
+
+    def add(table: str, **fields) -> str:
+        sys_id = "%032x" % rng.getrandbits(128)
+        created = epoch + timedelta(minutes=rng.randrange(500_000))
+        updated = created + timedelta(minutes=rng.randrange(50_000))
+        tables.setdefault(table, {})[sys_id] = {
+            "sys_id": sys_id,
+            "sys_created_on": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "sys_updated_on": updated.strftime("%Y-%m-%d %H:%M:%S"),
+            **{key: str(value) for key, value in fields.items()},
+        }
+        return sys_id
+
+    def phrase(n: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    users = [
+        add("sys_user", user_name=f"user{i}", name=f"User {i}", email=f"user{i}@example.com", active="true")
+        for i in range(max(5, records // 20))
+    ]
+    bases = [
+        add(
+            "kb_knowledge_base",
+            title=f"{phrase(2).title()} Knowledge",
+            description=phrase(12),
+            owner=rng.choice(users),
+            kb_managers=rng.choice(users),
+            active="true" if i % 5 else "false",
+        )
+        for i in range(max(2, records // 100))
+    ]
+    categories = []
+    for i in range(max(4, records // 25)):
+        base = rng.choice(bases)
+        parents = [c for c in categories if tables["kb_category"][c]["kb_knowledge_base"] == base]
+        parent = rng.choice(parents) if parents and i % 3 else ""
+        categories.append(add(
+            "kb_category",
+            label=phrase(2).title(),
+            description=phrase(8),
+            kb_knowledge_base=base,
+            parent=parent,
+            parent_table="kb_category" if parent else "kb_knowledge_base",
+            active="true",
+        ))
+    for i in range(records):
+        category = rng.choice(categories)
+        paragraphs = "".join(f"<p>{phrase(rng.randint(20, 80))}.</p>" for _ in range(rng.randint(2, 10)))
+        add(
+            "kb_knowledge",
+            number=f"KB{10001 + i:07d}",
+            short_description=f"How to {phrase(4)}",
+            text=paragraphs,
+            kb_knowledge_base=tables["kb_category"][category]["kb_knowledge_base"],
+            kb_category=category,
+            author=rng.choice(users),
+            workflow_state=rng.choice(["published"] * 6 + ["draft", "review", "retired"]),
+            keywords=phrase(3),
+            article_type="text",
+            view_count=rng.randrange(5000),
+        )
+    for i in range(records):
+        add(
+            "incident",
+            number=f"INC{10001 + i:07d}",
+            short_description=phrase(6).capitalize(),
+            description=phrase(30),
+            caller_id=rng.choice(users),
+            assigned_to=rng.choice(users) if i % 4 else "",
+            state=rng.choice(list(CHOICES["incident"]["state"])),
+            priority=rng.choice(list(CHOICES["incident"]["priority"])),
+        )
+
+    scopes = {name: add("sys_scope", scope=name, name=name.title()) for name in ("global", "x_sim_app")}
+    table_ids: dict[str, str] = {}
+    schema = {
+        "task": ("Task", "global", None),
+        "incident": ("Incident", "global", "task"),
+        "sys_user": ("User", "global", None),
+        "kb_knowledge_base": ("Knowledge Base", "global", None),
+        "kb_category": ("Category", "global", None),
+        "kb_knowledge": ("Knowledge", "global", None),
+        "x_sim_app_request": ("Sim Request", "x_sim_app", "task"),
+        "x_sim_app_asset": ("Sim Asset", "x_sim_app", None),
+    }
+    for name, (label, scope, _) in schema.items():
+        table_ids[name] = add(
+            "sys_db_object",
+            name=name,
+            label=label,
+            sys_scope=scopes[scope],
+            super_class="",
+            number_ref="",
+            extension_model="",
+        )
+    for name, (_, _, parent) in schema.items():
+        if parent:
+            tables["sys_db_object"][table_ids[name]]["super_class"] = table_ids[parent]
+
+    for name in schema:
+        # The collection row (empty element) describes the table itself
+        add("sys_dictionary", name=name, element="", column_label=schema[name][0], internal_type="collection",
+            max_length="40", mandatory="false", reference="", default_value="")
+        sample = next(iter(tables.get(name, {}).values()), None)
+        fields = [f for f in sample if not f.startswith("sys_")] if sample else ["number", "short_description"]
+        for element in ["sys_id", "sys_created_on", "sys_updated_on"] + fields:
+            reference = REFERENCES.get(name, {}).get(element, "")
+            add(
+                "sys_dictionary",
+                name=name,
+                element=element,
+                column_label=element.replace("_", " ").title(),
+                internal_type="reference" if reference else ("GUID" if element == "sys_id" else "string"),
+                max_length="32" if reference or element == "sys_id" else "4000" if element in ("text", "description") else "100",
+                mandatory="true" if element in ("sys_id", "number", "short_description", "title", "label") else "false",
+                reference=reference,
+                default_value="",
+            )
+    return tables
+
+
+# ── encoded queries ──────────────────────────────────────────────────────────
+
+_CONDITION = re.compile(
+    r"^([\w.]+?)(ISNOTEMPTY|ISEMPTY|NOTLIKE|LIKE|STARTSWITH|ENDSWITH|NOT IN|IN|!=|>=|<=|=|>|<)(.*)$"
+)
+
+
+def parse_query(query: str) -> tuple[list[list[list[tuple]]], list[tuple[str, bool]]]:
+    """
+    Split an encoded query into (groups, order). A record matches when every
+    clause of any ^NQ group matches; a clause is a list of OR'd conditions.
+    """
+    groups, order = [], []
+    for part in query.split("^NQ"):
+        clauses: list[list[tuple]] = []
+        for term in part.split("^"):
+            if not term or term == "EQ":
+                continue
+            if term.startswith("ORDERBYDESC"):
+                order.append((term[len("ORDERBYDESC"):], True))
+                continue
+            if term.startswith("ORDERBY"):
+                order.append((term[len("ORDERBY"):], False))
+                continue
+            is_or = term.startswith("OR") and clauses
+            match = _CONDITION.match(term[2:] if is_or else term)
+            if not match:
+                raise ValueError(f"Invalid query term '{term}'")
+            if is_or:
+                clauses[-1].append(match.groups())
+            else:
+                clauses.append([match.groups()])
+        groups.append(clauses)
+    return groups, order
+
+
+def _compare(value: str, operator: str, operand: str) -> bool:
+    if operand == "NULL" and operator in ("=", "!="):
+        return (value == "") == (operator == "=")
+    if operator == "=":
+        return value == operand
+    if operator == "!=":
+        return value != operand
+    if operator == "ISEMPTY":
+        return value == ""
+    if operator == "ISNOTEMPTY":
+        return value != ""
+    if operator in ("LIKE", "NOTLIKE"):
+        return (operand.lower() in value.lower()) == (operator == "LIKE")
+    if operator == "STARTSWITH":
+        return value.lower().startswith(operand.lower())
+    if operator == "ENDSWITH":
+        return value.lower().endswith(operand.lower())
+    if operator in ("IN", "NOT IN"):
+        return (value in operand.split(",")) == (operator == "IN")
+    try:
+        left, right = float(value), float(operand)
+    except ValueError:
+        left, right = value, operand
+    return {">": left > right, ">=": left >= right, "<": left < right, "<=": left <= right}[operator]
+
+
+# ── simulator ────────────────────────────────────────────────────────────────
+
+
+class ServiceNowSimulator:
+    """Dataset, request handling and fault injection; serve() puts it behind an HTTP server."""
+
+    def __init__(self, config: SimulatorConfig | None = None):
+        self.config = config or SimulatorConfig()
+        self.tables = build_dataset(self.config.seed, self.config.records)
+        self.tokens: set[str] = set()
+        self.base_url = ""
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._bucket = self.config.rate_limit
+        self._bucket_time = time.monotonic()
+        self._stats = {"requests": 0, "by_status": {}, "injected_errors": 0, "rate_limited": 0}
+
+    # fault injection
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return (self.config.latency_ms + jitter) / 1000
+
+    def _throttle(self) -> float | None:
+        """Seconds until the next request is allowed, or None when this one may proceed."""
+        rate = self.config.rate_limit
+        if rate <= 0:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._bucket = min(rate, self._bucket + (now - self._bucket_time) * rate)
+            self._bucket_time = now
+            if self._bucket >= 1:
+                self._bucket -= 1
+                return None
+            self._stats["rate_limited"] += 1
+            return (1 - self._bucket) / rate
+
+    def _inject_error(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._lock:
+            if self._random.random() >= self.config.error_rate:
+                return False
+            self._stats["injected_errors"] += 1
+            return True
+
+    def record(self, status: int):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["by_status"][str(status)] = self._stats["by_status"].get(str(status), 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    # auth
+
+    def authorized(self, header: str | None) -> bool:
+        if not header:
+            return False
+        scheme, _, credentials = header.partition(" ")
+        if scheme.lower() == "bearer":
+            return credentials in self.tokens
+        if scheme.lower() == "basic":
+            user, _, password = base64.b64decode(credentials).decode().partition(":")
+            return USERS.get(user) == password
+        return False
+
+    def issue_token(self, header: str | None, form: dict[str, str]) -> tuple[int, dict]:
+        client_id, _, secret = (
+            base64.b64decode(header.partition(" ")[2]).decode().partition(":") if header else ("", "", "")
+        )
+        grant = form.get("grant_type")
+        if OAUTH_CLIENTS.get(client_id) != secret:
+            return 401, {"error": "invalid_client", "error_description": "access_denied"}
+        if grant == "password" and USERS.get(form.get("username", "")) != form.get("password"):
+            return 401, {"error": "invalid_grant", "error_description": "access_denied"}
+        if grant not in ("client_credentials", "password"):
+            return 400, {"error": "unsupported_grant_type"}
+        token = secrets.token_urlsafe(24)
+        self.tokens.add(token)
+        return 200, {"access_token": token, "refresh_token": secrets.token_urlsafe(24), "scope": "useraccount",
+                     "token_type": "Bearer", "expires_in": 1799}
+
+    # table API
+
+    def _field(self, table: str, record: dict, path: str) -> str:
+        """Raw value of a field, following dot-walks through references."""
+        head, _, rest = path.partition(".")
+        value = record.get(head, "")
+        if not rest:
+            return value
+        target = REFERENCES.get(table, {}).get(head)
+        referenced = self.tables.get(target, {}).get(value) if target else None
+        return self._field(target, referenced, rest) if referenced else ""
+
+    def _render(self, table: str, record: dict, fields: list[str] | None, display: str) -> dict:
+        out = {}
+        for field in fields or record:
+            value = self._field(table, record, field)
+            target = REFERENCES.get(table, {}).get(field)
+            choices = CHOICES.get(table, {}).get(field)
+            display_value = value
+            if target and value:
+                referenced = self.tables.get(target, {}).get(value, {})
+                display_value = referenced.get(DISPLAY_FIELDS.get(target, "sys_id"), "")
+            elif choices:
+                display_value = choices.get(value, value)
+            link = f"{self.base_url}/api/now/table/{target}/{value}" if target and value else None
+
+            if display == "all":
+                out[field] = {"display_value": display_value, "value": value, **({"link": link} if link else {})}
+            elif display == "true":
+                out[field] = {"display_value": display_value, "link": link} if link else display_value
+            else:
+                out[field] = {"value": value, "link": link} if link else value
+        return out
+
+    def list_records(self, table: str, params: dict[str, str]) -> tuple[list[dict], int]:
+        groups, order = parse_query(params.get("sysparm_query", ""))
+        with self._lock:
+            rows = list(self.tables[table].values())
+        matched = [
+            row for row in rows
+            if any(
+                all(any(_compare(self._field(table, row, f), op, v) for f, op, v in clause) for clause in group)
+                for group in groups
+            )
+        ]
+        for field, descending in reversed(order):
+            matched.sort(key=lambda row: self._field(table, row, field), reverse=descending)
+        offset = int(params.get("sysparm_offset", 0))
+        limit = int(params.get("sysparm_limit", DEFAULT_LIMIT))
+        return matched[offset:offset + limit], len(matched)
+
+    def handle(self, method: str, path: str, query: dict[str, str], body: bytes, headers) -> tuple[int, dict, dict]:
+        """Return (status, JSON body, extra headers) for one request."""
+        if path == "/sim/stats":
+            return 200, self.stats(), {}
+        if path == "/oauth_token.do" and method == "POST":
+            form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+            status, payload = self.issue_token(headers.get("Authorization"), form)
+            return status, payload, {}
+
+        parts = [p for p in path.split("/") if p]
+        if parts[:3] != ["api", "now", "table"] or len(parts) not in (4, 5):
+            return 400, _error("Requested URI does not represent any resource"), {}
+
+        wait = self._throttle()
+        if wait is not None:
+            return 429, _error("Rate limit exceeded"), {"Retry-After": str(max(1, math.ceil(wait)))}
+        if self._inject_error():
+            return self.config.error_status, _error("Injected failure"), {}
+        if not self.authorized(headers.get("Authorization")):
+            return 401, _error("User Not Authenticated", "Required to provide Auth information"), {}
+
+        table = parts[3]
+        if table not in self.tables:
+            return 400, _error(f"Invalid table {table}"), {}
+        fields = [f for f in query.get("sysparm_fields", "").split(",") if f] or None
+        display = query.get("sysparm_display_value", "false").lower()
+
+        if len(parts) == 4 and method == "GET":
+            try:
+                rows, total = self.list_records(table, query)
+            except ValueError as e:
+                return 400, _error(str(e)), {}
+            return 200, {"result": [self._render(table, r, fields, display) for r in rows]}, {"X-Total-Count": str(total)}
+
+        if len(parts) == 4 and method == "POST":
+            sys_id = secrets.token_hex(16)
+            record = {"sys_id": sys_id, "sys_created_on": _now(), "sys_updated_on": _now(),
+                      **_as_fields(json.loads(body or b"{}"))}
+            with self._lock:
+                self.tables[table][sys_id] = record
+            return 201, {"result": self._render(table, record, fields, display)}, {}
+
+        if method not in ("GET", "PATCH") or len(parts) != 5:
+            return 405, _error(f"Method {method} not supported for this resource"), {}
+        with self._lock:
+            record = self.tables[table].get(parts[4])
+            if record is not None and method == "PATCH":
+                record.update(_as_fields(json.loads(body or b"{}")))
+                record["sys_updated_on"] = _now()
+        if record is None:
+            return 404, _error("No Record found", "Record doesn't exist or ACL restricts the record retrieval"), {}
+        return 200, {"result": self._render(table, record, fields, display)}, {}
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """Start serving on a daemon thread; base_url is set from the bound port."""
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this, Nagle's
+            # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                url = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                delay = simulator._delay() if url.path != "/sim/stats" else 0.0
+                if delay:
+                    time.sleep(delay)
+                status, payload, extra = simulator.handle(self.command, url.path, query, body, self.headers)
+                if url.path != "/sim/stats":
+                    simulator.record(status)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = _respond
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        self.base_url = f"http://{host}:{server.server_address[1]}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _as_fields(data: dict) -> dict[str, str]:
+    # The instance stores every field as a string
+    return {k: v if isinstance(v, str) else json.dumps(v) for k, v in data.items()}
+
+
+def _error(message: str, detail: str | None = None) -> dict:
+    return {"error": {"message": message, "detail": detail}, "status": "failure"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ServiceNow REST simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--records", type=int, default=500, help="Articles and incidents to generate")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/s; 0 = unlimited")
+    args = parser.parse_args()
+
+    simulator = ServiceNowSimulator(SimulatorConfig(
+        seed=args.seed,
+        records=args.records,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit=args.rate_limit,
+    ))
+    server = simulator.serve(args.host, args.port)
+    print(f"ServiceNow simulator on {simulator.base_url} (basic auth admin/admin, "
+          f"OAuth client {next(iter(OAUTH_CLIENTS))}/{next(iter(OAUTH_CLIENTS.values()))})", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def items(self):
+        with self._lock:
+            return list(self._values.items())
+
+    def render(self) -> Iterator[str]:
+        yield from super().render()
+        for key, value in self.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)], sum, count, max
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+            entry[3] = max(entry[3], value)
+
+    def items(self):
+        with self._lock:
+            return [(key, ([*entry[0]], entry[1], entry[2], entry[3])) for key, entry in self._values.items()]
+
+    def quantile(self, q: float, counts: Sequence[int], largest: float = math.inf) -> Optional[float]:
+        """Estimate a quantile from bucket counts, interpolating inside the bucket but never past largest."""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return min(lower, largest)
+                return min(lower + (self.buckets[i] - lower) * (rank - seen) / count, largest)
+            seen += count
+        return min(self.buckets[-1], largest)
+
+    def render(self) -> Iterator[str]:
+        yield from super().render()
+        for key, (counts, total, count, _largest) in self.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics in the Prometheus data model, without the client library.
+
+    counter(), gauge() and histogram() return the existing metric of that name
+    or register a new one. render() produces the text exposition format
+    served on /metrics. All updates take one short lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self.started = time.time()
+
+    def _get(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, labelnames, self._lock, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class _ToolCall:
+    __slots__ = ("response_bytes",)
+
+    def __init__(self):
+        self.response_bytes: Optional[int] = None
+
+
+class ToolMetrics:
+    """
+    Tool-call metrics of one server in a registry of its own.
+
+    Metric names start with prefix (the server's package name), so the two
+    servers never share a series. Other components of the server (e.g. its
+    HTTP client) register their metrics in .registry under the same prefix.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.registry = MetricsRegistry()
+        self.calls = self.registry.counter(
+            f"{prefix}_tool_calls_total", "Tool calls by outcome", ("tool", "status")
+        )
+        self.duration = self.registry.histogram(
+            f"{prefix}_tool_duration_seconds", "Tool call latency, including serialization", ("tool",)
+        )
+        self.in_flight = self.registry.gauge(
+            f"{prefix}_tool_calls_in_flight", "Tool calls currently running", ("tool",)
+        )
+        self.response_bytes = self.registry.histogram(
+            f"{prefix}_tool_response_bytes", "Size of serialized tool responses", ("tool",), buckets=BYTES_BUCKETS
+        )
+
+    @contextmanager
+    def track(self, tool: str):
+        """Time a tool call and count it as an error if it raises; set .response_bytes on the yielded object."""
+        call = _ToolCall()
+        self.in_flight.inc(tool=tool)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            yield call
+            status = "ok"
+        finally:
+            self.duration.observe(time.perf_counter() - start, tool=tool)
+            self.calls.inc(tool=tool, status=status)
+            self.in_flight.dec(tool=tool)
+            if call.response_bytes is not None:
+                self.response_bytes.observe(call.response_bytes, tool=tool)
+
+    def summary(self) -> dict:
+        """Per-tool calls, errors, in-flight calls, latency percentiles (ms) and mean response size."""
+        tools: Dict[str, dict] = {}
+
+        def entry(tool: str) -> dict:
+            return tools.setdefault(tool, {"calls": 0, "errors": 0, "in_flight": 0})
+
+        for (tool, status), value in self.calls.items():
+            entry(tool)["calls"] += int(value)
+            if status == "error":
+                entry(tool)["errors"] += int(value)
+        for (tool,), value in self.in_flight.items():
+            entry(tool)["in_flight"] = int(value)
+        for (tool,), (counts, total, count, largest) in self.duration.items():
+            entry(tool)["latency_ms"] = {
+                "mean": round(total / count * 1000, 2) if count else None,
+                **{
+                    name: round(self.duration.quantile(q, counts, largest) * 1000, 2)
+                    for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+                },
+                "max": round(largest * 1000, 2),
+            }
+        for (tool,), (counts, total, count, _largest) in self.response_bytes.items():
+            entry(tool)["mean_response_bytes"] = round(total / count) if count else None
+        return dict(sorted(tools.items()))
+
+    def tool_output(self, output_format: str = "summary") -> Any:
+        """What the server_metrics tool returns: the tool summary, or the raw exposition text."""
+        if output_format == "prometheus":
+            return self.registry.render()
+        return {"uptime_seconds": round(time.time() - self.registry.started, 1), "tools": self.summary()}
+
+    async def endpoint(self, request: Request) -> Response:
+        """GET /metrics in the Prometheus text exposition format."""
+        return PlainTextResponse(self.registry.render(), media_type=CONTENT_TYPE)
+
+
+METRICS_TOOL = "server_metrics"
+METRICS_TOOL_DESCRIPTION = (
+    "Server metrics: per-tool call counts, errors, in-flight calls, latency percentiles "
+    "and response sizes. format 'prometheus' returns the raw text exposition instead."
+)
+METRICS_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "format": {
+            "type": "string",
+            "enum": ["summary", "prometheus"],
+            "description": "summary (JSON, default) or prometheus (text exposition format)",
+        }
+    },
+}
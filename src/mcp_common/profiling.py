@@ -0,0 +1,322 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_SUFFIXES = {"sample": ".collapsed", "cprofile": ".pstats"}
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def _runs_package_code(frame, package: str) -> bool:
+    while frame is not None:
+        if package in frame.f_code.co_filename:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class StackSampler:
+    """
+    Wall-clock stack sampler. Every interval it records the stack of the
+    calling thread and, with follow_threads, the stacks of other threads that
+    are running code of the given package (the worker threads tools hand
+    CPU-bound work to); idle pool threads are left out. Stacks are kept in
+    collapsed form, root first, for flame graph tools.
+    """
+
+    def __init__(self, package: str, interval_ms: float = 5.0, follow_threads: bool = True):
+        # Matched against file paths, so "x_mcp" does not also match "x_mcp_extra"
+        self.package = os.sep + package + os.sep
+        self.interval = interval_ms / 1000
+        self.follow_threads = follow_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tool-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (
+                    ident != self._target
+                    and (not self.follow_threads or not _runs_package_code(frame, self.package))
+                ):
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                labels = []
+                while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(f"thread {names.get(ident, ident)}")
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def write(self, path: Path):
+        lines = [f"{stack} {count}\n" for stack, count in self.stacks.most_common()]
+        path.write_text("".join(lines))
+
+
+class ToolProfiler:
+    """
+    Opt-in profiling of a fraction of tool calls, for finding hot spots under
+    real traffic.
+
+    Modes:
+      sample    wall-clock stack samples (StackSampler) written as collapsed
+                stacks (.collapsed), readable by flamegraph.pl or speedscope.
+                Covers worker threads, and shows time spent waiting on I/O.
+      cprofile  deterministic cProfile stats (.pstats) for pstats or snakeviz.
+                Exact call counts, but it only sees the thread it runs in.
+
+    Sync tools run in a worker thread and are profiled there (wrap), seeing
+    only that thread, so other sessions' work never lands in their profile.
+    Async tools are profiled on the event loop, which every session shares:
+    their profile is written only if no other tool call ran while it was
+    taken, and is otherwise counted in skipped_overlap.
+
+    One call is profiled at a time; a call that starts while another is being
+    profiled runs unprofiled (skipped_busy). Calls quicker than min_ms are not
+    written. Each tool keeps its newest `keep` files in the profile directory,
+    by default <tmp>/<package>-profiles.
+    """
+
+    def __init__(
+        self,
+        package: str,
+        directory: Optional[str] = None,
+        rate: float = 0.0,
+        mode: str = "sample",
+        keep: int = 20,
+        min_ms: float = 0.0,
+        interval_ms: float = 5.0,
+    ):
+        # Profiling is offered only when asked for at startup, by a directory or a rate
+        self.available = bool(directory) or rate > 0
+        self.package = package
+        self.directory = Path(directory or os.path.join(tempfile.gettempdir(), f"{package}-profiles"))
+        self.keep = max(1, keep)
+        self.interval_ms = interval_ms
+        self.rate = 0.0
+        self.mode = "sample"
+        self.min_ms = 0.0
+        self.tools: frozenset = frozenset()
+        self.configure(rate=rate, mode=mode, min_ms=min_ms)
+        self.written = 0
+        self.skipped_busy = 0
+        self.skipped_overlap = 0
+        self._busy = threading.Lock()
+        # Tool calls in flight and started so far, to spot calls that overlap a profile
+        self._calls = threading.Lock()
+        self._active = 0
+        self._started = 0
+        self._random = random.Random()
+
+    def configure(
+        self,
+        rate: Optional[float] = None,
+        mode: Optional[str] = None,
+        min_ms: Optional[float] = None,
+        tools: Optional[Sequence[str]] = None,
+    ):
+        if rate is not None:
+            if not 0 <= rate <= 1:
+                raise ValueError(f"Profile rate must be between 0 and 1, got {rate}")
+            self.rate = float(rate)
+        if mode is not None:
+            if mode not in PROFILE_MODES:
+                raise ValueError(f"Unknown profile mode '{mode}'. Valid modes: {list(PROFILE_MODES)}")
+            self.mode = mode
+        if min_ms is not None:
+            self.min_ms = max(0.0, float(min_ms))
+        if tools is not None:
+            self.tools = frozenset(tools)
+
+    @contextmanager
+    def profile(self, tool: str, thread_only: bool = False) -> Iterator[None]:
+        """
+        Profile the enclosed tool call if it is sampled; otherwise a no-op.
+        With thread_only, only the calling thread is profiled and other calls
+        may run meanwhile; without it, package worker threads are sampled too
+        and the profile is dropped if another tool call overlapped it.
+        """
+        with self._calls:
+            self._active += 1
+            self._started += 1
+            alone, started = self._active == 1, self._started
+        try:
+            with self._profile(tool, thread_only, alone, started):
+                yield
+        finally:
+            with self._calls:
+                self._active -= 1
+
+    def wrap(self, tool: str, func: Callable) -> Callable:
+        """func, profiled in whichever thread runs it (for sync tools handed to asyncio.to_thread)."""
+
+        def run(*args, **kwargs):
+            with self.profile(tool, thread_only=True):
+                return func(*args, **kwargs)
+
+        return run
+
+    @contextmanager
+    def _profile(self, tool: str, thread_only: bool, alone: bool, started: int) -> Iterator[None]:
+        if (
+            self.rate <= 0
+            or tool == PROFILER_TOOL
+            or (self.tools and tool not in self.tools)
+            or self._random.random() >= self.rate
+        ):
+            yield
+            return
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            yield
+            return
+
+        mode = self.mode
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+        else:
+            profiler = StackSampler(self.package, self.interval_ms, follow_threads=not thread_only)
+        start = time.perf_counter()
+        try:
+            if mode == "cprofile":
+                profiler.enable()
+            else:
+                profiler.start()
+            yield
+        finally:
+            if mode == "cprofile":
+                profiler.disable()
+            else:
+                profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._calls:
+                overlapped = not thread_only and (not alone or self._started != started)
+            try:
+                if overlapped:
+                    # Other sessions' work ran on the shared loop and threads; it would be blamed on this tool
+                    self.skipped_overlap += 1
+                # A call shorter than the sampling interval leaves no stacks to write
+                elif elapsed_ms >= self.min_ms and (mode == "cprofile" or profiler.stacks):
+                    self._save(tool, mode, profiler, elapsed_ms)
+            except Exception as e:
+                logger.warning(f"Could not write profile of '{tool}': {e}")
+            finally:
+                self._busy.release()
+
+    def _save(self, tool: str, mode: str, profiler, elapsed_ms: float):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        safe_tool = re.sub(r"[^\w.-]", "_", tool)
+        now = time.time()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+        path = self.directory / f"{safe_tool}-{stamp}-{elapsed_ms:.0f}ms{PROFILE_SUFFIXES[mode]}"
+        if mode == "cprofile":
+            profiler.dump_stats(str(path))
+        else:
+            profiler.write(path)
+        self.written += 1
+        logger.info(f"Wrote {mode} profile of '{tool}' ({elapsed_ms:.0f} ms) to {path}")
+
+        # Names are the tool then a timestamp, so name order is age order
+        files = sorted(self._files(safe_tool), key=lambda p: p.name, reverse=True)
+        for old in files[self.keep:]:
+            old.unlink(missing_ok=True)
+
+    def _files(self, tool: str = "*") -> list:
+        if not self.directory.is_dir():
+            return []
+        return [p for suffix in PROFILE_SUFFIXES.values() for p in self.directory.glob(f"{tool}-*{suffix}")]
+
+    def status(self) -> Dict[str, Any]:
+        files = sorted(self._files(), key=lambda p: p.stat().st_mtime, reverse=True)
+        return {
+            "enabled": self.rate > 0,
+            "rate": self.rate,
+            "mode": self.mode,
+            "tools": sorted(self.tools),
+            "min_ms": self.min_ms,
+            "directory": str(self.directory),
+            "keep_per_tool": self.keep,
+            "written": self.written,
+            "skipped_busy": self.skipped_busy,
+            "skipped_overlap": self.skipped_overlap,
+            "recent_files": [{"file": p.name, "bytes": p.stat().st_size} for p in files[:10]],
+        }
+
+    def tool_output(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """What the server_profiler tool returns after applying its action."""
+        if not self.available:
+            raise ValueError(
+                "Profiling is not enabled on this server; start it with a profile directory or rate."
+            )
+        action = arguments.get("action", "status")
+        if action == "start":
+            self.configure(
+                rate=arguments.get("rate", self.rate or 1.0),
+                mode=arguments.get("mode"),
+                min_ms=arguments.get("min_ms"),
+                tools=arguments.get("tools"),
+            )
+        elif action == "stop":
+            self.configure(rate=0.0)
+        elif action != "status":
+            raise ValueError(f"Unknown action '{action}'. Valid actions: ['status', 'start', 'stop']")
+        return self.status()
+
+
+PROFILER_TOOL = "server_profiler"
+PROFILER_TOOL_DESCRIPTION = (
+    "Admin: profile a fraction of tool calls to find where slow calls spend their time. "
+    "'start' sets the sampled fraction (rate), mode ('sample' stacks or 'cprofile'), an optional "
+    "tool filter and a minimum call duration; 'stop' turns it off; 'status' lists recent profile files."
+)
+PROFILER_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["status", "start", "stop"], "default": "status"},
+        "rate": {
+            "type": "number",
+            "minimum": 0,
+            "maximum": 1,
+            "description": "Fraction of calls to profile (start; default 1)",
+        },
+        "mode": {"type": "string", "enum": list(PROFILE_MODES)},
+        "tools": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Only profile these tools (start; empty = all)",
+        },
+        "min_ms": {"type": "number", "minimum": 0, "description": "Only keep profiles of calls at least this slow"},
+    },
+}
@@ -0,0 +1,369 @@
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from mcp_common.serialization import dumps, serialize_tool_output
+
+logger = logging.getLogger(__name__)
+
+# Optional argument every tool accepts to override its response budget for one call
+BUDGET_ARGUMENT = "max_response_bytes"
+CONTINUATION_TOOL = "fetch_continuation"
+# Room left for the continuation fields added to a truncated response
+ENVELOPE_BYTES = 256
+
+BUDGET_ARGUMENT_SCHEMA = {
+    "type": "integer",
+    "minimum": 0,
+    "description": (
+        "Maximum response size in bytes for this call. Larger results are cut at a record "
+        "boundary and return a 'continuation' token for fetch_continuation. 0 disables the limit."
+    ),
+}
+
+FETCH_CONTINUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "continuation": {
+            "type": "string",
+            "description": "The 'continuation' token returned by a truncated tool response",
+        },
+        BUDGET_ARGUMENT: BUDGET_ARGUMENT_SCHEMA,
+    },
+    "required": ["continuation"],
+}
+FETCH_CONTINUATION_DESCRIPTION = (
+    "Fetch the next part of a tool response that was truncated to fit the response budget. "
+    "Pass the 'continuation' token it returned; each part may carry a token for the next one."
+)
+
+
+@dataclass(frozen=True)
+class LinkedItems:
+    """
+    A result whose list `items` refers, through refs(item), to entries of a
+    shared dict of records `shared` (e.g. batch search hits pointing at pages
+    returned once). Such results are split by item, and each part carries
+    the shared entries its items refer to that no earlier part returned.
+    """
+
+    items: str
+    shared: str
+    refs: Callable[[Any], Iterable[str]]
+
+
+def with_budget_argument(schema: dict) -> dict:
+    """Copy of a tool's input schema that also advertises the per-call budget argument."""
+    return {**schema, "properties": {**schema.get("properties", {}), BUDGET_ARGUMENT: BUDGET_ARGUMENT_SCHEMA}}
+
+
+def parse_budgets(value: str) -> Dict[str, int]:
+    """Parse per-tool budgets from 'tool=bytes,...' (e.g. 'list_records=500000,get_article=0')."""
+    budgets = {}
+    for pair in filter(None, (p.strip() for p in value.split(","))):
+        tool, _, size = pair.partition("=")
+        try:
+            budgets[tool.strip()] = int(size)
+        except ValueError:
+            raise ValueError(f"invalid byte budget for '{tool.strip()}': {size!r}")
+    return budgets
+
+
+def _size(text: str) -> int:
+    return len(text.encode())
+
+
+class ContinuationCache:
+    """
+    Short-lived store of response remainders, keyed by random token.
+
+    Bounded by entry count and by the encoded size of the stored remainders;
+    the oldest entries are evicted first. A remainder larger than max_bytes
+    on its own is not stored.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 256, max_bytes: int = 64_000_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        # token -> (expires, size in bytes, entry)
+        self._entries: OrderedDict[str, tuple[float, int, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, entry: dict) -> Optional[str]:
+        """Store entry and return its token, or None if it is too large to keep."""
+        size = _size(dumps(entry))
+        if self.max_bytes and size > self.max_bytes:
+            logger.warning(f"Response remainder of {size} bytes exceeds the continuation cache ({self.max_bytes})")
+            return None
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._purge()
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, size, entry)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+                self._evict_oldest()
+        return token
+
+    def pop(self, token: str) -> Optional[dict]:
+        with self._lock:
+            self._purge()
+            found = self._entries.pop(token, None)
+            if found is not None:
+                self.bytes -= found[1]
+        return found[2] if found else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict_oldest(self):
+        _token, (_expires, size, _entry) = self._entries.popitem(last=False)
+        self.bytes -= size
+
+    def _purge(self):
+        now = time.monotonic()
+        while self._entries:
+            expires = next(iter(self._entries.values()))[0]
+            if expires > now:
+                break
+            self._evict_oldest()
+
+
+class ResponseBudget:
+    """
+    Serializes tool results within a byte budget.
+
+    Results that fit are serialized once and returned as they are. A larger
+    result is cut at an item boundary of its biggest list (or dict of
+    records, e.g. pages keyed by url). If it has no such collection, its
+    longest text field is cut at a paragraph boundary. The rest goes to the
+    continuation cache, and the response carries "truncated", "continuation"
+    and "remaining_items" (or "remaining_chars"). fetch() returns the next
+    part under the same budget, so a long result is read in a chain of
+    calls.
+
+    Tools listed in linked are split by their items instead (see LinkedItems).
+
+    The budget is max_response_bytes, or the tool's entry in budgets. A call
+    can override it with the max_response_bytes argument. 0 means
+    unlimited.
+    """
+
+    def __init__(
+        self,
+        max_response_bytes: int = 0,
+        budgets: Optional[Dict[str, int]] = None,
+        output_format: str = "compact",
+        cache: Optional[ContinuationCache] = None,
+        linked: Optional[Dict[str, LinkedItems]] = None,
+    ):
+        self.max_response_bytes = max_response_bytes
+        self.budgets = dict(budgets or {})
+        self.linked = dict(linked or {})
+        self.output_format = output_format
+        self.cache = cache if cache is not None else ContinuationCache()
+
+    def limit_for(self, tool_name: str, override: Optional[int] = None) -> int:
+        if override is not None:
+            return override
+        return self.budgets.get(tool_name, self.max_response_bytes)
+
+    def render(self, tool_name: str, result: Any, override: Optional[int] = None) -> str:
+        """Serialize a tool result, truncating it to the tool's budget if needed."""
+        text = serialize_tool_output(result, tool_name, self.output_format)
+        limit = self.limit_for(tool_name, override)
+        if not limit or _size(text) <= limit:
+            return text
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError:
+            payload = {"text": text}
+        if not isinstance(payload, dict):
+            payload = {"items": payload}
+        return self._fit(tool_name, payload, limit)
+
+    def fetch(self, token: str, override: Optional[int] = None) -> str:
+        entry = self.cache.pop(token)
+        if entry is None:
+            raise ValueError(
+                "Unknown or expired continuation token; run the original tool call again"
+            )
+        limit = override if override is not None else entry["limit"]
+        if not limit:
+            return dumps(entry["payload"], self.output_format)
+        return self._fit(entry["tool"], entry["payload"], limit)
+
+    # ── truncation ───────────────────────────────────────────────────────────
+
+    def _fit(self, tool_name: str, payload: dict, limit: int) -> str:
+        link = self.linked.get(tool_name)
+        if (
+            link is not None
+            and isinstance(payload.get(link.items), list)
+            and isinstance(payload.get(link.shared), dict)
+        ):
+            return self._fit_linked(tool_name, payload, link, limit)
+        key = self._collection_key(payload)
+        if key is not None:
+            return self._fit_items(tool_name, payload, key, limit)
+        path = self._longest_text_path(payload)
+        if path is not None:
+            return self._fit_text(tool_name, payload, path, limit)
+        logger.warning(f"Response of '{tool_name}' exceeds {limit} bytes and cannot be split")
+        return dumps(payload, self.output_format)
+
+    def _collection_key(self, payload: dict) -> Optional[str]:
+        """The top-level list (or dict of records) holding the most bytes, if it can be split."""
+        best, best_size = None, 0
+        for key, value in payload.items():
+            splittable = isinstance(value, list) or (
+                isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values())
+            )
+            if not splittable or len(value) < 2:
+                continue
+            size = _size(dumps(value, self.output_format))
+            if size > best_size:
+                best, best_size = key, size
+        return best
+
+    def _fit_items(self, tool_name: str, payload: dict, key: str, limit: int) -> str:
+        collection = payload[key]
+        is_dict = isinstance(collection, dict)
+        items = list(collection.items()) if is_dict else list(collection)
+
+        head = {k: v for k, v in payload.items() if k != key}
+        room = limit - _size(dumps({**head, key: {} if is_dict else []}, self.output_format)) - ENVELOPE_BYTES
+        kept = 0
+        for item in items:
+            value = {item[0]: item[1]} if is_dict else item
+            cost = _size(dumps(value, self.output_format)) + 1
+            # Always return at least one item so every call makes progress
+            if kept and cost > room:
+                break
+            room -= cost
+            kept += 1
+
+        if kept == len(items):
+            return dumps(payload, self.output_format)
+
+        rest = items[kept:]
+        kept_items = dict(items[:kept]) if is_dict else items[:kept]
+        continuation = self._continue(
+            tool_name, limit, {"continuation_of": tool_name, key: dict(rest) if is_dict else rest}
+        )
+        return dumps(
+            {**head, key: kept_items, **continuation, "remaining_items": len(rest)},
+            self.output_format,
+        )
+
+    def _fit_linked(self, tool_name: str, payload: dict, link: LinkedItems, limit: int) -> str:
+        items, shared = payload[link.items], payload[link.shared]
+        head = {k: v for k, v in payload.items() if k not in (link.items, link.shared)}
+        empty = {**head, link.items: [], link.shared: {}}
+        room = limit - _size(dumps(empty, self.output_format)) - ENVELOPE_BYTES
+        kept, sent = 0, {}
+        for item in items:
+            new = [key for key in dict.fromkeys(link.refs(item)) if key in shared and key not in sent]
+            cost = _size(dumps(item, self.output_format)) + 1 + sum(
+                _size(dumps({key: shared[key]}, self.output_format)) for key in new
+            )
+            # Always return at least one item so every call makes progress
+            if kept and cost > room:
+                break
+            room -= cost
+            kept += 1
+            sent.update(dict.fromkeys(new))
+
+        if kept == len(items):
+            return dumps(payload, self.output_format)
+
+        rest = items[kept:]
+        wanted = {key for item in rest for key in link.refs(item)}
+        continuation = self._continue(tool_name, limit, {
+            "continuation_of": tool_name,
+            link.items: rest,
+            link.shared: {key: value for key, value in shared.items() if key in wanted and key not in sent},
+        })
+        return dumps(
+            {
+                **head,
+                link.items: items[:kept],
+                link.shared: {key: value for key, value in shared.items() if key in sent},
+                **continuation,
+                "remaining_items": len(rest),
+            },
+            self.output_format,
+        )
+
+    def _continue(self, tool_name: str, limit: int, rest: dict) -> dict:
+        """Cache the rest of a response; the fields that tell the client how to fetch it."""
+        token = self.cache.put({"tool": tool_name, "limit": limit, "payload": rest})
+        if token is None:
+            return {
+                "truncated": True,
+                "continuation": None,
+                "continuation_error": "The rest of this response is too large to keep; narrow the request",
+            }
+        return {"truncated": True, "continuation": token}
+
+    def _longest_text_path(self, payload: dict, depth: int = 3) -> Optional[list]:
+        best, best_len = None, 0
+
+        def walk(value, path):
+            nonlocal best, best_len
+            if isinstance(value, str) and len(value) > best_len:
+                best, best_len = path, len(value)
+            elif isinstance(value, dict) and len(path) < depth:
+                for k, v in value.items():
+                    walk(v, path + [k])
+
+        walk(payload, [])
+        return best
+
+    def _fit_text(self, tool_name: str, payload: dict, path: list, limit: int) -> str:
+        text = payload
+        for part in path:
+            text = text[part]
+
+        def with_text(value: str) -> dict:
+            copy = json.loads(json.dumps(payload))
+            target = copy
+            for part in path[:-1]:
+                target = target[part]
+            target[path[-1]] = value
+            return copy
+
+        room = limit - _size(dumps(with_text(""), self.output_format)) - ENVELOPE_BYTES
+        # Longest prefix whose encoded form fits (escaping makes bytes != chars)
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if _size(dumps(text[:mid], self.output_format)) <= room:
+                lo = mid
+            else:
+                hi = mid - 1
+        cut = max(lo, 1)
+        boundary = text.rfind("\n", 0, cut)
+        if boundary > cut // 2:
+            cut = boundary + 1
+
+        head, rest = text[:cut], text[cut:]
+        if not rest:
+            return dumps(payload, self.output_format)
+        field = ".".join(str(part) for part in path)
+        if "continuation_of" in payload:
+            # A later part of the same field keeps the original field name
+            field = payload.get("field", field)
+        continuation = self._continue(
+            tool_name, limit, {"continuation_of": tool_name, "field": field, "text": rest}
+        )
+        truncated = with_text(head)
+        truncated.update({**continuation, "remaining_chars": len(rest)})
+        return dumps(truncated, self.output_format)
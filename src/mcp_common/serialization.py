@@ -0,0 +1,74 @@
+import json
+import logging
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: pip install -e ".[fast-json]"
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# compact: minimal separators, JSON strings returned by tools pass through untouched
+# pretty:  2-space indentation, JSON strings re-parsed and re-indented
+OUTPUT_FORMATS = ("compact", "pretty")
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values JSON has no type for (pydantic models, sets, ...)."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(obj: Any, output_format: str = "compact") -> str:
+    """Serialize obj to JSON text in the given output format, through orjson when it is installed."""
+    pretty = output_format == "pretty"
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, default=_default, option=options).decode()
+        except (orjson.JSONEncodeError, TypeError):
+            # e.g. integers beyond 64 bits; the stdlib encoder handles them
+            pass
+    if pretty:
+        return json.dumps(obj, indent=2, default=_default)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def serialize_tool_output(result: Any, tool_name: str, output_format: str = "compact") -> str:
+    """Serializes tool output to a string: JSON in the configured format, or the string itself."""
+    try:
+        if isinstance(result, str):
+            if output_format != "pretty":
+                # Already serialized by the tool; re-encoding would only cost time
+                return result
+            try:
+                return dumps(json.loads(result), output_format)
+            except json.JSONDecodeError:
+                return result
+        elif isinstance(result, (dict, list)):
+            return dumps(result, output_format)
+        elif hasattr(result, "model_dump_json"):
+            if output_format == "pretty":
+                return result.model_dump_json(indent=2)
+            return result.model_dump_json()
+        elif hasattr(result, "model_dump"):
+            return dumps(result.model_dump(), output_format)
+        elif hasattr(result, "dict"):
+            return dumps(result.dict(), output_format)
+        else:
+            logger.warning(
+                f"Could not serialize result for tool '{tool_name}' to JSON, falling back to str(). "
+                f"Type: {type(result)}"
+            )
+            return str(result)
+    except Exception as e:
+        logger.error(f"Error during serialization for tool '{tool_name}': {e}", exc_info=True)
+        return json.dumps(
+            {"error": f"Serialization failed for tool {tool_name}", "details": str(e)}, indent=2
+        )
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from mcp_common.response_budget import BUDGET_ARGUMENT
+from mcp_common.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# (progress, total, message) -> None; total and message may be None
+ProgressSink = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+_progress_sink: ContextVar[Optional[ProgressSink]] = ContextVar("progress_sink", default=None)
+
+
+@contextmanager
+def progress_sink(sink: Optional[ProgressSink]):
+    """Send progress reported by the tool running in this context to sink."""
+    token = _progress_sink.set(sink)
+    try:
+        yield
+    finally:
+        _progress_sink.reset(token)
+
+
+async def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+    """Report tool progress to whoever is listening; a no-op when nobody is."""
+    sink = _progress_sink.get()
+    if sink is None:
+        return
+    try:
+        await sink(progress, total, message)
+    except Exception as e:
+        # Progress is advisory; a client that went away must not fail the call
+        logger.debug(f"Dropped progress update: {e}")
+
+
+def threadsafe_reporter() -> Callable[..., None]:
+    """
+    A plain callback for reporting progress from a worker thread (asyncio.to_thread).
+    Call it on the event loop, before handing it to the thread.
+    """
+    sink = _progress_sink.get()
+    loop = asyncio.get_running_loop()
+
+    def report(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+        if sink is not None:
+            asyncio.run_coroutine_threadsafe(_report_to(sink, progress, total, message), loop)
+
+    return report
+
+
+async def _report_to(sink: ProgressSink, progress: float, total: Optional[float], message: Optional[str]):
+    with progress_sink(sink):
+        await report_progress(progress, total, message)
+
+
+def _streamed_field(result: dict) -> Optional[str]:
+    """The top-level list or dict of records with the most entries, streamed one entry per line."""
+    best, best_len = None, 1
+    for key, value in result.items():
+        collection = isinstance(value, list) or (
+            isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values())
+        )
+        if collection and len(value) > best_len:
+            best, best_len = key, len(value)
+    return best
+
+
+async def tool_events(
+    run_tool: Callable[..., Awaitable[Any]],
+    name: str,
+    arguments: dict,
+    output_format: str = "compact",
+) -> AsyncIterator[str]:
+    """
+    Run a tool and yield its progress and result as NDJSON lines:
+
+      {"event": "started", "tool": ...}
+      {"event": "progress", "progress": n, "total": m, "message": ...}   while it runs
+      {"event": "item", "field": f, "item": ...}                         one per entry of its
+                                                                         largest list (with "key"
+                                                                         for a dict of records)
+      {"event": "result", "result": {...}, "streamed_field": f, "items": n}
+      {"event": "error", "message": ...}                                 instead, on failure
+    """
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def on_progress(progress, total, message):
+        await events.put({"event": "progress", "progress": progress, "total": total, "message": message})
+
+    async def run():
+        try:
+            result = await run_tool(name, arguments, on_progress)
+            await events.put({"event": "done", "result": result})
+        except Exception as e:
+            await events.put({"event": "error", "message": str(e)})
+
+    yield dumps({"event": "started", "tool": name}, output_format) + "\n"
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            event = await events.get()
+            if event["event"] != "done":
+                yield dumps(event, output_format) + "\n"
+                if event["event"] == "error":
+                    return
+                continue
+
+            result = event["result"]
+            if isinstance(result, str):
+                try:
+                    result = json.loads(result)
+                except json.JSONDecodeError:
+                    pass
+            elif hasattr(result, "model_dump"):
+                result = result.model_dump(mode="json")
+            field = _streamed_field(result) if isinstance(result, dict) else None
+            if field is None:
+                yield dumps({"event": "result", "result": result}, output_format) + "\n"
+                return
+
+            collection = result[field]
+            if isinstance(collection, dict):
+                for key, item in collection.items():
+                    yield dumps({"event": "item", "field": field, "key": key, "item": item}, output_format) + "\n"
+            else:
+                for item in collection:
+                    yield dumps({"event": "item", "field": field, "item": item}, output_format) + "\n"
+            rest = {k: v for k, v in result.items() if k != field}
+            yield dumps(
+                {"event": "result", "result": rest, "streamed_field": field, "items": len(collection)},
+                output_format,
+            ) + "\n"
+            return
+    finally:
+        if not task.done():
+            # The client disconnected mid-call
+            task.cancel()
+
+
+def tool_stream_endpoint(controller) -> Callable[[Request], Awaitable[Response]]:
+    """
+    POST /stream/tools/{name} with the tool arguments as a JSON object body.
+    Responds with NDJSON events (see tool_events) as the call progresses,
+    so the first bytes arrive long before a slow tool finishes. Calls are
+    recorded in the controller's metrics (track_call) like MCP calls.
+    """
+
+    async def run_tool(name: str, arguments: dict, progress: Optional[ProgressSink]) -> Any:
+        with controller.track_call(name):
+            return await controller.run_tool(name, arguments, progress)
+
+    async def stream_tool(request: Request) -> Response:
+        name = request.path_params["name"]
+        body = await request.body()
+        try:
+            arguments = json.loads(body) if body.strip() else {}
+        except json.JSONDecodeError as e:
+            return JSONResponse({"error": f"Invalid JSON body: {e}"}, status_code=400)
+        if not isinstance(arguments, dict):
+            return JSONResponse({"error": "Body must be a JSON object of tool arguments"}, status_code=400)
+        # Streams are not truncated, so the per-call budget does not apply
+        arguments.pop(BUDGET_ARGUMENT, None)
+        return StreamingResponse(
+            tool_events(run_tool, name, arguments, controller.config.output_format),
+            media_type="application/x-ndjson",
+        )
+
+    return stream_tool
@@ -7,6 +7,15 @@ import anyio
 from dotenv import load_dotenv
 from mcp.server.stdio import stdio_server
 
+from mcp_common.profiling import PROFILE_MODES
+from mcp_common.response_budget import parse_budgets
+from mcp_common.serialization import OUTPUT_FORMATS
+from moveworks_mcp.kb.dedup import DEFAULT_STRIP_QUERY_PARAMS
+from moveworks_mcp.kb.embeddings import EMBEDDING_BACKENDS, EMBEDDING_MODEL
+from moveworks_mcp.kb.indexer import DB_PATH, VECTOR_BACKENDS, VIEW_LABELS
+from moveworks_mcp.kb.rerank import RERANK_MODEL
+from moveworks_mcp.kb.search import DEFAULT_VIEW_WEIGHTS, FUSION_MODES
+from moveworks_mcp.kb.vector_store import VECTOR_DTYPES
 from moveworks_mcp.server import MoveworksMCP
 from moveworks_mcp.utils.config import ServerConfig
 
@@ -17,10 +26,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def parse_args():
-    parser = argparse.ArgumentParser(description="Moveworks MCP Server")
+def parse_view_weights(value: str) -> dict:
+    """Parse 'view=weight,...' into a dict, rejecting unknown view names."""
+    weights = {}
+    for pair in filter(None, (p.strip() for p in value.split(","))):
+        view, _, weight = pair.partition("=")
+        view = view.strip()
+        if view not in VIEW_LABELS:
+            raise argparse.ArgumentTypeError(
+                f"unknown view '{view}' (valid views: {', '.join(VIEW_LABELS)})"
+            )
+        try:
+            weights[view] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for '{view}': {weight!r}")
+    return weights
 
-    # Server configuration
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Register the options shared by the stdio and SSE entry points."""
     parser.add_argument(
         "--docs-base-url",
         help="Moveworks documentation base URL",
@@ -38,6 +62,311 @@ def parse_args():
         help="Request timeout in seconds",
         default=int(os.environ.get("MOVEWORKS_TIMEOUT", "30")),
     )
+    parser.add_argument(
+        "--output-format",
+        choices=list(OUTPUT_FORMATS),
+        help="Encoding of tool results: compact JSON, or indented JSON for reading by eye",
+        default=os.environ.get("MOVEWORKS_OUTPUT_FORMAT", "compact"),
+    )
+    parser.add_argument(
+        "--validate-tools",
+        action="store_true",
+        help="Build and check every tool schema at startup, failing fast on an invalid one",
+        default=os.environ.get("MOVEWORKS_VALIDATE_TOOLS", "false").lower() == "true",
+    )
+    parser.add_argument(
+        "--tracing",
+        action="store_true",
+        help="Report KB search, index and crawl stages as OpenTelemetry spans (needs opentelemetry-api)",
+        default=os.environ.get("MOVEWORKS_TRACING", "false").lower() == "true",
+    )
+
+    budget_group = parser.add_argument_group("Response budget")
+    budget_group.add_argument(
+        "--max-response-bytes",
+        type=int,
+        help="Largest tool response in bytes; bigger results are truncated with a continuation token (0 = unlimited)",
+        default=int(os.environ.get("MOVEWORKS_MAX_RESPONSE_BYTES", "0")),
+    )
+    budget_group.add_argument(
+        "--response-budgets",
+        type=parse_budgets,
+        help="Per-tool byte budgets as 'tool=bytes,...', overriding --max-response-bytes",
+        default=os.environ.get("MOVEWORKS_RESPONSE_BUDGETS", ""),
+    )
+    budget_group.add_argument(
+        "--continuation-ttl",
+        type=int,
+        help="Seconds the remainder of a truncated response can be fetched with fetch_continuation",
+        default=int(os.environ.get("MOVEWORKS_CONTINUATION_TTL", "300")),
+    )
+    budget_group.add_argument(
+        "--continuation-max-bytes",
+        type=int,
+        help="Total size of the truncated-response remainders kept for fetch_continuation; oldest evicted first",
+        default=int(os.environ.get("MOVEWORKS_CONTINUATION_MAX_BYTES", "64000000")),
+    )
+
+    profile_group = parser.add_argument_group(
+        "Profiling",
+        "Profile a fraction of tool calls and write one file per call; off unless a directory or rate is set.",
+    )
+    profile_group.add_argument(
+        "--profile-dir",
+        help="Directory for profile files; also offers the server_profiler admin tool",
+        default=os.environ.get("MOVEWORKS_PROFILE_DIR"),
+    )
+    profile_group.add_argument(
+        "--profile-rate",
+        type=float,
+        help="Fraction of tool calls to profile from startup (0-1)",
+        default=float(os.environ.get("MOVEWORKS_PROFILE_RATE", "0")),
+    )
+    profile_group.add_argument(
+        "--profile-mode",
+        choices=list(PROFILE_MODES),
+        help="'sample': wall-clock stack samples (.collapsed); 'cprofile': cProfile stats (.pstats)",
+        default=os.environ.get("MOVEWORKS_PROFILE_MODE", "sample"),
+    )
+    profile_group.add_argument(
+        "--profile-keep",
+        type=int,
+        help="Profile files kept per tool; older ones are deleted",
+        default=int(os.environ.get("MOVEWORKS_PROFILE_KEEP", "20")),
+    )
+    profile_group.add_argument(
+        "--profile-min-ms",
+        type=float,
+        help="Only keep profiles of calls that took at least this long",
+        default=float(os.environ.get("MOVEWORKS_PROFILE_MIN_MS", "0")),
+    )
+
+    parser.add_argument(
+        "--db-path",
+        help="Directory of the persistent knowledge base store",
+        default=os.environ.get("MOVEWORKS_DB_PATH", DB_PATH),
+    )
+
+    crawler_group = parser.add_argument_group("Crawler")
+    crawler_group.add_argument(
+        "--crawler-max-connections",
+        type=int,
+        help="Maximum open connections held by the shared crawler client",
+        default=int(os.environ.get("MOVEWORKS_CRAWLER_MAX_CONNECTIONS", "100")),
+    )
+    crawler_group.add_argument(
+        "--crawler-limit-per-host",
+        type=int,
+        help="Maximum concurrent connections to a single documentation host",
+        default=int(os.environ.get("MOVEWORKS_CRAWLER_LIMIT_PER_HOST", "8")),
+    )
+    crawler_group.add_argument(
+        "--crawler-dns-cache-ttl",
+        type=int,
+        help="Seconds to cache DNS lookups in the crawler client",
+        default=int(os.environ.get("MOVEWORKS_CRAWLER_DNS_CACHE_TTL", "300")),
+    )
+    crawler_group.add_argument(
+        "--crawler-keepalive-timeout",
+        type=float,
+        help="Seconds an idle crawler connection is kept open for reuse",
+        default=float(os.environ.get("MOVEWORKS_CRAWLER_KEEPALIVE_TIMEOUT", "30")),
+    )
+
+    hnsw_group = parser.add_argument_group(
+        "Vector index (HNSW)",
+        "Unset options keep Chroma's defaults. M and construction-ef apply to new "
+        "collections and to rebuilds run with the mw_kb_index_admin tool.",
+    )
+    hnsw_group.add_argument(
+        "--hnsw-m",
+        type=int,
+        help="Graph links per vector; higher improves recall at the cost of memory and build time",
+        default=os.environ.get("MOVEWORKS_HNSW_M"),
+    )
+    hnsw_group.add_argument(
+        "--hnsw-construction-ef",
+        type=int,
+        help="Candidate list size while building the graph",
+        default=os.environ.get("MOVEWORKS_HNSW_CONSTRUCTION_EF"),
+    )
+    hnsw_group.add_argument(
+        "--hnsw-search-ef",
+        type=int,
+        help="Candidate list size per query; higher improves recall at the cost of latency",
+        default=os.environ.get("MOVEWORKS_HNSW_SEARCH_EF"),
+    )
+    hnsw_group.add_argument(
+        "--hnsw-batch-size",
+        type=int,
+        help="Vectors buffered before they are added to the graph",
+        default=os.environ.get("MOVEWORKS_HNSW_BATCH_SIZE"),
+    )
+    hnsw_group.add_argument(
+        "--hnsw-sync-threshold",
+        type=int,
+        help="Vectors added between persisting the index to disk",
+        default=os.environ.get("MOVEWORKS_HNSW_SYNC_THRESHOLD"),
+    )
+    hnsw_group.add_argument(
+        "--hnsw-num-threads",
+        type=int,
+        help="Threads used to build the index",
+        default=os.environ.get("MOVEWORKS_HNSW_NUM_THREADS"),
+    )
+
+    vector_group = parser.add_argument_group("Vector store")
+    vector_group.add_argument(
+        "--vector-backend",
+        choices=list(VECTOR_BACKENDS),
+        help="Where chunk vectors are searched: chroma (HNSW) or numpy (exact search on a memory-mapped matrix)",
+        default=os.environ.get("MOVEWORKS_VECTOR_BACKEND", "chroma"),
+    )
+    vector_group.add_argument(
+        "--vector-dtype",
+        choices=list(VECTOR_DTYPES),
+        help="Storage precision of the numpy backend's matrix",
+        default=os.environ.get("MOVEWORKS_VECTOR_DTYPE", "float32"),
+    )
+
+    dedup_group = parser.add_argument_group("Duplicate detection")
+    dedup_group.add_argument(
+        "--dedup-strip-query-params",
+        type=lambda value: [p.strip() for p in value.split(",") if p.strip()],
+        help="Comma-separated query parameter globs dropped when canonicalizing URLs ('*' drops all)",
+        default=os.environ.get(
+            "MOVEWORKS_DEDUP_STRIP_QUERY_PARAMS", ",".join(DEFAULT_STRIP_QUERY_PARAMS)
+        ),
+    )
+    dedup_group.add_argument(
+        "--near-duplicate-distance",
+        type=int,
+        help="Max SimHash bit distance for two pages to count as duplicates (-1 disables)",
+        default=int(os.environ.get("MOVEWORKS_NEAR_DUPLICATE_DISTANCE", "3")),
+    )
+
+    embedding_group = parser.add_argument_group("Embeddings")
+    embedding_group.add_argument(
+        "--embedding-backend",
+        choices=list(EMBEDDING_BACKENDS),
+        help="Inference runtime for the embedding model (onnx-int8 = quantized ONNX on CPU)",
+        default=os.environ.get("MOVEWORKS_EMBEDDING_BACKEND", "torch"),
+    )
+    embedding_group.add_argument(
+        "--embedding-model",
+        help="sentence-transformers model name or path",
+        default=os.environ.get("MOVEWORKS_EMBEDDING_MODEL", EMBEDDING_MODEL),
+    )
+    embedding_group.add_argument(
+        "--embedding-model-file",
+        help="Model file inside the checkpoint, e.g. onnx/model_qint8_avx512.onnx",
+        default=os.environ.get("MOVEWORKS_EMBEDDING_MODEL_FILE"),
+    )
+    embedding_group.add_argument(
+        "--embedding-batch-size",
+        type=int,
+        help="Texts encoded per forward pass",
+        default=int(os.environ.get("MOVEWORKS_EMBEDDING_BATCH_SIZE", "32")),
+    )
+    embedding_group.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Load the KB store and embedding model in the background at startup",
+        default=os.environ.get("MOVEWORKS_WARMUP", "false").lower() == "true",
+    )
+    search_group = parser.add_argument_group("Search ranking")
+    search_group.add_argument(
+        "--search-fusion",
+        choices=list(FUSION_MODES),
+        help="How vector and keyword rankings are combined: linear (weighted scores) or rrf",
+        default=os.environ.get("MOVEWORKS_SEARCH_FUSION", "linear"),
+    )
+    search_group.add_argument(
+        "--search-rrf-k",
+        type=int,
+        help="RRF rank constant; larger values flatten the gap between top ranks",
+        default=int(os.environ.get("MOVEWORKS_SEARCH_RRF_K", "60")),
+    )
+    search_group.add_argument(
+        "--search-vector-depth",
+        type=int,
+        help="Nearest chunks fetched from the vector index per search",
+        default=int(os.environ.get("MOVEWORKS_SEARCH_VECTOR_DEPTH", "40")),
+    )
+    search_group.add_argument(
+        "--search-lexical-depth",
+        type=int,
+        help="Best keyword-matching pages fetched from the full-text index per search",
+        default=int(os.environ.get("MOVEWORKS_SEARCH_LEXICAL_DEPTH", "40")),
+    )
+    search_group.add_argument(
+        "--search-vector-weight",
+        type=float,
+        help="Weight of the vector ranking in fusion",
+        default=float(os.environ.get("MOVEWORKS_SEARCH_VECTOR_WEIGHT", "0.7")),
+    )
+    search_group.add_argument(
+        "--search-lexical-weight",
+        type=float,
+        help="Weight of the keyword ranking in fusion",
+        default=float(os.environ.get("MOVEWORKS_SEARCH_LEXICAL_WEIGHT", "0.3")),
+    )
+    search_group.add_argument(
+        "--search-view-weights",
+        type=parse_view_weights,
+        help="Per-view weights as view=weight pairs, e.g. 'breadcrumb=0.5,title_path=1,full_content=1'",
+        default=os.environ.get("MOVEWORKS_SEARCH_VIEW_WEIGHTS", ""),
+    )
+
+    rerank_group = parser.add_argument_group("Re-ranking")
+    rerank_group.add_argument(
+        "--rerank",
+        action="store_true",
+        help="Re-score top search candidates with a cross-encoder by default (callers can override per search)",
+        default=os.environ.get("MOVEWORKS_RERANK", "false").lower() == "true",
+    )
+    rerank_group.add_argument(
+        "--rerank-model",
+        help="sentence-transformers CrossEncoder model name or path",
+        default=os.environ.get("MOVEWORKS_RERANK_MODEL", RERANK_MODEL),
+    )
+    rerank_group.add_argument(
+        "--rerank-backend",
+        choices=["torch", "onnx", "openvino"],
+        help="Inference runtime for the re-ranking model",
+        default=os.environ.get("MOVEWORKS_RERANK_BACKEND", "torch"),
+    )
+    rerank_group.add_argument(
+        "--rerank-candidates",
+        type=int,
+        help="Top fused candidates considered for re-ranking",
+        default=int(os.environ.get("MOVEWORKS_RERANK_CANDIDATES", "20")),
+    )
+    rerank_group.add_argument(
+        "--rerank-budget-ms",
+        type=float,
+        help="Time budget per search for cross-encoder scoring; later batches are skipped once spent",
+        default=float(os.environ.get("MOVEWORKS_RERANK_BUDGET_MS", "60")),
+    )
+    rerank_group.add_argument(
+        "--rerank-batch-size",
+        type=int,
+        help="(query, passage) pairs scored per forward pass",
+        default=int(os.environ.get("MOVEWORKS_RERANK_BATCH_SIZE", "16")),
+    )
+    rerank_group.add_argument(
+        "--rerank-cache-size",
+        type=int,
+        help="(query, passage) scores kept in memory",
+        default=int(os.environ.get("MOVEWORKS_RERANK_CACHE_SIZE", "4096")),
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Moveworks MCP Server")
+
+    # Server configuration
+    add_server_arguments(parser)
 
     return parser.parse_args()
 
@@ -47,14 +376,63 @@ def create_config(args) -> ServerConfig:
         docs_base_url=args.docs_base_url,
         debug=args.debug,
         timeout=args.timeout,
+        output_format=args.output_format,
+        max_response_bytes=args.max_response_bytes,
+        response_budgets=args.response_budgets,
+        continuation_ttl_seconds=args.continuation_ttl,
+        continuation_max_bytes=args.continuation_max_bytes,
+        validate_tools=args.validate_tools,
+        tracing=args.tracing,
+        profile_dir=args.profile_dir,
+        profile_rate=args.profile_rate,
+        profile_mode=args.profile_mode,
+        profile_keep=args.profile_keep,
+        profile_min_ms=args.profile_min_ms,
+        db_path=args.db_path,
+        crawler_max_connections=args.crawler_max_connections,
+        crawler_limit_per_host=args.crawler_limit_per_host,
+        crawler_dns_cache_ttl=args.crawler_dns_cache_ttl,
+        crawler_keepalive_timeout=args.crawler_keepalive_timeout,
+        hnsw_m=args.hnsw_m,
+        hnsw_construction_ef=args.hnsw_construction_ef,
+        hnsw_search_ef=args.hnsw_search_ef,
+        hnsw_batch_size=args.hnsw_batch_size,
+        hnsw_sync_threshold=args.hnsw_sync_threshold,
+        hnsw_num_threads=args.hnsw_num_threads,
+        vector_backend=args.vector_backend,
+        vector_dtype=args.vector_dtype,
+        dedup_strip_query_params=args.dedup_strip_query_params,
+        near_duplicate_distance=args.near_duplicate_distance,
+        embedding_backend=args.embedding_backend,
+        embedding_model=args.embedding_model,
+        embedding_model_file=args.embedding_model_file,
+        embedding_batch_size=args.embedding_batch_size,
+        search_fusion=args.search_fusion,
+        search_rrf_k=args.search_rrf_k,
+        search_vector_depth=args.search_vector_depth,
+        search_lexical_depth=args.search_lexical_depth,
+        search_vector_weight=args.search_vector_weight,
+        search_lexical_weight=args.search_lexical_weight,
+        search_view_weights={**DEFAULT_VIEW_WEIGHTS, **args.search_view_weights},
+        rerank=args.rerank,
+        rerank_model=args.rerank_model,
+        rerank_backend=args.rerank_backend,
+        rerank_candidates=args.rerank_candidates,
+        rerank_budget_ms=args.rerank_budget_ms,
+        rerank_batch_size=args.rerank_batch_size,
+        rerank_cache_size=args.rerank_cache_size,
+        warmup=args.warmup,
     )
 
 
-async def arun_server(server_instance):
+async def arun_server(server_instance, mcp_controller: MoveworksMCP):
     logger.info("Starting Moveworks MCP server with stdio transport...")
-    async with stdio_server() as streams:
-        init_options = server_instance.create_initialization_options()
-        await server_instance.run(streams[0], streams[1], init_options)
+    try:
+        async with stdio_server() as streams:
+            init_options = server_instance.create_initialization_options()
+            await server_instance.run(streams[0], streams[1], init_options)
+    finally:
+        await mcp_controller.shutdown()
     logger.info("Stdio server finished.")
 
 
@@ -77,7 +455,7 @@ def main():
 
         server_to_run = mcp_controller.start()
 
-        anyio.run(arun_server, server_to_run)
+        anyio.run(arun_server, server_to_run, mcp_controller)
 
     except ValueError as e:
         logger.error(f"Configuration or runtime error: {e}")
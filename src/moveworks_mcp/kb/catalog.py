@@ -0,0 +1,281 @@
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from moveworks_mcp.kb.content_store import content_hash
+
+CATALOG_FILE = "kb_catalog.sqlite3"
+# Bump when the schema changes; an older catalog is dropped and rebuilt from the store
+SCHEMA_VERSION = 2
+# Upper bound for a text prefix range: U+10FFFF sorts after every valid character
+_PREFIX_END = "\U0010ffff"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Urls per SELECT ... IN (...); stays under SQLite's default variable limit
+_QUERY_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    url        TEXT NOT NULL UNIQUE,
+    domain     TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    breadcrumb TEXT NOT NULL,
+    simhash    TEXT,
+    text_hash  TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_domain_url ON pages (domain, url);
+-- Contentless full-text index for lexical (BM25) retrieval; rowid = pages.id.
+-- Only the tokens are kept: the text itself lives in the content store.
+CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(body, content = '', tokenize = 'unicode61');
+"""
+
+
+class PageCatalog:
+    """
+    SQLite side-index of page metadata and a full-text index, kept next to the Chroma store.
+
+    Listing, counting and domain lookups read from here instead of pulling
+    every metadata record out of the page collection. Rows are ordered by url
+    and paged with a keyset cursor (the last url returned), so each page of
+    results is an index range scan regardless of how many pages are indexed.
+    Page text is indexed in a contentless FTS5 table that serves as the
+    lexical retriever for search; the text itself is not stored here.
+    Removing an entry from a contentless table takes the text it was indexed
+    with, so writers pass the previous text of pages they replace or delete,
+    and text_hash records which text each entry holds. When that text is not
+    available the page gets a new id instead, leaving its old entry
+    unreachable until the catalog is next rebuilt; ids are never reused.
+    KBIndexer is the only writer and keeps the catalog in step with the page
+    collection.
+    """
+
+    def __init__(self, db_path: str):
+        Path(db_path).mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(Path(db_path) / CATALOG_FILE), check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            dropped = version != SCHEMA_VERSION
+            if dropped:
+                self._conn.execute("DROP TABLE IF EXISTS page_text")
+                self._conn.execute("DROP TABLE IF EXISTS pages")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+        if dropped and version:
+            # Older catalogs kept a copy of every page's text; give the space back
+            self._conn.execute("VACUUM")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def upsert(self, rows: list[dict], previous: dict[str, str] | None = None):
+        """
+        Insert or update pages; a row's optional "text" replaces its lexical index entry.
+
+        previous maps urls to the text their entries were last indexed with,
+        so replaced entries can be removed from the index.
+        """
+        previous = previous or {}
+        with self._lock, self._conn:
+            for row in rows:
+                text = row.get("text")
+                if text is not None:
+                    found = self._conn.execute(
+                        "SELECT id, text_hash FROM pages WHERE url = ?", (row["url"],)
+                    ).fetchone()
+                    if found is not None and not self._remove_text(found, previous.get(row["url"])):
+                        # Re-inserted below under a new id, away from the entry it cannot remove
+                        self._conn.execute("DELETE FROM pages WHERE id = ?", (found["id"],))
+                self._conn.execute(
+                    "INSERT INTO pages (url, domain, title, breadcrumb, simhash, text_hash) "
+                    "VALUES (:url, :domain, :title, :breadcrumb, :simhash, :text_hash) "
+                    "ON CONFLICT (url) DO UPDATE SET domain = excluded.domain, "
+                    "title = excluded.title, breadcrumb = excluded.breadcrumb, "
+                    "simhash = excluded.simhash, "
+                    "text_hash = COALESCE(excluded.text_hash, pages.text_hash)",
+                    {
+                        "simhash": None,
+                        **row,
+                        "text_hash": None if text is None else content_hash(text),
+                    },
+                )
+                if text is None:
+                    continue
+                page_id = self._conn.execute(
+                    "SELECT id FROM pages WHERE url = ?", (row["url"],)
+                ).fetchone()[0]
+                self._conn.execute(
+                    "INSERT INTO page_text (rowid, body) VALUES (?, ?)", (page_id, text)
+                )
+
+    def delete(self, urls: list[str], previous: dict[str, str] | None = None):
+        """Remove pages; previous maps urls to the text they were indexed with, as for upsert."""
+        previous = previous or {}
+        with self._lock, self._conn:
+            for url in urls:
+                found = self._conn.execute(
+                    "SELECT id, text_hash FROM pages WHERE url = ?", (url,)
+                ).fetchone()
+                if found is None:
+                    continue
+                self._remove_text(found, previous.get(url))
+                self._conn.execute("DELETE FROM pages WHERE id = ?", (found["id"],))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO page_text (page_text) VALUES ('delete-all')")
+            self._conn.execute("DELETE FROM pages")
+
+    def _remove_text(self, page: sqlite3.Row, text: str | None) -> bool:
+        """
+        Remove a page's full-text entry; False if it has one that cannot be removed.
+
+        A contentless FTS5 entry is removed by replaying the text it was
+        indexed with, which must be exactly that text: anything else would
+        corrupt the index, so it is checked against text_hash first.
+        """
+        if page["text_hash"] is None:
+            return True
+        if text is None or content_hash(text) != page["text_hash"]:
+            return False
+        self._conn.execute(
+            "INSERT INTO page_text (page_text, rowid, body) VALUES ('delete', ?, ?)",
+            (page["id"], text),
+        )
+        return True
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _where(
+        domain: str | None = None,
+        url_prefix: str | None = None,
+        breadcrumb_prefix: str | None = None,
+    ) -> tuple[list[str], list]:
+        clauses, args = [], []
+        if domain:
+            clauses.append("pages.domain = ?")
+            args.append(domain)
+        if url_prefix:
+            clauses.append("pages.url >= ? AND pages.url < ?")
+            args += [url_prefix, url_prefix + _PREFIX_END]
+        if breadcrumb_prefix:
+            escaped = (
+                breadcrumb_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            # LIKE is case-insensitive for ASCII, which suits navigation labels
+            clauses.append("pages.breadcrumb LIKE ? ESCAPE '\\'")
+            args.append(escaped + "%")
+        return clauses, args
+
+    def list_pages(
+        self,
+        domain: str | None = None,
+        url_prefix: str | None = None,
+        breadcrumb_prefix: str | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Return pages ordered by url, starting after the given cursor url."""
+        clauses, args = self._where(domain, url_prefix, breadcrumb_prefix)
+        if after:
+            clauses.append("url > ?")
+            args.append(after)
+        sql = "SELECT url, domain, title, breadcrumb FROM pages"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY url"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, args)]
+
+    def counts(
+        self,
+        domain: str | None = None,
+        url_prefix: str | None = None,
+        breadcrumb_prefix: str | None = None,
+    ) -> dict[str, int]:
+        """Return the number of matching pages per domain."""
+        clauses, args = self._where(domain, url_prefix, breadcrumb_prefix)
+        sql = "SELECT domain, COUNT(*) FROM pages"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY domain ORDER BY domain"
+        with self._lock:
+            return {row[0]: row[1] for row in self._conn.execute(sql, args)}
+
+    def urls(
+        self,
+        domain: str | None = None,
+        url_prefix: str | None = None,
+        breadcrumb_prefix: str | None = None,
+    ) -> list[str]:
+        clauses, args = self._where(domain, url_prefix, breadcrumb_prefix)
+        sql = "SELECT url FROM pages"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, args)]
+
+    def pages(self, urls: list[str]) -> dict[str, dict]:
+        """Return url -> {url, domain, title, breadcrumb} for the given urls that are indexed."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(urls), _QUERY_BATCH_SIZE):
+                batch = urls[start:start + _QUERY_BATCH_SIZE]
+                marks = ",".join("?" * len(batch))
+                for row in self._conn.execute(
+                    f"SELECT url, domain, title, breadcrumb FROM pages WHERE url IN ({marks})", batch
+                ):
+                    found[row["url"]] = dict(row)
+        return found
+
+    def fingerprints(self) -> list[tuple[str, str]]:
+        with self._lock:
+            return [
+                (row[0], row[1])
+                for row in self._conn.execute("SELECT url, simhash FROM pages WHERE simhash IS NOT NULL")
+            ]
+
+    def search_text(
+        self,
+        query: str,
+        limit: int,
+        domain: str | None = None,
+        breadcrumb_prefix: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """
+        BM25-rank page text against any of the query's terms.
+
+        Returns (url, score) pairs, best first; higher scores are better.
+        Filters are applied in the same statement as the full-text match.
+        """
+        terms = dict.fromkeys(_TOKEN_RE.findall(query.lower()))
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+
+        clauses, args = self._where(domain, None, breadcrumb_prefix)
+        sql = (
+            "SELECT pages.url, -bm25(page_text) FROM page_text "
+            "JOIN pages ON pages.id = page_text.rowid WHERE page_text MATCH ?"
+        )
+        if clauses:
+            sql += " AND " + " AND ".join(clauses)
+        sql += " ORDER BY bm25(page_text) LIMIT ?"
+        with self._lock:
+            return [(row[0], row[1]) for row in self._conn.execute(sql, [match, *args, limit])]
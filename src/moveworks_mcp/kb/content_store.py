@@ -0,0 +1,220 @@
+import hashlib
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+CONTENT_FILE = "kb_content.sqlite3"
+# Bump when the schema changes, adding the step from the previous version to
+# _MIGRATIONS. The store holds the only copy of page text, so it is migrated in
+# place and never dropped.
+SCHEMA_VERSION = 1
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+# Urls per SELECT ... IN (...); stays under SQLite's default variable limit
+QUERY_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash     TEXT PRIMARY KEY,
+    codec    TEXT NOT NULL,
+    raw_size INTEGER NOT NULL,
+    data     BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_content (
+    url  TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS page_content_hash ON page_content (hash);
+"""
+# Schema version -> SQL that upgrades a store at that version to the next one
+_MIGRATIONS: dict[int, str] = {}
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _batched(items: list, size: int = QUERY_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ContentStore:
+    """
+    Compressed, content-addressed store of full page text, next to the Chroma store.
+
+    Each distinct text is stored once as a blob keyed by its SHA-256, so pages
+    served under several urls share one copy; page_content maps each url to
+    its blob. Blobs are zstd-compressed when the zstandard package is
+    installed and zlib-compressed otherwise. The codec is recorded per blob,
+    so a store written with either one stays readable. A blob is deleted with
+    the last url that references it. KBIndexer is the only writer.
+    """
+
+    def __init__(self, db_path: str):
+        Path(db_path).mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(Path(db_path) / CONTENT_FILE), check_same_thread=False)
+        self._lock = threading.Lock()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+                if version == 0:
+                    self._conn.executescript(_SCHEMA)
+                    self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                else:
+                    self._migrate(version)
+        except Exception:
+            self._conn.close()
+            raise
+
+        try:
+            import zstandard
+        except ImportError:
+            self._zstd = None
+            self.codec = "zlib"
+        else:
+            self._zstd = zstandard
+            self.codec = "zstd"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM page_content").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self, version: int):
+        """Upgrade a store written at an older schema version, one step at a time."""
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{CONTENT_FILE} has schema version {version}, newer than the {SCHEMA_VERSION} "
+                "this server reads; upgrade the server to open this store"
+            )
+        missing = [step for step in range(version, SCHEMA_VERSION) if step not in _MIGRATIONS]
+        if missing:
+            raise RuntimeError(
+                f"{CONTENT_FILE} has schema version {version}, which cannot be migrated to "
+                f"{SCHEMA_VERSION}; move it aside and re-index to rebuild the store"
+            )
+        for step in range(version, SCHEMA_VERSION):
+            # Each step commits together with its version number
+            self._conn.executescript(
+                f"BEGIN; {_MIGRATIONS[step]}; PRAGMA user_version = {step + 1}; COMMIT;"
+            )
+
+    # ── codecs ───────────────────────────────────────────────────────────────
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self._zstd is not None:
+            # Compressor objects are not thread-safe; one per call is cheap
+            return self._zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+        return zlib.compress(raw, ZLIB_LEVEL)
+
+    def _decompress(self, codec: str, data: bytes) -> str:
+        if codec == "zlib":
+            return zlib.decompress(data).decode()
+        if self._zstd is None:
+            raise RuntimeError(
+                "Page text was stored with zstd; install the zstandard package to read it"
+            )
+        return self._zstd.ZstdDecompressor().decompress(data).decode()
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def put(self, texts: dict[str, str]) -> dict[str, str]:
+        """Store each url's text; returns url -> content hash."""
+        hashes = {url: content_hash(text) for url, text in texts.items()}
+        with self._lock, self._conn:
+            known = self._existing_hashes(list(set(hashes.values())))
+            new_blobs = {}
+            for url, text in texts.items():
+                digest = hashes[url]
+                if digest not in known and digest not in new_blobs:
+                    raw = text.encode()
+                    new_blobs[digest] = (self.codec, len(raw), self._compress(raw))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs (hash, codec, raw_size, data) VALUES (?, ?, ?, ?)",
+                [(digest, *blob) for digest, blob in new_blobs.items()],
+            )
+            replaced = self._hashes_of(list(hashes))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO page_content (url, hash) VALUES (?, ?)",
+                list(hashes.items()),
+            )
+            self._drop_orphans(set(replaced) - set(hashes.values()))
+        return hashes
+
+    def delete(self, urls: list[str]):
+        with self._lock, self._conn:
+            hashes = self._hashes_of(urls)
+            self._conn.executemany("DELETE FROM page_content WHERE url = ?", [(url,) for url in urls])
+            self._drop_orphans(set(hashes))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM page_content")
+            self._conn.execute("DELETE FROM blobs")
+
+    def _existing_hashes(self, hashes: list[str]) -> set[str]:
+        found = set()
+        for batch in _batched(hashes):
+            marks = ",".join("?" * len(batch))
+            found.update(
+                row[0] for row in self._conn.execute(f"SELECT hash FROM blobs WHERE hash IN ({marks})", batch)
+            )
+        return found
+
+    def _hashes_of(self, urls: list[str]) -> list[str]:
+        hashes = []
+        for batch in _batched(urls):
+            marks = ",".join("?" * len(batch))
+            hashes += [
+                row[0] for row in self._conn.execute(
+                    f"SELECT hash FROM page_content WHERE url IN ({marks})", batch
+                )
+            ]
+        return hashes
+
+    def _drop_orphans(self, hashes: set[str]):
+        self._conn.executemany(
+            "DELETE FROM blobs WHERE hash = ? "
+            "AND NOT EXISTS (SELECT 1 FROM page_content WHERE page_content.hash = blobs.hash)",
+            [(digest,) for digest in hashes],
+        )
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    def get(self, urls: list[str]) -> dict[str, str]:
+        """Return url -> text for the urls that have stored content."""
+        rows = []
+        with self._lock:
+            for batch in _batched(list(dict.fromkeys(urls))):
+                marks = ",".join("?" * len(batch))
+                rows += self._conn.execute(
+                    "SELECT page_content.url, blobs.codec, blobs.data FROM page_content "
+                    f"JOIN blobs ON blobs.hash = page_content.hash WHERE page_content.url IN ({marks})",
+                    batch,
+                ).fetchall()
+        # Decompress outside the lock so concurrent searches do not queue on it
+        return {url: self._decompress(codec, data) for url, codec, data in rows}
+
+    def urls(self) -> set[str]:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT url FROM page_content")}
+
+    def stats(self) -> dict:
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM page_content").fetchone()[0]
+            blobs, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "codec": self.codec,
+            "pages": pages,
+            "blobs": blobs,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+        }
@@ -4,10 +4,19 @@ import aiohttp
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from collections import deque
+from contextlib import asynccontextmanager
 import xml.etree.ElementTree as ET
+from typing import Awaitable, Callable, Optional
+
+from moveworks_mcp.kb.dedup import DEFAULT_STRIP_QUERY_PARAMS, canonicalize_url
+from moveworks_mcp.kb.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Awaited after each fetched page (crawl_multiple) or batch (crawl_domain)
+# with (pages done, total or None, last url)
+ProgressCallback = Optional[Callable[[int, Optional[int], str], Awaitable[None]]]
+
 # Browser-like headers so documentation sites don't block the crawler
 _HEADERS = {
     "User-Agent": (
@@ -20,26 +29,112 @@ _HEADERS = {
 }
 
 
-def _make_session() -> aiohttp.ClientSession:
-    """Return a ClientSession with browser headers and SSL verification relaxed."""
-    connector = aiohttp.TCPConnector(ssl=False)
+def _make_session(
+    limit: int = 100,
+    limit_per_host: int = 0,
+    ttl_dns_cache: int | None = 10,
+    keepalive_timeout: float = 15.0,
+) -> aiohttp.ClientSession:
+    """Return a ClientSession with browser headers and SSL verification relaxed.
+
+    aiohttp advertises and transparently decodes gzip/deflate responses, and
+    brotli as well when the Brotli package is installed.
+    """
+    connector = aiohttp.TCPConnector(
+        ssl=False,
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=ttl_dns_cache,
+        keepalive_timeout=keepalive_timeout,
+    )
     return aiohttp.ClientSession(headers=_HEADERS, connector=connector)
 
 
+class CrawlerClient:
+    """
+    Long-lived HTTP client shared by every DocCrawler the server creates.
+
+    The underlying ClientSession is opened lazily on first use (it must be
+    created inside the running event loop) and keeps connections alive between
+    tool calls, so repeat crawls of the same site skip DNS and TLS setup.
+    Call close() on shutdown.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.closed:
+            self._session = _make_session(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+        return self._session
+
+    async def close(self):
+        if not self.closed:
+            await self._session.close()
+        self._session = None
+
+
 class DocCrawler:
-    def __init__(self, base_url: str, max_pages: int = 1000):
+    def __init__(
+        self,
+        base_url: str,
+        max_pages: int = 1000,
+        client: CrawlerClient | None = None,
+        strip_query_params=DEFAULT_STRIP_QUERY_PARAMS,
+    ):
         self.base_url = base_url.rstrip("/")
-        self.domain = urlparse(base_url).netloc
+        self.domain = urlparse(base_url).netloc.lower()
         self.max_pages = max_pages
+        self.client = client
+        self.strip_query_params = tuple(strip_query_params)
         self.visited: set[str] = set()
 
+    @asynccontextmanager
+    async def _session(self):
+        """Yield the shared client session, or a throwaway one when no client was given."""
+        if self.client is not None:
+            yield self.client.get_session()
+        else:
+            async with _make_session() as session:
+                yield session
+
     async def crawl_url(self, url: str) -> dict | None:
-        async with _make_session() as session:
+        async with self._session() as session:
             return await self._fetch_page(session, url)
 
-    async def crawl_multiple(self, urls: list[str]) -> dict[str, dict]:
-        async with _make_session() as session:
-            tasks = [self._fetch_page(session, url) for url in urls]
+    async def crawl_multiple(self, urls: list[str], on_progress: ProgressCallback = None) -> dict[str, dict]:
+        done = 0
+
+        async def fetch(session, url):
+            nonlocal done
+            try:
+                return await self._fetch_page(session, url)
+            finally:
+                done += 1
+                if on_progress is not None:
+                    await on_progress(done, len(urls), url)
+
+        async with self._session() as session:
+            tasks = [fetch(session, url) for url in urls]
             results = await asyncio.gather(*tasks, return_exceptions=True)
         pages = {}
         for url, result in zip(urls, results):
@@ -49,18 +144,19 @@ class DocCrawler:
                 logger.warning("Skipped %s — %s", url, result)
         return pages
 
-    async def crawl_domain(self, sitemap_url: str = None) -> dict[str, dict]:
+    async def crawl_domain(self, sitemap_url: str = None, on_progress: ProgressCallback = None) -> dict[str, dict]:
         urls_to_crawl = []
         if sitemap_url:
             urls_to_crawl = await self._parse_sitemap(sitemap_url)
         if not urls_to_crawl:
             urls_to_crawl = [self.base_url]
 
+        urls_to_crawl = list(dict.fromkeys(self.canonicalize(u) for u in urls_to_crawl))
         queue = deque(urls_to_crawl)
         pages = {}
         seen = set(urls_to_crawl)
 
-        async with _make_session() as session:
+        async with self._session() as session:
             while queue and len(pages) < self.max_pages:
                 batch = []
                 for _ in range(min(10, len(queue))):
@@ -72,7 +168,14 @@ class DocCrawler:
 
                 for url, result in zip(batch, results):
                     if isinstance(result, dict):
-                        pages[url] = result
+                        # The page may declare a different canonical URL (print
+                        # views, versioned aliases); keep only the first copy.
+                        canonical = result["url"]
+                        seen.add(canonical)
+                        if canonical in pages:
+                            logger.debug("Skipped %s — alias of %s", url, canonical)
+                            continue
+                        pages[canonical] = result
                         for link in result.get("links", []):
                             if link not in seen:
                                 seen.add(link)
@@ -80,11 +183,15 @@ class DocCrawler:
                     else:
                         logger.warning("Skipped %s — %s", url, result)
 
+                if on_progress is not None:
+                    # The total is unknown until the queue drains
+                    await on_progress(len(pages), None, batch[-1])
+
         return pages
 
     async def _parse_sitemap(self, sitemap_url: str) -> list[str]:
         try:
-            async with _make_session() as session:
+            async with self._session() as session:
                 async with session.get(
                     sitemap_url,
                     timeout=aiohttp.ClientTimeout(total=15),
@@ -104,23 +211,38 @@ class DocCrawler:
 
     async def _fetch_page(self, session: aiohttp.ClientSession, url: str) -> dict | None:
         try:
-            async with session.get(
-                url,
-                timeout=aiohttp.ClientTimeout(total=15),
-                allow_redirects=True,
-            ) as resp:
-                if resp.status != 200:
-                    logger.warning("HTTP %s for %s", resp.status, url)
-                    return None
-                html = await resp.text()
+            with span("kb.crawl.fetch", url=url):
+                async with session.get(
+                    url,
+                    timeout=aiohttp.ClientTimeout(total=15),
+                    allow_redirects=True,
+                ) as resp:
+                    if resp.status != 200:
+                        logger.warning("HTTP %s for %s", resp.status, url)
+                        return None
+                    html = await resp.text()
             logger.debug("Fetched %s (%d chars)", url, len(html))
-            return self._parse_page(url, html)
+            with span("kb.crawl.parse", url=url):
+                return self._parse_page(url, html)
         except Exception as e:
             logger.warning("Fetch error for %s: %s", url, e)
             return None
 
+    def canonicalize(self, url: str) -> str:
+        return canonicalize_url(url, self.strip_query_params)
+
+    def _canonical_url(self, soup: BeautifulSoup, url: str) -> str:
+        """Honour <link rel="canonical"> when it points inside the crawled domain."""
+        link = soup.find("link", rel="canonical", href=True)
+        if link:
+            canonical = self.canonicalize(urljoin(url, link["href"]))
+            if urlparse(canonical).netloc == self.domain:
+                return canonical
+        return self.canonicalize(url)
+
     def _parse_page(self, url: str, html: str) -> dict:
         soup = BeautifulSoup(html, "html.parser")
+        canonical_url = self._canonical_url(soup, url)
         for tag in soup.select("script, style, iframe"):
             tag.decompose()
 
@@ -142,12 +264,13 @@ class DocCrawler:
 
         links = []
         for a in soup.find_all("a", href=True):
-            full = urljoin(url, a["href"]).split("#")[0].rstrip("/")
+            full = self.canonicalize(urljoin(url, a["href"]))
             if urlparse(full).netloc == self.domain and full not in links:
                 links.append(full)
 
         return {
-            "url": url,
+            "url": canonical_url,
+            "fetched_url": url,
             "title": title,
             "breadcrumb": breadcrumb,
             "content": content,
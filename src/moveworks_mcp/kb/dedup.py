@@ -0,0 +1,142 @@
+import hashlib
+import re
+from fnmatch import fnmatch
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Query parameters that never change page content on documentation sites
+DEFAULT_STRIP_QUERY_PARAMS = (
+    "utm_*",
+    "gclid",
+    "fbclid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "ref_src",
+    "source",
+    "print",
+)
+
+SIMHASH_BITS = 64
+# Texts shorter than this only match on an identical fingerprint; a handful of
+# words is not enough signal to call two different pages near-duplicates.
+MIN_WORDS_FOR_NEAR_MATCH = 20
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+# ── URL canonicalization ─────────────────────────────────────────────────────
+
+
+def canonicalize_url(url: str, strip_params=DEFAULT_STRIP_QUERY_PARAMS) -> str:
+    """
+    Normalize a URL so trivially different spellings of one page compare equal.
+
+    Lower-cases scheme and host, drops default ports, fragments and trailing
+    slashes, removes query parameters matching any glob in strip_params
+    ("*" strips the whole query string) and sorts the remaining parameters.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+
+    path = re.sub(r"/{2,}", "/", parsed.path).rstrip("/")
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not any(fnmatch(key.lower(), pattern) for pattern in strip_params)
+    ]
+    query.sort()
+
+    return urlunparse((scheme, host, path, "", urlencode(query), ""))
+
+
+# ── content fingerprinting ───────────────────────────────────────────────────
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Return a 64-bit SimHash over word shingles of text."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [
+            " ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)
+        ]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def word_count(text: str) -> int:
+    return len(_WORD_RE.findall(text))
+
+
+class FingerprintIndex:
+    """
+    In-memory lookup of SimHash fingerprints by Hamming distance.
+
+    Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+    principle two fingerprints within max_distance bits agree exactly on at
+    least one band, so only keys sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self._bands = max_distance + 1
+        self._band_bits = -(-SIMHASH_BITS // self._bands)
+        self._buckets: list[dict[int, set[str]]] = [{} for _ in range(self._bands)]
+        self._fingerprints: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _band_values(self, fingerprint: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(fingerprint >> (i * self._band_bits)) & mask for i in range(self._bands)]
+
+    def add(self, key: str, fingerprint: int):
+        self.discard(key)
+        self._fingerprints[key] = fingerprint
+        for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+            bucket.setdefault(value, set()).add(key)
+
+    def discard(self, key: str):
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+            keys = bucket.get(value)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del bucket[value]
+
+    def find(self, fingerprint: int, exclude: str | None = None, exact: bool = False) -> str | None:
+        """Return the key of a stored fingerprint close enough to count as a duplicate."""
+        limit = 0 if exact else self.max_distance
+        best_key, best_distance = None, limit + 1
+        for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+            for key in bucket.get(value, ()):
+                if key == exclude:
+                    continue
+                distance = hamming_distance(fingerprint, self._fingerprints[key])
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+        return best_key
@@ -0,0 +1,102 @@
+import abc
+import logging
+import platform
+
+import numpy as np
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8", "openvino")
+
+logger = logging.getLogger(__name__)
+
+
+def default_int8_model_file() -> str:
+    """Pick the dynamically quantized ONNX export shipped for this CPU architecture."""
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+class EmbeddingBackend(abc.ABC):
+    """
+    Turns batches of text into a float32 matrix with one L2-normalized row per text.
+
+    The indexer and the searcher share a single backend instance, so every
+    implementation must be safe to call from several threads.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 matrix of L2-normalized rows."""
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    sentence-transformers model run on PyTorch, ONNX Runtime or OpenVINO.
+
+    Every runtime loads the same checkpoint with the same pooling and
+    normalization, so vectors stay interchangeable with an index built on
+    another backend. The int8 variant uses the quantized ONNX exports
+    published alongside the model.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        backend: str = "torch",
+        model_file: str | None = None,
+        batch_size: int = 32,
+    ):
+        from sentence_transformers import SentenceTransformer
+
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(
+                f"Unknown embedding backend '{backend}'. Valid backends: {list(EMBEDDING_BACKENDS)}"
+            )
+
+        kwargs = {}
+        if backend == "onnx-int8":
+            model_file = model_file or default_int8_model_file()
+            kwargs["backend"] = "onnx"
+        elif backend != "torch":
+            kwargs["backend"] = backend
+        if model_file:
+            kwargs["model_kwargs"] = {"file_name": model_file}
+
+        self.name = backend
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, **kwargs)
+        logger.info(
+            "Loaded embedding model %s (backend=%s%s)",
+            model_name, backend, f", file={model_file}" if model_file else "",
+        )
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+
+def create_embedding_backend(
+    backend: str = "torch",
+    model_name: str = EMBEDDING_MODEL,
+    model_file: str | None = None,
+    batch_size: int = 32,
+) -> EmbeddingBackend:
+    return SentenceTransformerBackend(
+        model_name=model_name,
+        backend=backend,
+        model_file=model_file,
+        batch_size=batch_size,
+    )
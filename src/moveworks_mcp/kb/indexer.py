@@ -1,38 +1,409 @@
 import hashlib
 import logging
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Iterator
+
+from moveworks_mcp.kb.catalog import PageCatalog
+from moveworks_mcp.kb.content_store import ContentStore, content_hash
+from moveworks_mcp.kb.dedup import (
+    MIN_WORDS_FOR_NEAR_MATCH,
+    FingerprintIndex,
+    simhash,
+    word_count,
+)
+from moveworks_mcp.kb.embeddings import EmbeddingBackend, create_embedding_backend
+from moveworks_mcp.kb.tracing import span
+from moveworks_mcp.kb.vector_store import NumpyVectorStore
 
 
 DB_PATH = str(Path(__file__).parent.parent / "data" / "chroma_db")
 CHUNK_COLLECTION = "mw_chunks"
 PAGE_COLLECTION = "mw_pages"
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+VIEW_LABELS = ("breadcrumb", "title_path", "full_content")
+# Where chunk vectors are searched: Chroma's HNSW index or an exact NumPy matrix
+VECTOR_BACKENDS = ("chroma", "numpy")
+# Records the backend that last held the chunk vectors, so a switch can resync the other
+VECTOR_BACKEND_FILE = "kb_vector_backend"
+# Pages embedded and upserted per store round-trip in index_pages
+WRITE_BATCH_PAGES = 64
+# Ids per get/delete call; stays under Chroma's default max batch size (5461)
+ID_BATCH_SIZE = 5000
+# A rebuild copies a collection into "<name>_rebuild" and swaps it in
+REBUILD_SUFFIX = "_rebuild"
+
+# HNSW settings accepted by KBIndexer and the collection metadata keys they map
+# to. M and construction_ef only take effect when a collection is (re)built;
+# search_ef is also applied to existing collections on chromadb >= 1.0.
+HNSW_METADATA_KEYS = {
+    "space": "hnsw:space",
+    "M": "hnsw:M",
+    "construction_ef": "hnsw:construction_ef",
+    "search_ef": "hnsw:search_ef",
+    "batch_size": "hnsw:batch_size",
+    "sync_threshold": "hnsw:sync_threshold",
+    "num_threads": "hnsw:num_threads",
+}
 
 logger = logging.getLogger(__name__)
 
 
+def chunk_id(url: str, view: int) -> str:
+    """Deterministic id of one view of a page in the chunk collection."""
+    return hashlib.md5(f"{url}::view::{view}".encode()).hexdigest()
+
+
+def _batched(items: list, size: int = ID_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 class KBIndexer:
-    def __init__(self):
+    """
+    Page and chunk store for the Moveworks KB.
+
+    One instance is meant to be shared by everything in the process (tools,
+    KBSearch, warm-up). Writes and removals are serialized on self.lock; reads
+    go straight to the store, through reading() when they use a Chroma
+    collection handle, so a rebuild never drops a collection under them.
+    Call close() to release the store and the model.
+
+    The embedding model is only loaded the first time a page is written or a
+    query is encoded, so store-only operations (exists/list/remove/fetch) never
+    pay for it. Pass embedder to share an already-loaded backend, or
+    embedder_factory to defer creating one.
+
+    Chunk vectors are searched through Chroma's HNSW index by default. With
+    vector_backend="numpy" they live in a NumpyVectorStore instead (exact
+    search on a memory-mapped matrix), seeded from the Chroma chunk
+    collection on first open; page records always stay in Chroma.
+
+    Full page text is kept out of Chroma, in a compressed content-addressed
+    ContentStore; Chroma page records carry only metadata and the text's
+    content hash. Fetching results reads metadata from the catalog and text
+    from the content store, without touching Chroma.
+    """
+
+    def __init__(
+        self,
+        near_duplicate_distance: int = 3,
+        embedder: EmbeddingBackend | None = None,
+        embedder_factory: Callable[[], EmbeddingBackend] | None = None,
+        db_path: str = DB_PATH,
+        hnsw_settings: dict[str, int | str] | None = None,
+        vector_backend: str = "chroma",
+        vector_dtype: str = "float32",
+    ):
+        # chromadb takes around a second to import; keep it off the server's import path
+        import chromadb
+        from chromadb.config import Settings
+
         self.client = chromadb.PersistentClient(
-            path=DB_PATH,
+            path=db_path,
             settings=Settings(anonymized_telemetry=False)
         )
-        self.chunks = self.client.get_or_create_collection(
-            CHUNK_COLLECTION,
-            metadata={"hnsw:space": "cosine"}
-        )
-        self.pages = self.client.get_or_create_collection(PAGE_COLLECTION)
-        self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+        unknown = set(hnsw_settings or {}) - set(HNSW_METADATA_KEYS)
+        if unknown:
+            raise ValueError(
+                f"Unknown HNSW setting(s) {sorted(unknown)}. Valid settings: {list(HNSW_METADATA_KEYS)}"
+            )
+        self.hnsw_settings = {
+            "space": "cosine",
+            **{k: v for k, v in (hnsw_settings or {}).items() if v is not None},
+        }
+        if vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(
+                f"Unknown vector backend '{vector_backend}'. Valid backends: {list(VECTOR_BACKENDS)}"
+            )
+        self.vector_backend = vector_backend
+        self.chunks = self._open_collection(CHUNK_COLLECTION)
+        self.pages = self._open_collection(PAGE_COLLECTION)
+        backend_file = Path(db_path) / VECTOR_BACKEND_FILE
+        last_backend = backend_file.read_text().strip() if backend_file.exists() else None
+        if vector_backend == "numpy":
+            self.chunks = self._open_vector_store(db_path, vector_dtype, resync=last_backend == "chroma")
+        elif last_backend == "numpy":
+            store = NumpyVectorStore(db_path, CHUNK_COLLECTION, dtype=vector_dtype)
+            try:
+                copied = self._sync_vectors(store, self.chunks)
+            finally:
+                store.close()
+            logger.info("Copied %d chunk vectors from the NumPy store back into Chroma", copied)
+        # Written once the active backend holds every vector, so an interrupted sync is redone
+        backend_file.write_text(vector_backend)
+        self._embedder = embedder
+        self._embedder_factory = embedder_factory or create_embedding_backend
+        self._embedder_lock = threading.Lock()
+        self.lock = threading.RLock()
+        # Readers in flight per collection handle (by id), so a rebuild can retire the old one
+        self._handles = threading.Condition()
+        self._readers: Counter = Counter()
+        # Negative distance disables content-based duplicate detection
+        self.near_duplicate_distance = near_duplicate_distance
+        self._fingerprints: FingerprintIndex | None = None
+
+        self.content = ContentStore(db_path)
+        if len(self.content) < self.pages.count():
+            self._import_page_text()
+        self.catalog = PageCatalog(db_path)
+        if len(self.catalog) != self.pages.count():
+            self._rebuild_catalog()
+
+    @property
+    def embedder(self) -> EmbeddingBackend:
+        if self._embedder is None:
+            with self._embedder_lock:
+                if self._embedder is None:
+                    self._embedder = self._embedder_factory()
+        return self._embedder
+
+    @property
+    def embedder_loaded(self) -> bool:
+        return self._embedder is not None
+
+    def close(self):
+        """Release the store client and drop the embedding model reference."""
+        with self.lock:
+            if self.vector_backend == "numpy":
+                self.chunks.close()
+            close = getattr(self.client, "close", None)  # chromadb >= 1.1
+            if close is not None:
+                close()
+            self.catalog.close()
+            self.content.close()
+            self._embedder = None
+            self._fingerprints = None
+
+    # ── collections and ANN index settings ──────────────────────────────────
+
+    def _collection_metadata(self) -> dict:
+        return {HNSW_METADATA_KEYS[key]: value for key, value in self.hnsw_settings.items()}
+
+    def _collection_names(self) -> set[str]:
+        # list_collections() returns names on chromadb >= 0.6 and Collection objects before
+        return {getattr(c, "name", c) for c in self.client.list_collections()}
+
+    def _open_collection(self, name: str):
+        """Open a collection, creating it with the configured HNSW settings if missing."""
+        names = self._collection_names()
+        staging = name + REBUILD_SUFFIX
+        if staging in names:
+            if name in names:
+                # A rebuild was interrupted before the swap; the copy is incomplete
+                self.client.delete_collection(staging)
+            else:
+                # Interrupted after the old collection was dropped; finish the swap
+                self.client.get_collection(staging).modify(name=name)
+                names.add(name)
+            logger.warning("Recovered from an interrupted rebuild of %s", name)
+
+        if name not in names:
+            return self.client.create_collection(name, metadata=self._collection_metadata())
+
+        collection = self.client.get_collection(name)
+        self._apply_search_ef(collection)
+        return collection
+
+    def _open_vector_store(self, db_path: str, dtype: str, resync: bool = False) -> NumpyVectorStore:
+        """
+        Open the NumPy chunk store, importing the Chroma chunk vectors the first
+        time and again whenever the index was last written with the Chroma
+        backend (resync), since any vectors it holds are then out of date.
+        """
+        store = NumpyVectorStore(db_path, CHUNK_COLLECTION, dtype=dtype)
+        if resync or (store.count() == 0 and self.chunks.count() > 0):
+            imported = self._sync_vectors(self.chunks, store)
+            logger.info("Imported %d chunk vectors from Chroma into the NumPy store", imported)
+        return store
+
+    @staticmethod
+    def _sync_vectors(source, target) -> int:
+        """Make target hold exactly the vectors of source (either backend); returns the number copied."""
+        copied = 0
+        while True:
+            batch = source.get(include=["embeddings", "metadatas"], limit=ID_BATCH_SIZE, offset=copied)
+            if not batch or not batch["ids"]:
+                break
+            target.upsert(ids=batch["ids"], embeddings=batch["embeddings"], metadatas=batch["metadatas"])
+            copied += len(batch["ids"])
+
+        if target.count() > copied:
+            # Every source vector was just written; whatever else the target holds is stale
+            kept = set(source.get(include=[])["ids"])
+            stale = [id_ for id_ in target.get(include=[])["ids"] if id_ not in kept]
+            for ids in _batched(stale):
+                target.delete(ids=ids)
+        return copied
+
+    def _import_page_text(self):
+        """Move page text stored as Chroma documents (by older versions) into the content store."""
+        stored = self.content.urls()
+        imported = offset = 0
+        while True:
+            batch = self.pages.get(include=["documents"], limit=ID_BATCH_SIZE, offset=offset)
+            if not batch or not batch["ids"]:
+                break
+            texts = {
+                url: doc for url, doc in zip(batch["ids"], batch["documents"]) if doc and url not in stored
+            }
+            if texts:
+                self.content.put(texts)
+                imported += len(texts)
+            offset += len(batch["ids"])
+        if imported:
+            logger.info(
+                "Moved the text of %d pages into the content store; rebuild the 'pages' "
+                "collection with mw_kb_index_admin to reclaim its space in Chroma",
+                imported,
+            )
+
+    def _apply_search_ef(self, collection):
+        search_ef = self.hnsw_settings.get("search_ef")
+        configuration = getattr(collection, "configuration", None)
+        if search_ef is None or not isinstance(configuration, dict):
+            return
+        hnsw = configuration.get("hnsw") or {}
+        if hnsw.get("ef_search") == search_ef:
+            return
+        try:
+            collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+        except Exception as e:
+            logger.warning("Could not set search_ef on %s (rebuild to apply): %s", collection.name, e)
+
+    @contextmanager
+    def reading(self, which: str) -> Iterator:
+        """The current "chunks" or "pages" handle, kept alive by a rebuild until the block exits."""
+        with self._handles:
+            collection = getattr(self, which)
+            self._readers[id(collection)] += 1
+        try:
+            yield collection
+        finally:
+            with self._handles:
+                self._readers[id(collection)] -= 1
+                if not self._readers[id(collection)]:
+                    del self._readers[id(collection)]
+                    self._handles.notify_all()
+
+    def index_stats(self) -> dict:
+        """Record counts and effective HNSW settings of both collections."""
+        stats = {}
+        for key in ("chunks", "pages"):
+            collection = getattr(self, key)
+            if isinstance(collection, NumpyVectorStore):
+                stats[key] = collection.stats()
+                continue
+            configuration = getattr(collection, "configuration", None)
+            if isinstance(configuration, dict) and configuration.get("hnsw"):
+                hnsw = dict(configuration["hnsw"])
+            else:
+                hnsw = {
+                    k: v for k, v in (collection.metadata or {}).items() if k.startswith("hnsw:")
+                }
+            stats[key] = {"name": collection.name, "count": collection.count(), "hnsw": hnsw}
+        stats["content"] = self.content.stats()
+        return stats
+
+    def rebuild_collection(self, which: str) -> dict:
+        """
+        Rebuild the "chunks" or "pages" collection with the configured HNSW settings.
+
+        With the NumPy vector backend, rebuilding "chunks" compacts its matrix
+        instead (dropping deleted rows and converting to the configured dtype).
+
+        Records are copied with their stored embeddings (nothing is re-encoded)
+        into a fresh collection that then replaces the old one. This applies
+        changed build parameters (M, construction_ef, space), compacts away
+        the index entries left behind by deletes and updates, and drops any
+        page text older versions stored as Chroma documents (it lives in the
+        content store). Writes are blocked for the duration; searches keep
+        using the old collection until the copy is swapped in, and the old
+        one is dropped only once the searches already reading it are done.
+        """
+        if which not in ("chunks", "pages"):
+            raise ValueError(f"Unknown collection '{which}'. Valid collections: ['chunks', 'pages']")
+        name = CHUNK_COLLECTION if which == "chunks" else PAGE_COLLECTION
+
+        with self.lock:
+            start = time.perf_counter()
+            source = getattr(self, which)
+            if isinstance(source, NumpyVectorStore):
+                compacted = source.compact()
+                elapsed = time.perf_counter() - start
+                return {"collection": name, "records": compacted["rows"], "seconds": round(elapsed, 2)}
+
+            staging_name = name + REBUILD_SUFFIX
+            if staging_name in self._collection_names():
+                self.client.delete_collection(staging_name)
+            staging = self.client.create_collection(staging_name, metadata=self._collection_metadata())
+
+            copied = 0
+            while True:
+                batch = source.get(
+                    include=["embeddings", "metadatas"],
+                    limit=ID_BATCH_SIZE,
+                    offset=copied,
+                )
+                if not batch or not batch["ids"]:
+                    break
+                staging.add(
+                    ids=batch["ids"],
+                    embeddings=batch["embeddings"],
+                    metadatas=batch["metadatas"],
+                )
+                copied += len(batch["ids"])
+
+            # Handles address collections by id, so the copy serves reads before it takes the name
+            with self._handles:
+                setattr(self, which, staging)
+                self._handles.wait_for(lambda: not self._readers[id(source)])
+            self.client.delete_collection(name)
+            staging.modify(name=name)
+
+            elapsed = time.perf_counter() - start
+            logger.info("Rebuilt %s: %d records in %.2fs", name, copied, elapsed)
+            return {"collection": name, "records": copied, "seconds": round(elapsed, 2)}
 
     # ── existence check ──────────────────────────────────────────────────────
 
     def page_exists(self, url: str) -> bool:
         """Return True if this URL is already in the page store."""
-        result = self.pages.get(ids=[url], include=[])
-        return bool(result and result["ids"])
+        return url in self.existing_urls([url])
+
+    def existing_urls(self, urls: list[str]) -> set[str]:
+        """Return the subset of urls already in the page store, one get per ID_BATCH_SIZE urls."""
+        found: set[str] = set()
+        with self.reading("pages") as pages:
+            for batch in _batched(list(dict.fromkeys(urls))):
+                result = pages.get(ids=batch, include=[])
+                if result and result["ids"]:
+                    found.update(result["ids"])
+        return found
+
+    # ── duplicate detection ──────────────────────────────────────────────────
+
+    def _fingerprint_index(self) -> FingerprintIndex:
+        """Build the SimHash index from stored page metadata on first use."""
+        with self.lock:
+            return self._load_fingerprint_index()
+
+    def _load_fingerprint_index(self) -> FingerprintIndex:
+        if self._fingerprints is None:
+            index = FingerprintIndex(max_distance=self.near_duplicate_distance)
+            for url, fingerprint in self.catalog.fingerprints():
+                index.add(url, int(fingerprint, 16))
+            self._fingerprints = index
+        return self._fingerprints
+
+    def find_duplicate(self, url: str, content: str) -> str | None:
+        """Return the URL of an indexed page whose text is a near-duplicate of content."""
+        if self.near_duplicate_distance < 0 or not content.strip():
+            return None
+        exact = word_count(content) < MIN_WORDS_FOR_NEAR_MATCH
+        return self._fingerprint_index().find(simhash(content), exclude=url, exact=exact)
 
     # ── indexing ─────────────────────────────────────────────────────────────
 
@@ -41,131 +412,277 @@ class KBIndexer:
         Index a single page.
 
         Returns the URL if the page was indexed, or None if it was skipped
-        because it already exists and force=False (default).
+        because it already exists and force=False (default), or because its
+        content is a near-duplicate of another indexed page.
         """
         url = page["url"]
 
-        if not force and self.page_exists(url):
-            logger.debug("Skipping already-indexed page: %s", url)
-            return None
+        with span("kb.index.page"), self.lock:
+            if not force and self.page_exists(url):
+                logger.debug("Skipping already-indexed page: %s", url)
+                return None
 
-        title = page["title"]
-        breadcrumb = page["breadcrumb"]
-        content = page["content"]
+            duplicate_of = self.find_duplicate(url, page["content"])
+            if duplicate_of:
+                logger.debug("Skipping near-duplicate page: %s (of %s)", url, duplicate_of)
+                return None
 
-        enriched_content = f"Navigation: {breadcrumb}\nTitle: {title}\n\n{content}"
+            self._write_pages([page])
+        return url
 
-        self.pages.upsert(
-            ids=[url],
-            documents=[enriched_content],
-            metadatas=[{
+    def _write_pages(self, pages: list[dict]):
+        """
+        Embed every view of every page in one batch and upsert with one call per
+        collection. Page text goes to the content store; Chroma gets vectors and
+        metadata only.
+        """
+        page_ids, page_docs, page_metas, fingerprints = [], [], [], []
+        chunk_ids, chunk_docs, chunk_metas = [], [], []
+        full_content_rows: list[int] = []
+
+        for page in pages:
+            url = page["url"]
+            title = page["title"]
+            breadcrumb = page["breadcrumb"]
+            domain = self._extract_domain(url)
+            fingerprint = simhash(page["content"])
+
+            enriched_content = f"Navigation: {breadcrumb}\nTitle: {title}\n\n{page['content']}"
+
+            page_ids.append(url)
+            page_docs.append(enriched_content)
+            page_metas.append({
                 "url": url,
                 "title": title,
                 "breadcrumb": breadcrumb,
-                "domain": self._extract_domain(url)
-            }]
-        )
-
-        views = [
-            breadcrumb,
-            f"{title} - {breadcrumb}",
-            enriched_content[:2000]
-        ]
-        view_labels = ["breadcrumb", "title_path", "full_content"]
-
-        for i, (view_text, label) in enumerate(zip(views, view_labels)):
-            if not view_text.strip():
-                continue
-            chunk_id = hashlib.md5(f"{url}::view::{i}".encode()).hexdigest()
-            embedding = self.embedder.encode(view_text).tolist()
-            self.chunks.upsert(
-                ids=[chunk_id],
-                embeddings=[embedding],
-                documents=[view_text],
-                metadatas=[{
+                "domain": domain,
+                "simhash": f"{fingerprint:016x}",
+                "content_hash": content_hash(enriched_content),
+            })
+            fingerprints.append(fingerprint)
+
+            views = [
+                breadcrumb,
+                f"{title} - {breadcrumb}",
+                enriched_content[:2000]
+            ]
+            for i, (view_text, label) in enumerate(zip(views, VIEW_LABELS)):
+                if not view_text.strip():
+                    continue
+                if label == "full_content":
+                    full_content_rows.append(len(chunk_ids))
+                chunk_ids.append(chunk_id(url, i))
+                chunk_docs.append(view_text)
+                chunk_metas.append({
                     "parent_url": url,
                     "title": title,
                     "breadcrumb": breadcrumb,
                     "view_type": label,
-                    "domain": self._extract_domain(url)
-                }]
+                    "domain": domain
+                })
+
+        with span("kb.index.embed", vectors=len(chunk_docs)):
+            embeddings = self.embedder.encode(chunk_docs)
+
+        with span("kb.index.write", pages=len(page_ids)):
+            # The catalog needs the text being replaced to drop its old index entries
+            previous = self.content.get(page_ids)
+            # Text first, so a page visible in Chroma always has its content
+            self.content.put(dict(zip(page_ids, page_docs)))
+            # The page store reuses each page's full-content vector; without explicit
+            # embeddings Chroma would run its own default model over every page.
+            self.pages.upsert(
+                ids=page_ids,
+                embeddings=embeddings[full_content_rows],
+                metadatas=page_metas,
+            )
+            self.chunks.upsert(
+                ids=chunk_ids,
+                embeddings=embeddings,
+                metadatas=chunk_metas,
+            )
+            self.catalog.upsert(
+                [{**meta, "text": doc} for meta, doc in zip(page_metas, page_docs)],
+                previous=previous,
             )
 
-        logger.debug("Indexed page: %s", url)
-        return url
-
-    def index_pages(self, pages: dict[str, dict], force: bool = False) -> dict:
+        if self._fingerprints is not None:
+            for url, fingerprint in zip(page_ids, fingerprints):
+                self._fingerprints.add(url, fingerprint)
+        logger.debug("Indexed %d pages (%d vectors)", len(page_ids), len(chunk_ids))
+
+    def index_pages(
+        self,
+        pages: dict[str, dict],
+        force: bool = False,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> dict:
         """
-        Index multiple pages, skipping any that are already in the store.
+        Index multiple pages, skipping any that are already in the store or
+        whose content duplicates another page (indexed or earlier in the batch).
+        New pages are embedded and written in batches of WRITE_BATCH_PAGES;
+        on_progress(written, to_write) is called after each batch.
 
         Returns:
             {
-                "indexed": [url, ...],   # newly written
-                "skipped": [url, ...],   # already existed, not re-written
+                "indexed": [url, ...],      # newly written
+                "skipped": [url, ...],      # already existed, not re-written
+                "duplicates": [             # not embedded, content already indexed
+                    {"url": url, "duplicate_of": url}, ...
+                ],
             }
         """
         indexed: list[str] = []
         skipped: list[str] = []
+        duplicates: list[dict] = []
+        with span("kb.index.pages", pages=len(pages)), self.lock:
+            pending: list[dict] = []
+            queued: set[str] = set()
+            with span("kb.index.dedup"):
+                existing = set() if force else self.existing_urls([p["url"] for p in pages.values()])
+
+                for page in pages.values():
+                    url = page["url"]
+                    if url in queued or url in existing:
+                        skipped.append(url)
+                        continue
+                    duplicate_of = self.find_duplicate(url, page["content"])
+                    if duplicate_of:
+                        duplicates.append({"url": url, "duplicate_of": duplicate_of})
+                        continue
+                    pending.append(page)
+                    queued.add(url)
+                    if self._fingerprints is not None:
+                        # Later pages in this batch must see this one before it is written
+                        self._fingerprints.add(url, simhash(page["content"]))
+
+            try:
+                for start in range(0, len(pending), WRITE_BATCH_PAGES):
+                    batch = pending[start:start + WRITE_BATCH_PAGES]
+                    self._write_pages(batch)
+                    indexed.extend(page["url"] for page in batch)
+                    if on_progress is not None:
+                        on_progress(len(indexed), len(pending))
+            except Exception:
+                # Fingerprints of unwritten pages were added optimistically; rebuild lazily
+                self._fingerprints = None
+                raise
+
+        if skipped or duplicates:
+            logger.info(
+                "index_pages: %d new, %d skipped (already indexed), %d near-duplicates",
+                len(indexed), len(skipped), len(duplicates),
+            )
 
-        for page in pages.values():
-            result = self.index_page(page, force=force)
-            if result is None:
-                skipped.append(page["url"])
-            else:
-                indexed.append(result)
-
-        if skipped:
-            logger.info("index_pages: %d new, %d skipped (already indexed)", len(indexed), len(skipped))
-
-        return {"indexed": indexed, "skipped": skipped}
+        return {"indexed": indexed, "skipped": skipped, "duplicates": duplicates}
 
     # ── removal ──────────────────────────────────────────────────────────────
 
     def remove_page(self, url: str):
-        try:
-            self.pages.delete(ids=[url])
-        except Exception:
-            pass
-
-        existing = self.chunks.get(where={"parent_url": url})
-        if existing and existing["ids"]:
-            self.chunks.delete(ids=existing["ids"])
+        self.remove_pages([url])
 
-    def remove_domain(self, domain: str):
-        page_results = self.pages.get(where={"domain": domain})
-        if page_results and page_results["ids"]:
-            self.pages.delete(ids=page_results["ids"])
+    def remove_pages(self, urls: list[str]) -> list[str]:
+        """
+        Remove pages and all of their views; returns the urls that were indexed.
 
-        chunk_results = self.chunks.get(where={"domain": domain})
-        if chunk_results and chunk_results["ids"]:
-            self.chunks.delete(ids=chunk_results["ids"])
+        Chunk ids are derived from the url, so no lookup by parent_url is
+        needed: the whole call is one existence get plus one delete per
+        collection for every ID_BATCH_SIZE urls.
+        """
+        urls = list(dict.fromkeys(urls))
+        with self.lock:
+            existing = self.existing_urls(urls)
+            removed = [url for url in urls if url in existing]
+
+            for batch in _batched(removed):
+                self.pages.delete(ids=batch)
+            self.catalog.delete(removed, previous=self.content.get(removed))
+            self.content.delete(removed)
+            chunk_ids = [chunk_id(url, i) for url in removed for i in range(len(VIEW_LABELS))]
+            for batch in _batched(chunk_ids):
+                self.chunks.delete(ids=batch)
+
+            if self._fingerprints is not None:
+                for url in removed:
+                    self._fingerprints.discard(url)
+        return removed
+
+    def remove_domain(self, domain: str) -> list[str]:
+        with self.lock:
+            return self.remove_pages(self.catalog.urls(domain))
 
     # ── listing / retrieval ──────────────────────────────────────────────────
 
-    def list_pages(self, domain: str = None) -> list[dict]:
-        if domain:
-            results = self.pages.get(where={"domain": domain}, include=["metadatas"])
-        else:
-            results = self.pages.get(include=["metadatas"])
+    def list_pages(
+        self,
+        domain: str | None = None,
+        url_prefix: str | None = None,
+        breadcrumb_prefix: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        List indexed pages ordered by url, read from the catalog.
 
-        if not results or not results["metadatas"]:
-            return []
+        Pass the url of the last page returned as cursor to fetch the next
+        page of results.
+        """
+        return self.catalog.list_pages(
+            domain=domain,
+            url_prefix=url_prefix,
+            breadcrumb_prefix=breadcrumb_prefix,
+            after=cursor,
+            limit=limit,
+        )
 
-        return [
-            {
-                "url": meta["url"],
-                "title": meta["title"],
-                "breadcrumb": meta["breadcrumb"],
-                "domain": meta["domain"]
-            }
-            for meta in results["metadatas"]
-        ]
+    def page_counts(
+        self,
+        domain: str | None = None,
+        url_prefix: str | None = None,
+        breadcrumb_prefix: str | None = None,
+    ) -> dict[str, int]:
+        """Number of indexed pages per domain, with the same filters as list_pages."""
+        return self.catalog.counts(
+            domain=domain, url_prefix=url_prefix, breadcrumb_prefix=breadcrumb_prefix
+        )
+
+    def _rebuild_catalog(self):
+        """Repopulate the catalog from page metadata (first run or after drift)."""
+        with self.lock:
+            self.catalog.clear()
+            offset = 0
+            while True:
+                results = self.pages.get(include=["metadatas"], limit=ID_BATCH_SIZE, offset=offset)
+                if not results or not results["ids"]:
+                    break
+                texts = self.content.get(results["ids"])
+                rows = []
+                for url, meta in zip(results["ids"], results["metadatas"]):
+                    meta = meta or {}
+                    rows.append({
+                        "url": url,
+                        "domain": meta.get("domain") or self._extract_domain(url),
+                        "title": meta.get("title", ""),
+                        "breadcrumb": meta.get("breadcrumb", ""),
+                        "simhash": meta.get("simhash"),
+                        "text": texts.get(url),
+                    })
+                self.catalog.upsert(rows)
+                offset += len(results["ids"])
+            logger.info("Rebuilt page catalog with %d pages", offset)
 
     def get_full_page(self, url: str) -> str | None:
-        result = self.pages.get(ids=[url], include=["documents"])
-        if result and result["documents"]:
-            return result["documents"][0]
-        return None
+        return self.content.get([url]).get(url)
+
+    def get_pages(self, urls: list[str]) -> dict[str, dict]:
+        """Fetch content and metadata for several pages, keyed by url: one catalog and one content read."""
+        urls = list(dict.fromkeys(urls))
+        rows = self.catalog.pages(urls)
+        texts = self.content.get(list(rows))
+        return {
+            url: {**row, "content": texts.get(url)}
+            for url, row in rows.items()
+        }
 
     # ── helpers ───────────────────────────────────────────────────────────────
 
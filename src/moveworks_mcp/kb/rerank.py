@@ -0,0 +1,162 @@
+import abc
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# Characters of page text handed to the cross-encoder per candidate (~256 tokens)
+PASSAGE_CHARS = 1000
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+logger = logging.getLogger(__name__)
+
+
+def best_passage(content: str, query: str, max_chars: int = PASSAGE_CHARS) -> str:
+    """
+    Pick the window of a page that best covers the query's terms.
+
+    The page's header (navigation + title lines) is always kept; the body is
+    split into paragraph-aligned windows of up to max_chars and the window
+    containing the most distinct query terms wins (earliest on ties).
+    """
+    header, sep, body = content.partition("\n\n")
+    if not sep:
+        header, body = "", content
+    if len(body) <= max_chars:
+        return content
+
+    pieces = [
+        paragraph[i:i + max_chars]
+        for paragraph in body.split("\n")
+        for i in range(0, max(len(paragraph), 1), max_chars)
+    ]
+    windows, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > max_chars:
+            windows.append(current)
+            current = ""
+        current = f"{current}\n{piece}" if current else piece
+    if current:
+        windows.append(current)
+
+    terms = set(_WORD_RE.findall(query.lower()))
+    best = max(
+        windows,
+        key=lambda window: len(terms & set(_WORD_RE.findall(window.lower()))),
+    )
+    return f"{header}\n\n{best}" if header else best
+
+
+class Reranker(abc.ABC):
+    """
+    Scores (query, passage) pairs; higher is more relevant.
+
+    rerank() scores candidates in batches until the latency budget runs out
+    and caches every score, so repeated or overlapping queries are free.
+    """
+
+    name = "base"
+
+    def __init__(self, batch_size: int = 16, cache_size: int = 4096):
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def score(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """Score each (query, passage) pair, uncached and in input order."""
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _cache_key(query: str, passage: str) -> tuple[str, str]:
+        return query, hashlib.md5(passage.encode()).hexdigest()
+
+    def rerank(
+        self,
+        query: str,
+        passages: list[str],
+        budget_ms: float | None = None,
+    ) -> list[float | None]:
+        """
+        Return a score per passage, in input order.
+
+        Passages are scored in input order, so pass them best-first: when
+        budget_ms is exceeded the remaining ones are left unscored (None) and
+        the caller keeps their original order. The first batch always runs.
+        """
+        start = time.perf_counter()
+        keys = [self._cache_key(query, passage) for passage in passages]
+        scores: list[float | None] = [None] * len(passages)
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+
+        pending = [i for i, score in enumerate(scores) if score is None]
+        for offset in range(0, len(pending), self.batch_size):
+            if offset and budget_ms is not None:
+                if (time.perf_counter() - start) * 1000 >= budget_ms:
+                    logger.debug(
+                        "Rerank budget of %.0fms spent; %d candidates left unscored",
+                        budget_ms, len(pending) - offset,
+                    )
+                    break
+            batch = pending[offset:offset + self.batch_size]
+            batch_scores = self.score([(query, passages[i]) for i in batch])
+            with self._cache_lock:
+                for i, score in zip(batch, batch_scores):
+                    scores[i] = float(score)
+                    self._cache[keys[i]] = float(score)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores
+
+
+class CrossEncoderReranker(Reranker):
+    """sentence-transformers CrossEncoder, e.g. the MiniLM MS MARCO models, run on CPU."""
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL,
+        backend: str = "torch",
+        batch_size: int = 16,
+        cache_size: int = 4096,
+        max_length: int = 256,
+    ):
+        from sentence_transformers import CrossEncoder
+
+        super().__init__(batch_size=batch_size, cache_size=cache_size)
+        kwargs = {"max_length": max_length}
+        if backend != "torch":
+            kwargs["backend"] = backend
+        self.name = backend
+        self.model = CrossEncoder(model_name, **kwargs)
+        logger.info("Loaded re-ranking model %s (backend=%s)", model_name, backend)
+
+    def score(self, pairs: list[tuple[str, str]]) -> list[float]:
+        return self.model.predict(
+            pairs, batch_size=self.batch_size, show_progress_bar=False
+        ).tolist()
+
+
+def create_reranker(
+    model_name: str = RERANK_MODEL,
+    backend: str = "torch",
+    batch_size: int = 16,
+    cache_size: int = 4096,
+) -> Reranker:
+    return CrossEncoderReranker(
+        model_name=model_name,
+        backend=backend,
+        batch_size=batch_size,
+        cache_size=cache_size,
+    )
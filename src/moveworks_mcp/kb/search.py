@@ -1,75 +1,341 @@
-from rank_bm25 import BM25Okapi
-from moveworks_mcp.kb.indexer import KBIndexer
+import threading
+from typing import Callable
+
+from moveworks_mcp.kb.indexer import VIEW_LABELS, KBIndexer
+from moveworks_mcp.kb.rerank import Reranker, best_passage, create_reranker
+from moveworks_mcp.kb.tracing import span
+
+FUSION_MODES = ("rrf", "linear")
+# Breadcrumb filters matching more pages than this are not sent to the vector
+# store as a url list; its hits are filtered afterwards instead
+MAX_FILTER_URLS = 1000
+# Cap on the over-fetched vector depth used when filtering hits afterwards
+MAX_POST_FILTER_DEPTH = 5000
+DEFAULT_VIEW_WEIGHTS = {label: 1.0 for label in VIEW_LABELS}
 
 
 class KBSearch:
-    def __init__(self):
-        self.indexer = KBIndexer()
-
-    def search(self, query: str, top_k: int = 10) -> list[dict]:
-        embedding = self.indexer.embedder.encode(query).tolist()
-
-        chunk_results = self.indexer.chunks.query(
-            query_embeddings=[embedding],
-            n_results=min(top_k * 4, 40),
-            include=["metadatas", "distances", "documents"]
-        )
-
-        url_scores: dict[str, float] = {}
-        url_meta: dict[str, dict] = {}
-
-        if chunk_results and chunk_results["metadatas"]:
-            for meta, dist in zip(chunk_results["metadatas"][0], chunk_results["distances"][0]):
-                url = meta["parent_url"]
-                score = 1.0 - dist
-                if url not in url_scores or score > url_scores[url]:
-                    url_scores[url] = score
-                    url_meta[url] = meta
-
-        bm25_scores = self._bm25_search(query, url_scores.keys())
-        for url, bm25_score in bm25_scores.items():
-            if url in url_scores:
-                url_scores[url] = url_scores[url] * 0.7 + bm25_score * 0.3
+    """
+    Hybrid retrieval over the KB: a vector query on the chunk collection and a
+    BM25 query on the catalog's full-text index, combined by a fusion stage.
+
+    Fusion modes:
+      linear  (default) vector_weight * best weighted cosine over a page's
+              views + lexical_weight * BM25 scaled by the best BM25 of the
+              query.
+      rrf     reciprocal rank fusion. Every view type's vector ranking and the
+              lexical ranking contribute weight / (rrf_k + rank); scores only
+              depend on ranks, so they are comparable across queries. View
+              weights are normalized so all vector lists together carry
+              vector_weight. Opt-in: rankings and score scale differ from
+              linear, so clients comparing scores must expect it.
+
+    vector_depth (chunks) and lexical_depth (pages) set how many candidates
+    each retriever contributes; they are raised when top_k needs more (one
+    chunk per view of each requested page) so large top_k is never truncated.
+    view_weights scale each view type's contribution in either mode.
+
+    With re-ranking on, the top rerank_candidates fused pages are re-scored by
+    a cross-encoder on each page's best passage, within rerank_budget_ms per
+    search; pages the budget did not reach keep their fused order after the
+    re-scored ones. The cross-encoder loads on first use, like the embedder.
+    """
+
+    def __init__(
+        self,
+        indexer: KBIndexer | None = None,
+        fusion: str = "linear",
+        rrf_k: int = 60,
+        vector_depth: int = 40,
+        lexical_depth: int = 40,
+        vector_weight: float = 0.7,
+        lexical_weight: float = 0.3,
+        view_weights: dict[str, float] | None = None,
+        rerank: bool = False,
+        reranker: Reranker | None = None,
+        reranker_factory: Callable[[], Reranker] | None = None,
+        rerank_candidates: int = 20,
+        rerank_budget_ms: float = 60.0,
+    ):
+        # Share the caller's indexer so the process holds one store client and one model
+        self.indexer = indexer or KBIndexer()
+        self.fusion = self._check_fusion(fusion)
+        self.rrf_k = rrf_k
+        self.vector_depth = vector_depth
+        self.lexical_depth = lexical_depth
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+        self.view_weights = {**DEFAULT_VIEW_WEIGHTS, **(view_weights or {})}
+        self.rerank = rerank
+        self.rerank_candidates = rerank_candidates
+        self.rerank_budget_ms = rerank_budget_ms
+        self._reranker = reranker
+        self._reranker_factory = reranker_factory or create_reranker
+        self._reranker_lock = threading.Lock()
+
+    @property
+    def reranker(self) -> Reranker:
+        if self._reranker is None:
+            with self._reranker_lock:
+                if self._reranker is None:
+                    self._reranker = self._reranker_factory()
+        return self._reranker
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        domain: str | None = None,
+        breadcrumb_prefix: str | None = None,
+        view_types: list[str] | None = None,
+        fusion: str | None = None,
+        rerank: bool | None = None,
+    ) -> list[dict]:
+        """
+        Hybrid semantic + BM25 search over indexed pages.
+
+        domain and breadcrumb_prefix restrict both retrievers; view_types
+        restricts the vector query, and the lexical retriever (which indexes
+        full page text) only runs when "full_content" is among them. rerank
+        overrides the instance default for this call.
+        """
+        return self.search_many(
+            [query],
+            top_k=top_k,
+            domain=domain,
+            breadcrumb_prefix=breadcrumb_prefix,
+            view_types=view_types,
+            fusion=fusion,
+            rerank=rerank,
+        )[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        top_k: int = 10,
+        domain: str | None = None,
+        breadcrumb_prefix: str | None = None,
+        view_types: list[str] | None = None,
+        fusion: str | None = None,
+        rerank: bool | None = None,
+    ) -> list[list[dict]]:
+        """
+        Run several searches with the same filters; returns one result list per query.
+
+        All queries are encoded in one batch, sent to the vector index as one
+        multi-embedding query, and their result pages are fetched with one
+        store call, so N queries cost little more than one.
+        """
+        with span("kb.search", queries=len(queries), top_k=top_k):
+            return self._search_many(
+                queries, top_k, domain, breadcrumb_prefix, view_types, fusion, rerank
+            )
+
+    def _search_many(
+        self,
+        queries: list[str],
+        top_k: int,
+        domain: str | None,
+        breadcrumb_prefix: str | None,
+        view_types: list[str] | None,
+        fusion: str | None,
+        rerank: bool | None,
+    ) -> list[list[dict]]:
+        fusion = self._check_fusion(fusion or self.fusion)
+        where, allowed = self._build_where(domain, breadcrumb_prefix, view_types)
+        if where is None or not queries:
+            return [[] for _ in queries]
+
+        vector_depth = max(self.vector_depth, top_k * len(view_types or VIEW_LABELS))
+        if allowed is not None:
+            # Over-fetch in proportion to how much of the store the filter keeps
+            share = len(allowed) / max(len(self.indexer.catalog), 1)
+            vector_depth = min(int(vector_depth / share) + 1, MAX_POST_FILTER_DEPTH)
+        vector_hits = self._vector_search(queries, where, vector_depth)
+        if allowed is not None:
+            vector_hits = [[hit for hit in hits if hit[0] in allowed] for hits in vector_hits]
+        use_rerank = self.rerank if rerank is None else rerank
+        candidates = max(top_k, self.rerank_candidates) if use_rerank else top_k
+
+        fused: list[dict[str, float]] = []
+        ranked: list[list[str]] = []
+        for query, hits in zip(queries, vector_hits):
+            lexical_hits = []
+            if not view_types or "full_content" in view_types:
+                with span("kb.search.lexical"):
+                    lexical_hits = self.indexer.catalog.search_text(
+                        query,
+                        limit=max(self.lexical_depth, top_k),
+                        domain=domain,
+                        breadcrumb_prefix=breadcrumb_prefix,
+                    )
+            with span("kb.search.fuse", fusion=fusion):
+                if fusion == "rrf":
+                    url_scores = self._fuse_rrf(hits, lexical_hits)
+                else:
+                    url_scores = self._fuse_linear(hits, lexical_hits)
+            fused.append(url_scores)
+            ranked.append(sorted(url_scores, key=url_scores.get, reverse=True)[:candidates])
+
+        with span("kb.search.fetch_pages"):
+            pages = self.indexer.get_pages([url for urls in ranked for url in urls])
+
+        all_results = []
+        for query, url_scores, ranked_urls in zip(queries, fused, ranked):
+            rerank_scores: dict[str, float] = {}
+            if use_rerank:
+                with span("kb.search.rerank", candidates=len(ranked_urls)):
+                    rerank_scores = self._rerank(query, ranked_urls, pages)
+                # Re-scored pages first, best first; the rest keep their fused order
+                ranked_urls = sorted(
+                    ranked_urls,
+                    key=lambda url: (url not in rerank_scores, -rerank_scores.get(url, 0.0)),
+                )
+
+            results = []
+            for url in ranked_urls:
+                page = pages.get(url)
+                if not page or not page["content"]:
+                    continue
+                result = {
+                    "url": url,
+                    "title": page["title"],
+                    "breadcrumb": page["breadcrumb"],
+                    "score": round(url_scores[url], 4),
+                    "content": page["content"]
+                }
+                if url in rerank_scores:
+                    result["rerank_score"] = round(rerank_scores[url], 4)
+                results.append(result)
+                if len(results) == top_k:
+                    break
+            all_results.append(results)
+
+        return all_results
+
+    def _rerank(self, query: str, urls: list[str], pages: dict[str, dict]) -> dict[str, float]:
+        """Cross-encoder scores for the given pages, in fused order, within the latency budget."""
+        urls = [url for url in urls if pages.get(url) and pages[url]["content"]]
+        passages = [best_passage(pages[url]["content"], query) for url in urls]
+        scores = self.reranker.rerank(query, passages, budget_ms=self.rerank_budget_ms)
+        return {url: score for url, score in zip(urls, scores) if score is not None}
+
+    # ── retrievers ───────────────────────────────────────────────────────────
+
+    def _vector_search(
+        self, queries: list[str], where: dict, depth: int
+    ) -> list[list[tuple[str, str, float]]]:
+        """
+        Return, per query, (url, view_type, cosine similarity) for the nearest
+        chunks, best first. One encode batch and one store query for all queries.
+        """
+        with span("kb.search.encode"):
+            embeddings = self.indexer.embedder.encode(queries)
+
+        with span("kb.search.vector_query", depth=depth), self.indexer.reading("chunks") as chunks:
+            chunk_results = chunks.query(
+                query_embeddings=embeddings,
+                n_results=depth,
+                where=where or None,
+                include=["metadatas", "distances"]
+            )
+        if not chunk_results or not chunk_results["metadatas"]:
+            return [[] for _ in queries]
+        return [
+            [
+                (meta["parent_url"], meta.get("view_type", "full_content"), 1.0 - dist)
+                for meta, dist in zip(metas, distances)
+            ]
+            for metas, distances in zip(chunk_results["metadatas"], chunk_results["distances"])
+        ]
+
+    # ── fusion ───────────────────────────────────────────────────────────────
+
+    def _fuse_rrf(
+        self,
+        vector_hits: list[tuple[str, str, float]],
+        lexical_hits: list[tuple[str, float]],
+    ) -> dict[str, float]:
+        scores: dict[str, float] = {}
+        view_ranks: dict[str, int] = {}
+        views = {view_type for _, view_type, _ in vector_hits}
+        total_view_weight = sum(self.view_weights.get(v, 1.0) for v in views) or 1.0
+        for url, view_type, _ in vector_hits:
+            rank = view_ranks[view_type] = view_ranks.get(view_type, 0) + 1
+            weight = self.vector_weight * self.view_weights.get(view_type, 1.0) / total_view_weight
+            scores[url] = scores.get(url, 0.0) + weight / (self.rrf_k + rank)
+
+        for rank, (url, _) in enumerate(lexical_hits, start=1):
+            scores[url] = scores.get(url, 0.0) + self.lexical_weight / (self.rrf_k + rank)
+        return scores
+
+    def _fuse_linear(
+        self,
+        vector_hits: list[tuple[str, str, float]],
+        lexical_hits: list[tuple[str, float]],
+    ) -> dict[str, float]:
+        vector_scores: dict[str, float] = {}
+        for url, view_type, similarity in vector_hits:
+            score = similarity * self.view_weights.get(view_type, 1.0)
+            if score > vector_scores.get(url, float("-inf")):
+                vector_scores[url] = score
+
+        scores = {url: self.vector_weight * score for url, score in vector_scores.items()}
+        max_lexical = max((score for _, score in lexical_hits), default=0.0)
+        if max_lexical > 0:
+            for url, score in lexical_hits:
+                scores[url] = scores.get(url, 0.0) + self.lexical_weight * score / max_lexical
+        return scores
+
+    # ── helpers ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _check_fusion(fusion: str) -> str:
+        if fusion not in FUSION_MODES:
+            raise ValueError(f"Unknown fusion mode '{fusion}'. Valid modes: {list(FUSION_MODES)}")
+        return fusion
+
+    def _build_where(
+        self,
+        domain: str | None,
+        breadcrumb_prefix: str | None,
+        view_types: list[str] | None,
+    ) -> tuple[dict | None, set[str] | None]:
+        """
+        Translate search filters into a Chroma where clause and an optional
+        set of allowed page urls to filter vector hits by afterwards.
+
+        The clause is {} when nothing is filtered and None when the filters
+        cannot match any page. Chroma has no prefix operator for metadata, so
+        a breadcrumb prefix is resolved to its page urls through the catalog.
+        Up to MAX_FILTER_URLS of them go into the clause; a wider prefix keeps
+        only the domain condition and returns the urls for post-filtering.
+        """
+        conditions = []
+        if view_types:
+            unknown = set(view_types) - set(VIEW_LABELS)
+            if unknown:
+                raise ValueError(
+                    f"Unknown view type(s) {sorted(unknown)}. Valid view types: {list(VIEW_LABELS)}"
+                )
+            conditions.append({"view_type": {"$in": list(view_types)}})
+
+        allowed = None
+        if breadcrumb_prefix:
+            urls = self.indexer.catalog.urls(domain=domain, breadcrumb_prefix=breadcrumb_prefix)
+            if not urls:
+                return None, None
+            if len(urls) <= MAX_FILTER_URLS:
+                conditions.append({"parent_url": {"$in": urls}})
             else:
-                url_scores[url] = bm25_score * 0.3
-
-        ranked_urls = sorted(url_scores.keys(), key=lambda u: url_scores[u], reverse=True)[:top_k]
-
-        results = []
-        for url in ranked_urls:
-            full_content = self.indexer.get_full_page(url)
-            if not full_content:
-                continue
-            meta = url_meta.get(url, {})
-            results.append({
-                "url": url,
-                "title": meta.get("title", ""),
-                "breadcrumb": meta.get("breadcrumb", ""),
-                "score": round(url_scores[url], 4),
-                "content": full_content
-            })
-
-        return results
-
-    def _bm25_search(self, query: str, candidate_urls) -> dict[str, float]:
-        candidate_urls = list(candidate_urls)
-        if not candidate_urls:
-            return {}
-
-        docs = []
-        for url in candidate_urls:
-            content = self.indexer.get_full_page(url) or ""
-            docs.append(content.lower().split())
-
-        if not docs:
-            return {}
-
-        bm25 = BM25Okapi(docs)
-        scores = bm25.get_scores(query.lower().split())
-        max_score = max(scores) if max(scores) > 0 else 1.0
-
-        return {
-            url: float(score / max_score)
-            for url, score in zip(candidate_urls, scores)
-            if score > 0
-        }
+                allowed = set(urls)
+                if domain:
+                    conditions.append({"domain": domain})
+        elif domain:
+            conditions.append({"domain": domain})
+
+        if not conditions:
+            return {}, allowed
+        if len(conditions) == 1:
+            return conditions[0], allowed
+        return {"$and": conditions}, allowed
@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional: pip install -e ".[otel]"
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "moveworks_mcp.kb"
+
+_tracer = None
+
+
+def enable_opentelemetry(enabled: bool = True) -> bool:
+    """
+    Report KB stages as spans to the OpenTelemetry tracer provider the host
+    process configured. Returns False (and stays a no-op) when the
+    opentelemetry-api package is not installed.
+    """
+    global _tracer
+    if not enabled:
+        _tracer = None
+        return False
+    if otel_trace is None:
+        logger.warning("Tracing requested but opentelemetry-api is not installed; spans are disabled.")
+        return False
+    _tracer = otel_trace.get_tracer(TRACER_NAME)
+    return True
+
+
+class StageTimings:
+    """
+    Wall time per KB stage within one tool call, for its debug_timings field.
+
+    Stages are listed in the order they first ran. Time is summed over every
+    run of a stage, so concurrent stages (page fetches) can add up to more
+    than the call took.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: dict[str, list] = {}
+        self._started = time.perf_counter()
+
+    def open(self, stage: str):
+        # Registered on entry, so an enclosing stage is listed before its parts
+        with self._lock:
+            self._stages.setdefault(stage, [0.0, 0])
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {"ms": round(seconds * 1000, 2), "calls": calls}
+                for stage, (seconds, calls) in self._stages.items()
+            }
+        return {"total_ms": round((time.perf_counter() - self._started) * 1000, 2), "stages": stages}
+
+
+_timings: ContextVar[Optional[StageTimings]] = ContextVar("kb_stage_timings", default=None)
+
+
+@contextmanager
+def collect_timings(enabled: bool = True) -> Iterator[Optional[StageTimings]]:
+    """Collect the stages run in this context (including threads started from it); yields None when disabled."""
+    if not enabled:
+        yield None
+        return
+    timings = StageTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Mark a stage. Free when neither OpenTelemetry nor a debug_timings
+    collector is active; otherwise opens an OTel span and/or adds the
+    stage's wall time to the collector.
+    """
+    timings = _timings.get()
+    tracer = _tracer
+    if timings is None and tracer is None:
+        yield
+        return
+
+    if timings is not None:
+        timings.open(name)
+    start = time.perf_counter()
+    try:
+        if tracer is not None:
+            with tracer.start_as_current_span(name, attributes=attributes or None):
+                yield
+        else:
+            yield
+    finally:
+        if timings is not None:
+            timings.add(name, time.perf_counter() - start)
@@ -0,0 +1,471 @@
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+VECTOR_DIR = "vectors"
+# int8 rows carry a float32 scale each (symmetric per-vector quantization)
+VECTOR_DTYPES = ("float32", "float16", "int8")
+SCALE_SUFFIX = "scale"
+# Bump when the row table changes; an older store is dropped (re-import or re-index)
+SCHEMA_VERSION = 1
+# Rows added to the matrix file whenever it runs out of room
+GROW_ROWS = 4096
+# Rows upcast and scored per matrix product when the stored dtype is not float32;
+# small blocks keep the float32 copy in cache
+SCORE_BLOCK_ROWS = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vector_rows (
+    row      INTEGER PRIMARY KEY,
+    id       TEXT NOT NULL UNIQUE,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_info (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyVectorStore:
+    """
+    Exact cosine-similarity vector store on a memory-mapped NumPy matrix.
+
+    Vectors are L2-normalized and kept in one contiguous row-major matrix file;
+    ids and metadata live in a small
+    SQLite table keyed by row number and are held in memory once opened.
+    Opening the store is an mmap plus one table scan, and a query is one
+    matrix product over every live row followed by a partial sort, so results
+    are exact rather than approximate.
+
+    Storage dtypes:
+      float32  exact scores.
+      float16  half the size; rows are upcast for scoring, which numpy does
+               slowly, so queries cost several times more.
+      int8     a quarter of the size (plus a float32 scale per row). Each
+               vector is scaled so its largest component maps to 127.
+               Queries stay float32 and are scored against the upcast rows,
+               then multiplied by each row's scale (asymmetric scoring).
+               Rank order is near-exact, and queries are almost as fast as
+               float32.
+
+    Upserting an existing id overwrites its row in place; new ids are
+    appended. Deletes only mark rows dead (tombstones), and once dead rows
+    make up compact_ratio of the matrix it is rewritten without them.
+    compact() does the same on demand. A compaction writes a new matrix file
+    and switches to it in the same transaction that renumbers the rows, so an
+    interrupted one leaves the previous generation intact.
+
+    The methods mirror the subset of the Chroma collection API that KBIndexer
+    and KBSearch use (upsert/delete/get/query/count, with equality, $in and
+    $and where clauses), so it can stand in for the chunk collection.
+    Documents are not stored.
+    """
+
+    def __init__(self, path: str, name: str, dtype: str = "float32", compact_ratio: float = 0.25):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype '{dtype}'. Valid dtypes: {list(VECTOR_DTYPES)}")
+        self.name = name
+        self.compact_ratio = compact_ratio
+        self._dir = Path(path) / VECTOR_DIR
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self._dir / f"{name}.sqlite3"), check_same_thread=False)
+
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS vector_rows")
+                self._conn.execute("DROP TABLE IF EXISTS store_info")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+        info = dict(self._conn.execute("SELECT key, value FROM store_info").fetchall())
+
+        stored_dtype = info.get("dtype", dtype)
+        if stored_dtype != dtype and info.get("dim"):
+            logger.warning(
+                "%s holds %s vectors; keeping that dtype (compact after changing it to convert)",
+                name, stored_dtype,
+            )
+        self.dtype = np.dtype(stored_dtype)
+        self._target_dtype = np.dtype(dtype)
+        self.dim = int(info["dim"]) if "dim" in info else None
+        self._generation = int(info.get("generation", 0))
+
+        self._ids: list[str | None] = []
+        self._metadatas: list[dict | None] = []
+        self._row_of: dict[str, int] = {}
+        for row, id_, metadata in self._conn.execute(
+            "SELECT row, id, metadata FROM vector_rows ORDER BY row"
+        ):
+            self._grow_lists(row + 1)
+            self._ids[row] = id_
+            self._metadatas[row] = json.loads(metadata)
+            self._row_of[id_] = row
+        self._rows = len(self._ids)
+        self._alive = np.array([id_ is not None for id_ in self._ids], dtype=bool)
+        self._postings: dict[str, dict] = {}
+
+        self._matrix: np.memmap | None = None
+        self._scales: np.memmap | None = None
+        if self.dim is not None:
+            self._map(max(self._rows, 1))
+        self._remove_stale_files()
+
+    # ── files ────────────────────────────────────────────────────────────────
+
+    def _matrix_path(self, generation: int) -> Path:
+        return self._dir / f"{self.name}.{generation}.{self.dtype.name}"
+
+    def _scale_path(self, generation: int) -> Path:
+        return self._dir / f"{self.name}.{generation}.{SCALE_SUFFIX}"
+
+    def _map(self, capacity: int):
+        """(Re)map the current matrix (and scale) file, growing it to hold capacity rows."""
+        path = self._matrix_path(self._generation)
+        needed = capacity * self.dim * self.dtype.itemsize
+        if not path.exists() or path.stat().st_size < needed:
+            with open(path, "ab") as f:
+                f.truncate(needed)
+        self.flush()
+        size = path.stat().st_size // (self.dim * self.dtype.itemsize)
+        self._matrix = np.memmap(path, dtype=self.dtype, mode="r+", shape=(size, self.dim))
+        self._scales = None
+        if self.dtype == np.int8:
+            scale_path = self._scale_path(self._generation)
+            if not scale_path.exists() or scale_path.stat().st_size < size * 4:
+                with open(scale_path, "ab") as f:
+                    f.truncate(size * 4)
+            self._scales = np.memmap(scale_path, dtype=np.float32, mode="r+", shape=(size,))
+
+    def flush(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+        if self._scales is not None:
+            self._scales.flush()
+
+    def _remove_stale_files(self):
+        """Delete matrix files of other generations left by an interrupted compaction."""
+        current = set()
+        if self.dim is not None:
+            current = {self._matrix_path(self._generation), self._scale_path(self._generation)}
+        for path in self._dir.glob(f"{self.name}.*"):
+            if path.suffix[1:] in (*VECTOR_DTYPES, SCALE_SUFFIX) and path not in current:
+                path.unlink(missing_ok=True)
+
+    def _grow_lists(self, rows: int):
+        missing = rows - len(self._ids)
+        if missing > 0:
+            self._ids.extend([None] * missing)
+            self._metadatas.extend([None] * missing)
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._matrix = self._scales = None
+            self._conn.close()
+
+    # ── collection API ───────────────────────────────────────────────────────
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def upsert(self, ids: list[str], embeddings, metadatas: list[dict] | None = None, documents=None):
+        """Insert or overwrite vectors; documents are accepted for API parity and dropped."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("upsert needs one embedding per id")
+        metadatas = metadatas or [{} for _ in ids]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self.dtype = self._target_dtype
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)",
+                        [("dim", str(self.dim)), ("dtype", self.dtype.name), ("generation", "0")],
+                    )
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store ({self.dim})")
+
+            rows = []
+            next_row = self._rows
+            for id_ in ids:
+                row = self._row_of.get(id_)
+                if row is None:
+                    row = next_row
+                    next_row += 1
+                    self._row_of[id_] = row
+                rows.append(row)
+            if self._matrix is None or next_row > len(self._matrix):
+                self._map(next_row + GROW_ROWS)
+            self._grow_lists(next_row)
+            if next_row > len(self._alive):
+                self._alive = np.concatenate([self._alive, np.zeros(next_row - len(self._alive), dtype=bool)])
+            self._rows = next_row
+
+            stored, scales = self._encode(vectors, self.dtype)
+            self._matrix[rows] = stored
+            if scales is not None:
+                self._scales[rows] = scales
+            self.flush()
+            for row, id_, metadata in zip(rows, ids, metadatas):
+                self._ids[row] = id_
+                self._metadatas[row] = metadata
+            self._alive[rows] = True
+            self._postings.clear()
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO vector_rows (row, id, metadata) VALUES (?, ?, ?)",
+                    [(row, id_, json.dumps(meta)) for row, id_, meta in zip(rows, ids, metadatas)],
+                )
+
+    def add(self, ids: list[str], embeddings, metadatas: list[dict] | None = None, documents=None):
+        self.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+    def delete(self, ids: list[str]):
+        """Tombstone rows; unknown ids are ignored. Compacts once enough rows are dead."""
+        with self._lock:
+            rows = [self._row_of.pop(id_) for id_ in ids if id_ in self._row_of]
+            if not rows:
+                return
+            for row in rows:
+                self._ids[row] = None
+                self._metadatas[row] = None
+            self._alive[rows] = False
+            self._postings.clear()
+            with self._conn:
+                self._conn.executemany("DELETE FROM vector_rows WHERE row = ?", [(row,) for row in rows])
+            if self._rows and (self._rows - self.count()) / self._rows >= self.compact_ratio:
+                self.compact()
+
+    def compact(self) -> dict:
+        """Rewrite the matrix without dead rows (and in the configured dtype)."""
+        with self._lock:
+            dead = self._rows - self.count()
+            if self.dim is None:
+                return {"rows": 0, "removed": 0}
+            live = np.flatnonzero(self._alive[:self._rows])
+            old_paths = (self._matrix_path(self._generation), self._scale_path(self._generation))
+
+            target = self._target_dtype
+            generation = self._generation + 1
+            capacity = max(len(live), 1)
+            matrix = np.memmap(
+                self._dir / f"{self.name}.{generation}.{target.name}",
+                dtype=target, mode="w+", shape=(capacity, self.dim),
+            )
+            scales = None
+            if target == np.int8:
+                scales = np.memmap(
+                    self._scale_path(generation), dtype=np.float32, mode="w+", shape=(capacity,)
+                )
+            for start in range(0, len(live), SCORE_BLOCK_ROWS):
+                block = live[start:start + SCORE_BLOCK_ROWS]
+                stored, block_scales = self._encode(self._decode(block), target)
+                matrix[start:start + len(block)] = stored
+                if scales is not None:
+                    scales[start:start + len(block)] = block_scales
+            matrix.flush()
+            if scales is not None:
+                scales.flush()
+            self._generation, self.dtype = generation, target
+
+            ids = [self._ids[row] for row in live]
+            metadatas = [self._metadatas[row] for row in live]
+            with self._conn:
+                self._conn.execute("DELETE FROM vector_rows")
+                self._conn.executemany(
+                    "INSERT INTO vector_rows (row, id, metadata) VALUES (?, ?, ?)",
+                    [(row, id_, json.dumps(meta)) for row, (id_, meta) in enumerate(zip(ids, metadatas))],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)",
+                    [("generation", str(self._generation)), ("dtype", self.dtype.name)],
+                )
+
+            self._matrix, self._scales = matrix, scales
+            self._ids, self._metadatas = ids, metadatas
+            self._row_of = {id_: row for row, id_ in enumerate(ids)}
+            self._rows = len(ids)
+            self._alive = np.ones(self._rows, dtype=bool)
+            self._postings.clear()
+            for path in old_paths:
+                path.unlink(missing_ok=True)
+            logger.info("Compacted %s: %d rows kept, %d removed", self.name, self._rows, dead)
+            return {"rows": self._rows, "removed": dead}
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> dict:
+        include = ["metadatas"] if include is None else include
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[id_] for id_ in ids if id_ in self._row_of]
+            else:
+                rows = np.flatnonzero(self._mask(where)).tolist()
+                rows = rows[offset:offset + limit if limit is not None else None]
+            result = {"ids": [self._ids[row] for row in rows], "metadatas": None, "embeddings": None, "documents": None}
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = self._decode(np.array(rows, dtype=np.int64))
+            if "documents" in include:
+                result["documents"] = [None] * len(rows)
+            return result
+
+    def query(
+        self,
+        query_embeddings,
+        n_results: int = 10,
+        where: dict | None = None,
+        include: list[str] | None = None,
+    ) -> dict:
+        """Exact top-n by cosine similarity; distances are 1 - similarity, as in a cosine collection."""
+        include = ["metadatas", "distances"] if include is None else include
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1.0, norms)
+
+        result = {"ids": [], "metadatas": [], "distances": []}
+        with self._lock:
+            mask = self._mask(where)
+            candidates = np.flatnonzero(mask)
+            n = min(n_results, len(candidates))
+            if n == 0:
+                return {key: [[] for _ in queries] for key in result}
+            scores = self._scores(queries, candidates)
+            for row_scores in scores:
+                top = np.argpartition(-row_scores, n - 1)[:n] if n < len(row_scores) else np.arange(n)
+                top = top[np.argsort(-row_scores[top], kind="stable")]
+                rows = candidates[top]
+                result["ids"].append([self._ids[row] for row in rows])
+                result["metadatas"].append([self._metadatas[row] for row in rows])
+                result["distances"].append((1.0 - row_scores[top]).tolist())
+        if "metadatas" not in include:
+            result["metadatas"] = None
+        if "distances" not in include:
+            result["distances"] = None
+        return result
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _encode(vectors: np.ndarray, dtype: np.dtype) -> tuple[np.ndarray, np.ndarray | None]:
+        """Convert normalized float32 rows to the storage dtype; int8 also returns per-row scales."""
+        if dtype != np.int8:
+            return vectors.astype(dtype), None
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _decode(self, rows: np.ndarray) -> np.ndarray:
+        """Stored rows back to float32 (dequantized for int8)."""
+        vectors = self._matrix[rows].astype(np.float32)
+        if self._scales is not None:
+            vectors *= self._scales[rows][:, None]
+        return vectors
+
+    def _scores(self, queries: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every query against the candidate rows, shape (queries, candidates)."""
+        contiguous = len(candidates) == self._rows
+        if self.dtype == np.float32:
+            matrix = self._matrix[:self._rows] if contiguous else self._matrix[candidates]
+            return queries @ np.asarray(matrix).T
+        # Reduced-precision rows are upcast a block at a time to keep BLAS on float32
+        scores = np.empty((len(queries), len(candidates)), dtype=np.float32)
+        for start in range(0, len(candidates), SCORE_BLOCK_ROWS):
+            block = candidates[start:start + SCORE_BLOCK_ROWS]
+            rows = slice(block[0], block[-1] + 1) if contiguous else block
+            block_scores = queries @ self._matrix[rows].astype(np.float32).T
+            if self._scales is not None:
+                block_scores *= self._scales[rows]
+            scores[:, start:start + len(block)] = block_scores
+        return scores
+
+    def _mask(self, where: dict | None) -> np.ndarray:
+        """Boolean mask over rows: alive and matching the where clause."""
+        mask = self._alive[:self._rows].copy()
+        if where:
+            mask &= self._where_mask(where)
+        return mask
+
+    def _where_mask(self, where: dict) -> np.ndarray:
+        mask = np.ones(self._rows, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+                continue
+            if key == "$or":
+                any_mask = np.zeros(self._rows, dtype=bool)
+                for clause in condition:
+                    any_mask |= self._where_mask(clause)
+                mask &= any_mask
+                continue
+            if isinstance(condition, dict):
+                ((op, value),) = condition.items()
+            else:
+                op, value = "$eq", condition
+            if op == "$eq":
+                values = [value]
+            elif op == "$in":
+                values = value
+            else:
+                raise ValueError(f"Unsupported where operator '{op}' (supported: $eq, $in, $and, $or)")
+            postings = self._postings_for(key)
+            key_mask = np.zeros(self._rows, dtype=bool)
+            for v in values:
+                rows = postings.get(v)
+                if rows is not None:
+                    key_mask[rows] = True
+            mask &= key_mask
+        return mask
+
+    def _postings_for(self, key: str) -> dict:
+        """value -> row array for one metadata key; built on first filter, dropped on writes."""
+        postings = self._postings.get(key)
+        if postings is None:
+            grouped: dict = {}
+            for row, metadata in enumerate(self._metadatas[:self._rows]):
+                if metadata is not None and key in metadata:
+                    grouped.setdefault(metadata[key], []).append(row)
+            postings = {value: np.array(rows) for value, rows in grouped.items()}
+            self._postings[key] = postings
+        return postings
+
+    @property
+    def bytes_per_vector(self) -> int:
+        scale_bytes = 4 if self.dtype == np.int8 else 0
+        return (self.dim or 0) * self.dtype.itemsize + scale_bytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "backend": "numpy",
+                "count": self.count(),
+                "rows": self._rows,
+                "deleted": self._rows - self.count(),
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "matrix_bytes": self._rows * self.bytes_per_vector,
+            }
@@ -1,53 +1,41 @@
+import asyncio
 import inspect
-import json
 import logging
-from typing import Any, Dict, List, Union
+import threading
+from typing import Any, Dict, List, Optional, Union
 
 import mcp.types as types
 from mcp.server.lowlevel import Server
 from pydantic import ValidationError
 
+from mcp_common.metrics import METRICS_TOOL, METRICS_TOOL_DESCRIPTION, METRICS_TOOL_SCHEMA
+from mcp_common.profiling import (
+    PROFILER_TOOL,
+    PROFILER_TOOL_DESCRIPTION,
+    PROFILER_TOOL_SCHEMA,
+    ToolProfiler,
+)
+from mcp_common.response_budget import (
+    BUDGET_ARGUMENT,
+    CONTINUATION_TOOL,
+    FETCH_CONTINUATION_DESCRIPTION,
+    FETCH_CONTINUATION_SCHEMA,
+    ContinuationCache,
+    ResponseBudget,
+    with_budget_argument,
+)
+from mcp_common.streaming import ProgressSink, progress_sink
 from moveworks_mcp.auth.auth_manager import AuthManager
+from moveworks_mcp.kb.tracing import enable_opentelemetry, span
+from moveworks_mcp.tools.kb_tools import LINKED_RESULTS, close_resources, warm_up
 from moveworks_mcp.utils.config import ServerConfig
+from moveworks_mcp.utils.metrics import METRICS
 from moveworks_mcp.utils.tool_utils import get_tool_definitions
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def serialize_tool_output(result: Any, tool_name: str) -> str:
-    """Serializes tool output to a string, preferably JSON indented."""
-    try:
-        if isinstance(result, str):
-            try:
-                parsed = json.loads(result)
-                return json.dumps(parsed, indent=2)
-            except json.JSONDecodeError:
-                return result
-        elif isinstance(result, dict):
-            return json.dumps(result, indent=2)
-        elif hasattr(result, "model_dump_json"):
-            try:
-                return result.model_dump_json(indent=2)
-            except TypeError:
-                return json.dumps(result.model_dump(), indent=2)
-        elif hasattr(result, "model_dump"):
-            return json.dumps(result.model_dump(), indent=2)
-        elif hasattr(result, "dict"):
-            return json.dumps(result.dict(), indent=2)
-        else:
-            logger.warning(
-                f"Could not serialize result for tool '{tool_name}' to JSON, falling back to str(). "
-                f"Type: {type(result)}"
-            )
-            return str(result)
-    except Exception as e:
-        logger.error(f"Error during serialization for tool '{tool_name}': {e}", exc_info=True)
-        return json.dumps(
-            {"error": f"Serialization failed for tool {tool_name}", "details": str(e)}, indent=2
-        )
-
-
 class MoveworksMCP:
 
     def __init__(self, config: Union[Dict, ServerConfig]):
@@ -60,7 +48,33 @@ class MoveworksMCP:
         self.mcp_server = Server("Moveworks")
         self.name = "Moveworks"
 
+        if self.config.tracing:
+            enable_opentelemetry()
+
+        self.profiler = ToolProfiler(
+            "moveworks_mcp",
+            directory=self.config.profile_dir,
+            rate=self.config.profile_rate,
+            mode=self.config.profile_mode,
+            keep=self.config.profile_keep,
+            min_ms=self.config.profile_min_ms,
+        )
+
         self.tool_definitions = get_tool_definitions()
+        self.response_budget = ResponseBudget(
+            max_response_bytes=self.config.max_response_bytes,
+            budgets=self.config.response_budgets,
+            output_format=self.config.output_format,
+            cache=ContinuationCache(
+                ttl_seconds=self.config.continuation_ttl_seconds,
+                max_bytes=self.config.continuation_max_bytes,
+            ),
+            linked=LINKED_RESULTS,
+        )
+        self._tool_list: Optional[List[types.Tool]] = None
+        if self.config.validate_tools:
+            self._tool_list = self._build_tool_list(strict=True)
+            logger.info(f"Validated {len(self._tool_list)} tool schemas.")
 
         self._register_handlers()
 
@@ -69,27 +83,89 @@ class MoveworksMCP:
         self.mcp_server.call_tool()(self._call_tool_impl)
         logger.info("Registered list_tools and call_tool handlers.")
 
-    async def _list_tools_impl(self) -> List[types.Tool]:
-        tool_list: List[types.Tool] = []
+    def _build_tool_list(self, strict: bool = False) -> List[types.Tool]:
+        """Build the advertised tools and their input schemas; strict raises on a broken schema."""
+        tool_list: List[types.Tool] = [
+            types.Tool(
+                name=CONTINUATION_TOOL,
+                description=FETCH_CONTINUATION_DESCRIPTION,
+                inputSchema=FETCH_CONTINUATION_SCHEMA,
+            ),
+            types.Tool(
+                name=METRICS_TOOL,
+                description=METRICS_TOOL_DESCRIPTION,
+                inputSchema=METRICS_TOOL_SCHEMA,
+            ),
+        ]
+        if self.profiler.available:
+            tool_list.append(
+                types.Tool(
+                    name=PROFILER_TOOL,
+                    description=PROFILER_TOOL_DESCRIPTION,
+                    inputSchema=PROFILER_TOOL_SCHEMA,
+                )
+            )
 
         for tool_name, definition in self.tool_definitions.items():
             _impl_func, params_model, _return_annotation, description, _serialization = definition
             try:
-                schema = params_model.model_json_schema()
+                schema = with_budget_argument(params_model.model_json_schema())
                 tool_list.append(
                     types.Tool(name=tool_name, description=description, inputSchema=schema)
                 )
             except Exception as e:
+                if strict:
+                    raise ValueError(f"Invalid schema for tool '{tool_name}': {e}") from e
                 logger.error(
                     f"Failed to generate schema for tool '{tool_name}': {e}", exc_info=True
                 )
 
-        logger.debug(f"Listing {len(tool_list)} tools for Moveworks MCP server.")
         return tool_list
 
+    async def _list_tools_impl(self) -> List[types.Tool]:
+        # Tool definitions are fixed for the life of the server, so build them once
+        if self._tool_list is None:
+            self._tool_list = self._build_tool_list()
+        logger.debug(f"Listing {len(self._tool_list)} tools for Moveworks MCP server.")
+        return self._tool_list
+
+    def track_call(self, name: str):
+        """Record a tool call in the server metrics, however it arrived (MCP or /stream)."""
+        # Unknown names share one label so callers cannot grow the metric series
+        known = name in self.tool_definitions or name in (CONTINUATION_TOOL, METRICS_TOOL, PROFILER_TOOL)
+        return METRICS.track(name if known else "unknown")
+
     async def _call_tool_impl(self, name: str, arguments: dict) -> list[types.TextContent]:
         logger.info(f"Received call_tool request for tool '{name}'")
+        with self.track_call(name) as call, span("mcp.tool_call", tool=name):
+            serialized_string = await self._serialized_tool_call(name, dict(arguments or {}))
+            call.response_bytes = len(serialized_string.encode("utf-8"))
+        return [types.TextContent(type="text", text=serialized_string)]
 
+    async def _serialized_tool_call(self, name: str, arguments: dict) -> str:
+        budget_override = arguments.pop(BUDGET_ARGUMENT, None)
+
+        if name == CONTINUATION_TOOL:
+            return self.response_budget.fetch(
+                str(arguments.get("continuation", "")), budget_override
+            )
+
+        if name == METRICS_TOOL:
+            result = METRICS.tool_output(arguments.get("format", "summary"))
+        elif name == PROFILER_TOOL:
+            result = self.profiler.tool_output(arguments)
+        else:
+            result = await self.run_tool(name, arguments, self._mcp_progress_sink())
+
+        with span("mcp.serialize"):
+            serialized_string = self.response_budget.render(name, result, budget_override)
+        logger.debug(f"Serialized value for tool '{name}': {serialized_string[:500]}...")
+        return serialized_string
+
+    async def run_tool(
+        self, name: str, arguments: dict, progress: Optional[ProgressSink] = None
+    ) -> Any:
+        """Validate arguments and run a tool, returning its raw result; progress receives its updates."""
         if name not in self.tool_definitions:
             raise ValueError(f"Unknown tool: {name}")
 
@@ -109,21 +185,52 @@ class MoveworksMCP:
             raise ValueError(f"Failed to parse arguments for tool '{name}': {e}")
 
         try:
-            if inspect.iscoroutinefunction(impl_func):
-                result = await impl_func(self.config, self.auth_manager, params)
-            else:
-                result = impl_func(self.config, self.auth_manager, params)
+            with progress_sink(progress):
+                if inspect.iscoroutinefunction(impl_func):
+                    with self.profiler.profile(name):
+                        result = await impl_func(self.config, self.auth_manager, params)
+                else:
+                    # Sync tools (search, listing) block; keep them off the event loop other sessions
+                    # share, and profile them in their own thread
+                    result = await asyncio.to_thread(
+                        self.profiler.wrap(name, impl_func), self.config, self.auth_manager, params
+                    )
             logger.debug(f"Raw result type from tool '{name}': {type(result)}")
         except Exception as e:
             logger.error(f"Error executing tool '{name}': {e}", exc_info=True)
             raise RuntimeError(f"Error during execution of tool '{name}': {e}") from e
 
-        serialized_string = serialize_tool_output(result, name)
-        logger.debug(f"Serialized value for tool '{name}': {serialized_string[:500]}...")
+        return result
 
-        return [types.TextContent(type="text", text=serialized_string)]
+    def _mcp_progress_sink(self) -> Optional[ProgressSink]:
+        """Forward tool progress as MCP progress notifications when the request asked for them."""
+        try:
+            context = self.mcp_server.request_context
+        except LookupError:
+            return None
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None
+
+        async def send(progress: float, total: Optional[float], message: Optional[str]):
+            await context.session.send_progress_notification(token, progress, total)
+
+        return send
+
+    def _warm_up(self):
+        try:
+            warm_up(self.config)
+        except Exception as e:
+            logger.error(f"KB warm-up failed: {e}", exc_info=True)
+
+    async def shutdown(self):
+        """Release long-lived resources: the crawler connection pool and the KB store."""
+        await close_resources()
+        logger.info("MoveworksMCP resources released.")
 
     def start(self) -> Server:
+        if self.config.warmup:
+            threading.Thread(target=self._warm_up, name="kb-warmup", daemon=True).start()
         logger.info(
             "MoveworksMCP instance configured. Returning low-level server instance for external execution."
         )
@@ -1,16 +1,33 @@
 import argparse
+import json
 import logging
+import multiprocessing
 import os
+import re
+import signal
 import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+from urllib.parse import parse_qs
+from uuid import UUID
 
 import anyio
+import uvicorn
 from dotenv import load_dotenv
+from mcp.server.lowlevel import Server
 from mcp.server.sse import SseServerTransport
 from starlette.applications import Starlette
-from starlette.routing import Route
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
 
+from mcp_common.streaming import tool_stream_endpoint
+from moveworks_mcp.cli import add_server_arguments, create_config
 from moveworks_mcp.server import MoveworksMCP
 from moveworks_mcp.utils.config import ServerConfig
+from moveworks_mcp.utils.metrics import METRICS
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,27 +35,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MESSAGES_PATH = "/messages/"
+# The session id in the endpoint event the transport sends first on each stream
+_ENDPOINT_SESSION_RE = re.compile(rb"session_id=([0-9a-f]{32})")
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Moveworks MCP SSE Server")
 
-    parser.add_argument(
-        "--docs-base-url",
-        help="Moveworks documentation base URL",
-        default=os.environ.get("MOVEWORKS_DOCS_BASE_URL", "https://help.moveworks.com/docs"),
-    )
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        help="Enable debug mode",
-        default=os.environ.get("MOVEWORKS_DEBUG", "false").lower() == "true",
-    )
-    parser.add_argument(
-        "--timeout",
-        type=int,
-        help="Request timeout in seconds",
-        default=int(os.environ.get("MOVEWORKS_TIMEOUT", "30")),
-    )
+    add_server_arguments(parser)
     parser.add_argument(
         "--host",
         help="Server host",
@@ -51,40 +56,293 @@ def parse_args():
         default=int(os.environ.get("MOVEWORKS_PORT", "8001")),
     )
 
+    sse_group = parser.add_argument_group("SSE sessions")
+    sse_group.add_argument(
+        "--max-sessions",
+        type=int,
+        help="Concurrent SSE sessions per worker; further connections get 503 (0 = unlimited)",
+        default=int(os.environ.get("MOVEWORKS_SSE_MAX_SESSIONS", "100")),
+    )
+    sse_group.add_argument(
+        "--idle-timeout",
+        type=float,
+        help=(
+            "Seconds without messages either way before a session with no request "
+            "in flight is closed (0 = never)"
+        ),
+        default=float(os.environ.get("MOVEWORKS_SSE_IDLE_TIMEOUT", "900")),
+    )
+    sse_group.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes, each with its own store and model, on consecutive ports from --port",
+        default=int(os.environ.get("MOVEWORKS_SSE_WORKERS", "1")),
+    )
+
     return parser.parse_args()
 
 
-def create_config(args) -> ServerConfig:
-    return ServerConfig(
-        docs_base_url=args.docs_base_url,
-        debug=args.debug,
-        timeout=args.timeout,
+@dataclass
+class _Session:
+    transport: SseServerTransport
+    cancel_scope: anyio.CancelScope = field(default_factory=anyio.CancelScope)
+    last_active: float = field(default_factory=time.monotonic)
+    # Ids of client requests not answered yet; a session is never idle while one is open
+    pending: Set = field(default_factory=set)
+
+    def received(self, body: bytes):
+        """Note a message the client posted."""
+        self.last_active = time.monotonic()
+        try:
+            message = json.loads(body)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
+        if "method" in message and "id" in message:
+            self.pending.add(message["id"])
+        elif message.get("method") == "notifications/cancelled":
+            self.pending.discard((message.get("params") or {}).get("requestId"))
+
+    def sent(self, body: bytes):
+        """Note a message event (a response or notification) sent down the stream."""
+        self.last_active = time.monotonic()
+        for line in body.splitlines():
+            if not line.startswith(b"data: "):
+                continue
+            try:
+                message = json.loads(line[len(b"data: "):])
+            except ValueError:
+                continue
+            if isinstance(message, dict) and ("result" in message or "error" in message):
+                self.pending.discard(message.get("id"))
+
+
+class SseSessions:
+    """
+    SSE sessions of one MCP server, each on its own transport.
+
+    The instance is the ASGI app for GET /sse. Each connection gets its own
+    SseServerTransport and runs the MCP server loop until the client
+    disconnects, the session is evicted as idle, or the server shuts down.
+    The session is registered under the id the transport announces in its
+    endpoint event, and dropped, transport and all, when the connection
+    ends. handle_post_message is the app for POST /messages/; it routes a
+    client message to its session's transport. Beyond max_sessions, new
+    connections are refused with 503 and Retry-After.
+
+    A session is idle once neither side has sent a message for idle_timeout
+    seconds and it has no request awaiting a response.
+    """
+
+    def __init__(self, mcp_server: Server, max_sessions: int = 100, idle_timeout: float = 900.0):
+        self.mcp_server = mcp_server
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[UUID, _Session] = {}
+        # Open connections, including ones whose endpoint event has not gone out yet
+        self._connections = 0
+        self.total_sessions = 0
+        self.rejected_sessions = 0
+        self.evicted_sessions = 0
+
+    @property
+    def active(self) -> int:
+        return self._connections
+
+    def stats(self) -> dict:
+        return {
+            "active_sessions": self.active,
+            "max_sessions": self.max_sessions,
+            "total_sessions": self.total_sessions,
+            "rejected_sessions": self.rejected_sessions,
+            "evicted_sessions": self.evicted_sessions,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if self.max_sessions and self.active >= self.max_sessions:
+            self.rejected_sessions += 1
+            response = Response(
+                "Too many open sessions", status_code=503, headers={"Retry-After": "5"}
+            )
+            return await response(scope, receive, send)
+
+        # One transport per connection, so nothing outlives the session in a shared table
+        session = _Session(SseServerTransport(MESSAGES_PATH))
+        session_id: Optional[UUID] = None
+
+        # End the session as soon as its event stream does: the client went
+        # away, or the server is shutting down. Without this the server loop
+        # would keep waiting on a stream nobody writes to.
+        async def watch_receive():
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                session.cancel_scope.cancel()
+            return message
+
+        async def watch_send(message):
+            nonlocal session_id
+            if message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if session_id is None:
+                    found = _ENDPOINT_SESSION_RE.search(body)
+                    if found:
+                        # Registered before the client can learn the id and post to it
+                        session_id = UUID(hex=found.group(1).decode())
+                        self._sessions[session_id] = session
+                        logger.debug(f"SSE session {session_id.hex} opened ({self.active} active)")
+                elif b"event: message" in body:
+                    session.sent(body)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                session.cancel_scope.cancel()
+
+        self._connections += 1
+        self.total_sessions += 1
+        try:
+            with session.cancel_scope:
+                async with session.transport.connect_sse(scope, watch_receive, watch_send) as streams:
+                    await self.mcp_server.run(
+                        streams[0], streams[1], self.mcp_server.create_initialization_options()
+                    )
+        finally:
+            self._connections -= 1
+            if session_id is not None:
+                self._sessions.pop(session_id, None)
+                logger.debug(f"SSE session {session_id.hex} closed ({self.active} active)")
+
+    async def handle_post_message(self, scope: Scope, receive: Receive, send: Send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        try:
+            session = self._sessions.get(UUID(hex=query.get("session_id", [""])[0]))
+        except ValueError:
+            session = None
+        if session is None:
+            response = Response("Could not find session", status_code=404)
+            return await response(scope, receive, send)
+
+        # Read the message here to track the request, then replay it to the transport
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        session.received(body)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await session.transport.handle_post_message(scope, replay, send)
+
+    async def evict_idle(self):
+        """Close sessions that have sent nothing for idle_timeout seconds; runs until cancelled."""
+        if not self.idle_timeout:
+            return
+        interval = min(self.idle_timeout / 2, 30.0)
+        while True:
+            await anyio.sleep(interval)
+            deadline = time.monotonic() - self.idle_timeout
+            for session_id, session in list(self._sessions.items()):
+                if session.last_active < deadline and not session.pending:
+                    logger.info(f"Closing idle SSE session {session_id.hex}")
+                    self.evicted_sessions += 1
+                    session.cancel_scope.cancel()
+
+
+def create_starlette_app(
+    mcp_controller: MoveworksMCP,
+    *,
+    max_sessions: int = 100,
+    idle_timeout: float = 900.0,
+    debug: bool = False,
+) -> Starlette:
+    sessions = SseSessions(mcp_controller.start(), max_sessions, idle_timeout)
+
+    async def handle_health(request):
+        return JSONResponse({"status": "ok", **sessions.stats()})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(sessions.evict_idle)
+            yield
+            tg.cancel_scope.cancel()
+        await mcp_controller.shutdown()
+
+    app = Starlette(
+        debug=debug,
+        routes=[
+            Route("/sse", endpoint=sessions),
+            Mount(MESSAGES_PATH, app=sessions.handle_post_message),
+            Route("/health", endpoint=handle_health),
+            Route("/metrics", endpoint=METRICS.endpoint),
+            Route("/stream/tools/{name}", endpoint=tool_stream_endpoint(mcp_controller), methods=["POST"]),
+        ],
+        lifespan=lifespan,
     )
+    app.state.sessions = sessions
+    return app
 
 
-async def handle_sse(request):
-    async with SseServerTransport("/messages") as transport:
-        init_options = mcp_server.create_initialization_options()
-        await mcp_server.run(
-            transport.read_stream,
-            transport.write_stream,
-            init_options,
-        )
+def serve(config: ServerConfig, host: str, port: int, max_sessions: int, idle_timeout: float):
+    """Run one server process: its own KB store, embedding model and session table."""
+    mcp_controller = MoveworksMCP(config)
+    app = create_starlette_app(
+        mcp_controller, max_sessions=max_sessions, idle_timeout=idle_timeout, debug=config.debug
+    )
+    logger.info(f"Starting SSE server on {host}:{port}")
+    uvicorn.run(app, host=host, port=port, timeout_graceful_shutdown=5)
 
 
-async def handle_messages(request):
-    async with SseServerTransport("/messages") as transport:
-        init_options = mcp_server.create_initialization_options()
-        await mcp_server.run(
-            transport.read_stream,
-            transport.write_stream,
-            init_options,
+def run_workers(config: ServerConfig, args):
+    """
+    Run one server process per worker on consecutive ports.
+
+    An SSE session lives in the process that accepted its /sse connection,
+    and the client posts its messages back to the same host and port. Workers
+    sharing one port would receive each other's messages, so every worker
+    gets its own port. Balance clients across the ports, or put a proxy with
+    client affinity in front of them.
+    """
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    # Stopping the parent (e.g. by a process manager) must not orphan the workers
+    signal.signal(signal.SIGTERM, stop)
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=serve,
+            args=(config, args.host, args.port + i, args.max_sessions, args.idle_timeout),
+            name=f"moveworks-sse-{i}",
         )
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info(f"Started {len(workers)} workers on ports {args.port}-{args.port + len(workers) - 1}")
+    try:
+        for worker in workers:
+            worker.join()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
 
 
 def main():
-    global mcp_server
-
     load_dotenv()
 
     try:
@@ -99,21 +357,10 @@ def main():
         config = create_config(args)
         logger.info(f"Initializing Moveworks MCP SSE server with docs URL: {config.docs_base_url}")
 
-        mcp_controller = MoveworksMCP(config)
-
-        mcp_server = mcp_controller.start()
-
-        app = Starlette(
-            debug=args.debug,
-            routes=[
-                Route("/sse", endpoint=handle_sse),
-                Route("/messages", endpoint=handle_messages, methods=["POST"]),
-            ],
-        )
-
-        import uvicorn
-        logger.info(f"Starting SSE server on {args.host}:{args.port}")
-        uvicorn.run(app, host=args.host, port=args.port)
+        if args.workers > 1:
+            run_workers(config, args)
+        else:
+            serve(config, args.host, args.port, args.max_sessions, args.idle_timeout)
 
     except ValueError as e:
         logger.error(f"Configuration or runtime error: {e}")
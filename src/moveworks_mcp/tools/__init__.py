@@ -1,15 +1,19 @@
 from moveworks_mcp.tools.kb_tools import (
     mw_kb_index_pages,
     mw_kb_index_domain,
+    mw_kb_index_admin,
     mw_kb_list,
     mw_kb_remove,
     mw_kb_search,
+    mw_kb_search_batch,
 )
 
 __all__ = [
     "mw_kb_index_pages",
     "mw_kb_index_domain",
+    "mw_kb_index_admin",
     "mw_kb_list",
     "mw_kb_remove",
     "mw_kb_search",
+    "mw_kb_search_batch",
 ]
@@ -1,35 +1,132 @@
+import asyncio
 import logging
+import threading
+import time
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from mcp_common.response_budget import LinkedItems
+from mcp_common.streaming import report_progress, threadsafe_reporter
 from moveworks_mcp.auth.auth_manager import AuthManager
-from moveworks_mcp.kb.crawler import DocCrawler
+from moveworks_mcp.kb.crawler import CrawlerClient, DocCrawler
+from moveworks_mcp.kb.dedup import canonicalize_url
+from moveworks_mcp.kb.embeddings import EmbeddingBackend, create_embedding_backend
 from moveworks_mcp.kb.indexer import KBIndexer
+from moveworks_mcp.kb.rerank import create_reranker
 from moveworks_mcp.kb.search import KBSearch
+from moveworks_mcp.kb.tracing import collect_timings
 from moveworks_mcp.utils.config import ServerConfig
 
 logger = logging.getLogger(__name__)
 
-# Singletons — loaded once, reused across all tool calls
+# Singletons — loaded once, reused across all tool calls. Nothing heavy happens
+# at import time: the Chroma store opens on the first KB tool call and the
+# embedding model loads on the first index or search call (or during warm-up).
+# The searcher reads through the same KBIndexer the index tools write to, so the
+# process holds exactly one store client and one embedding model.
+_lock = threading.RLock()
+_embedder: Optional[EmbeddingBackend] = None
 _indexer: Optional[KBIndexer] = None
 _searcher: Optional[KBSearch] = None
+_crawler_client: Optional[CrawlerClient] = None
 
 
-def get_indexer() -> KBIndexer:
+def get_embedder(config: ServerConfig) -> EmbeddingBackend:
+    global _embedder
+    with _lock:
+        if _embedder is None:
+            _embedder = create_embedding_backend(
+                backend=config.embedding_backend,
+                model_name=config.embedding_model,
+                model_file=config.embedding_model_file,
+                batch_size=config.embedding_batch_size,
+            )
+    return _embedder
+
+
+def get_indexer(config: ServerConfig) -> KBIndexer:
     global _indexer
-    if _indexer is None:
-        _indexer = KBIndexer()
+    with _lock:
+        if _indexer is None:
+            _indexer = KBIndexer(
+                near_duplicate_distance=config.near_duplicate_distance,
+                embedder_factory=lambda: get_embedder(config),
+                db_path=config.db_path,
+                hnsw_settings={
+                    "M": config.hnsw_m,
+                    "construction_ef": config.hnsw_construction_ef,
+                    "search_ef": config.hnsw_search_ef,
+                    "batch_size": config.hnsw_batch_size,
+                    "sync_threshold": config.hnsw_sync_threshold,
+                    "num_threads": config.hnsw_num_threads,
+                },
+                vector_backend=config.vector_backend,
+                vector_dtype=config.vector_dtype,
+            )
     return _indexer
 
 
-def get_searcher() -> KBSearch:
+def get_searcher(config: ServerConfig) -> KBSearch:
     global _searcher
-    if _searcher is None:
-        _searcher = KBSearch()
+    with _lock:
+        if _searcher is None:
+            _searcher = KBSearch(
+                indexer=get_indexer(config),
+                fusion=config.search_fusion,
+                rrf_k=config.search_rrf_k,
+                vector_depth=config.search_vector_depth,
+                lexical_depth=config.search_lexical_depth,
+                vector_weight=config.search_vector_weight,
+                lexical_weight=config.search_lexical_weight,
+                view_weights=config.search_view_weights,
+                rerank=config.rerank,
+                reranker_factory=lambda: create_reranker(
+                    model_name=config.rerank_model,
+                    backend=config.rerank_backend,
+                    batch_size=config.rerank_batch_size,
+                    cache_size=config.rerank_cache_size,
+                ),
+                rerank_candidates=config.rerank_candidates,
+                rerank_budget_ms=config.rerank_budget_ms,
+            )
     return _searcher
 
 
+def warm_up(config: ServerConfig):
+    """Open the store and load the models ahead of the first tool call."""
+    start = time.perf_counter()
+    get_indexer(config).embedder.encode_one("warm-up")
+    if config.rerank:
+        get_searcher(config).reranker.score([("warm-up", "warm-up")])
+    logger.info("KB warm-up finished in %.2fs", time.perf_counter() - start)
+
+
+def get_crawler_client(config: ServerConfig) -> CrawlerClient:
+    global _crawler_client
+    if _crawler_client is None:
+        _crawler_client = CrawlerClient(
+            limit=config.crawler_max_connections,
+            limit_per_host=config.crawler_limit_per_host,
+            dns_cache_ttl=config.crawler_dns_cache_ttl,
+            keepalive_timeout=config.crawler_keepalive_timeout,
+        )
+    return _crawler_client
+
+
+async def close_resources():
+    """Close the crawler pool and the KB store; the next tool call reopens them."""
+    global _embedder, _indexer, _searcher, _crawler_client
+    if _crawler_client is not None:
+        await _crawler_client.close()
+        _crawler_client = None
+
+    with _lock:
+        indexer, _indexer, _searcher, _embedder = _indexer, None, None, None
+    if indexer is not None:
+        indexer.close()
+
+
 # ── Pydantic param models ──────────────────────────────────────────────────
 
 
@@ -42,6 +139,10 @@ class MwKbIndexPagesParams(BaseModel):
         default=False,
         description="If True, re-index pages even if they already exist in the knowledge base (overwrite)"
     )
+    debug_timings: bool = Field(
+        default=False,
+        description="Add a debug_timings field with the time spent in each crawl and index stage, for diagnosing slow calls"
+    )
 
 
 class MwKbIndexDomainParams(BaseModel):
@@ -61,6 +162,10 @@ class MwKbIndexDomainParams(BaseModel):
         default=False,
         description="If True, re-index pages even if they already exist in the knowledge base (overwrite)"
     )
+    debug_timings: bool = Field(
+        default=False,
+        description="Add a debug_timings field with the time spent in each crawl and index stage, for diagnosing slow calls"
+    )
 
 
 class MwKbListParams(BaseModel):
@@ -68,12 +173,37 @@ class MwKbListParams(BaseModel):
         default=None,
         description="Optional domain filter (e.g. 'help.moveworks.com'). Omit to list all indexed pages."
     )
+    url_prefix: Optional[str] = Field(
+        default=None,
+        description="Only list pages whose URL starts with this prefix (e.g. 'https://help.moveworks.com/docs/compound')"
+    )
+    breadcrumb_prefix: Optional[str] = Field(
+        default=None,
+        description="Only list pages whose navigation path starts with this prefix (case-insensitive, e.g. 'Agent Studio > Actions')"
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor from a previous call, to fetch the following page of results"
+    )
+    limit: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Maximum number of pages to return in this call"
+    )
+    counts_only: bool = Field(
+        default=False,
+        description="Return only the number of matching pages per domain, without listing them"
+    )
 
 
 class MwKbRemoveParams(BaseModel):
     urls: Optional[List[str]] = Field(
         default=None,
-        description="List of specific page URLs to remove from the index"
+        description=(
+            "List of specific page URLs to remove from the index; canonicalized like indexed URLs "
+            "(host case, trailing slashes and tracking parameters do not matter)"
+        )
     )
     domain: Optional[str] = Field(
         default=None,
@@ -84,34 +214,139 @@ class MwKbRemoveParams(BaseModel):
 class MwKbSearchParams(BaseModel):
     query: str = Field(
         ...,
-        description="Natural-language search query. Returns top-10 pages via hybrid semantic + BM25 search."
+        description="Natural-language search query. Returns the top pages via hybrid semantic + BM25 search."
+    )
+    top_k: int = Field(
+        default=10,
+        ge=1,
+        le=50,
+        description="Number of pages to return"
+    )
+    fusion: Optional[str] = Field(
+        default=None,
+        description="How semantic and keyword rankings are combined: 'linear' (weighted scores, the default) or 'rrf' (reciprocal rank fusion, scores on a smaller scale). Omit to use the server default."
+    )
+    rerank: Optional[bool] = Field(
+        default=None,
+        description="Re-score the top candidates with a cross-encoder for more precise ordering (adds a few tens of ms). Omit to use the server default."
+    )
+    domain: Optional[str] = Field(
+        default=None,
+        description="Only search pages from this domain (e.g. 'help.moveworks.com')"
+    )
+    breadcrumb_prefix: Optional[str] = Field(
+        default=None,
+        description="Only search pages whose navigation path starts with this prefix (case-insensitive, e.g. 'Agent Studio > Actions')"
+    )
+    view_types: Optional[List[str]] = Field(
+        default=None,
+        description="Only match these indexed views of each page: 'breadcrumb', 'title_path', 'full_content'. Omit to match all."
+    )
+    debug_timings: bool = Field(
+        default=False,
+        description="Add a debug_timings field with the time spent in each search stage, for diagnosing slow calls"
+    )
+
+
+class MwKbSearchBatchParams(BaseModel):
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Search queries to run together, e.g. one per topic or term being researched (1-20)"
+    )
+    top_k: int = Field(
+        default=5,
+        ge=1,
+        le=50,
+        description="Number of pages to return per query"
+    )
+    domain: Optional[str] = Field(
+        default=None,
+        description="Only search pages from this domain (e.g. 'help.moveworks.com')"
+    )
+    breadcrumb_prefix: Optional[str] = Field(
+        default=None,
+        description="Only search pages whose navigation path starts with this prefix (case-insensitive)"
+    )
+    view_types: Optional[List[str]] = Field(
+        default=None,
+        description="Only match these indexed views of each page: 'breadcrumb', 'title_path', 'full_content'. Omit to match all."
+    )
+    fusion: Optional[str] = Field(
+        default=None,
+        description="'linear' (default) or 'rrf'. Omit to use the server default."
+    )
+    rerank: Optional[bool] = Field(
+        default=None,
+        description="Re-score each query's top candidates with a cross-encoder. Omit to use the server default."
+    )
+    debug_timings: bool = Field(
+        default=False,
+        description="Add a debug_timings field with the time spent in each search stage, for diagnosing slow calls"
+    )
+
+
+class MwKbIndexAdminParams(BaseModel):
+    action: str = Field(
+        default="stats",
+        description="'stats' to report record counts and index settings, or 'rebuild' to rebuild the vector index with the configured settings (compacts it on the numpy backend)"
+    )
+    collection: str = Field(
+        default="chunks",
+        description="Collection to rebuild: 'chunks' (searched vectors), 'pages', or 'all'"
     )
 
 
 # ── Tool implementations ───────────────────────────────────────────────────
 
 
+async def _report_crawl(done: int, total: Optional[int], url: str):
+    await report_progress(done, total, f"Crawled {url}")
+
+
+async def _index_crawled(indexer: KBIndexer, pages: Dict[str, dict], force: bool) -> dict:
+    """Index crawled pages off the event loop; progress continues from the crawl's page count."""
+    report = threadsafe_reporter()
+    crawled = len(pages)
+
+    def on_progress(written: int, to_write: int):
+        report(crawled + written, crawled + to_write, f"Indexed {written}/{to_write} new pages")
+
+    return await asyncio.to_thread(indexer.index_pages, pages, force, on_progress)
+
+
 async def mw_kb_index_pages(
     config: ServerConfig,
     auth_manager: AuthManager,
     params: MwKbIndexPagesParams,
 ) -> Dict[str, Any]:
     try:
-        crawler = DocCrawler(base_url=params.urls[0])
-        pages = await crawler.crawl_multiple(params.urls)
-        indexer = get_indexer()
-        result = indexer.index_pages(pages, force=params.force_refresh)
+        with collect_timings(params.debug_timings) as timings:
+            crawler = DocCrawler(
+                base_url=params.urls[0],
+                client=get_crawler_client(config),
+                strip_query_params=config.dedup_strip_query_params,
+            )
+            pages = await crawler.crawl_multiple(params.urls, on_progress=_report_crawl)
+            indexer = get_indexer(config)
+            result = await _index_crawled(indexer, pages, params.force_refresh)
         logger.info(
-            "mw_kb_index_pages: %d indexed, %d skipped",
-            len(result["indexed"]), len(result["skipped"]),
+            "mw_kb_index_pages: %d indexed, %d skipped, %d duplicates",
+            len(result["indexed"]), len(result["skipped"]), len(result["duplicates"]),
         )
-        return {
+        response = {
             "status": "success",
             "indexed_count": len(result["indexed"]),
             "skipped_count": len(result["skipped"]),
+            "duplicate_count": len(result["duplicates"]),
             "indexed_urls": result["indexed"],
             "skipped_urls": result["skipped"],
+            "duplicates": result["duplicates"],
         }
+        if timings is not None:
+            response["debug_timings"] = timings.as_dict()
+        return response
     except Exception as e:
         logger.error(f"mw_kb_index_pages error: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
@@ -123,23 +358,34 @@ async def mw_kb_index_domain(
     params: MwKbIndexDomainParams,
 ) -> Dict[str, Any]:
     try:
-        crawler = DocCrawler(base_url=params.base_url, max_pages=params.max_pages)
-        pages = await crawler.crawl_domain(sitemap_url=params.sitemap_url)
-        indexer = get_indexer()
-        result = indexer.index_pages(pages, force=params.force_refresh)
+        with collect_timings(params.debug_timings) as timings:
+            crawler = DocCrawler(
+                base_url=params.base_url,
+                max_pages=params.max_pages,
+                client=get_crawler_client(config),
+                strip_query_params=config.dedup_strip_query_params,
+            )
+            pages = await crawler.crawl_domain(sitemap_url=params.sitemap_url, on_progress=_report_crawl)
+            indexer = get_indexer(config)
+            result = await _index_crawled(indexer, pages, params.force_refresh)
         logger.info(
-            "mw_kb_index_domain: found %d pages, %d indexed, %d skipped",
-            len(pages), len(result["indexed"]), len(result["skipped"]),
+            "mw_kb_index_domain: found %d pages, %d indexed, %d skipped, %d duplicates",
+            len(pages), len(result["indexed"]), len(result["skipped"]), len(result["duplicates"]),
         )
-        return {
+        response = {
             "status": "success",
             "domain": params.base_url,
             "total_pages_found": len(pages),
             "indexed_count": len(result["indexed"]),
             "skipped_count": len(result["skipped"]),
+            "duplicate_count": len(result["duplicates"]),
             "indexed_urls": result["indexed"],
             "skipped_urls": result["skipped"],
+            "duplicates": result["duplicates"],
         }
+        if timings is not None:
+            response["debug_timings"] = timings.as_dict()
+        return response
     except Exception as e:
         logger.error(f"mw_kb_index_domain error: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
@@ -151,8 +397,24 @@ def mw_kb_list(
     params: MwKbListParams,
 ) -> Dict[str, Any]:
     try:
-        indexer = get_indexer()
-        pages = indexer.list_pages(domain=params.domain)
+        indexer = get_indexer(config)
+        filters = {
+            "domain": params.domain,
+            "url_prefix": params.url_prefix,
+            "breadcrumb_prefix": params.breadcrumb_prefix,
+        }
+        if params.counts_only:
+            counts = indexer.page_counts(**filters)
+            return {
+                "total_pages": sum(counts.values()),
+                "domains": counts,
+            }
+
+        # Fetch one extra row to know whether another page of results exists
+        pages = indexer.list_pages(**filters, cursor=params.cursor, limit=params.limit + 1)
+        has_more = len(pages) > params.limit
+        pages = pages[:params.limit]
+
         grouped: Dict[str, list] = {}
         for page in pages:
             d = page["domain"]
@@ -162,10 +424,15 @@ def mw_kb_list(
                 "title": page["title"],
                 "navigation_path": page["breadcrumb"],
             })
-        return {
-            "total_pages": len(pages),
+        result = {
+            "returned": len(pages),
             "domains": grouped,
+            "next_cursor": pages[-1]["url"] if has_more else None,
         }
+        if params.cursor is None:
+            # Counting is only done for the first page of a listing
+            result["total_pages"] = sum(indexer.page_counts(**filters).values())
+        return result
     except Exception as e:
         logger.error(f"mw_kb_list error: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
@@ -177,20 +444,29 @@ async def mw_kb_remove(
     params: MwKbRemoveParams,
 ) -> Dict[str, Any]:
     try:
-        indexer = get_indexer()
+        indexer = get_indexer(config)
         removed = []
+        not_found = []
         if params.urls:
-            for url in params.urls:
-                indexer.remove_page(url)
-                removed.append(url)
+            # Pages are stored under the canonical URL the crawler indexed them by
+            canonical = {
+                url: canonicalize_url(url, config.dedup_strip_query_params) for url in params.urls
+            }
+            removed_urls = indexer.remove_pages(list(canonical.values()))
+            removed.extend(removed_urls)
+            gone = set(removed_urls)
+            not_found = sorted(url for url, page in canonical.items() if page not in gone)
         if params.domain:
-            indexer.remove_domain(params.domain)
-            removed.append(f"all pages from domain: {params.domain}")
-        logger.info(f"mw_kb_remove: removed {removed}")
-        return {
+            count = len(indexer.remove_domain(params.domain.strip().lower()))
+            removed.append(f"all pages from domain: {params.domain} ({count} pages)")
+        logger.info(f"mw_kb_remove: removed {len(removed)} entries, {len(not_found)} not found")
+        result = {
             "status": "success",
             "removed": removed,
         }
+        if not_found:
+            result["not_found"] = not_found
+        return result
     except Exception as e:
         logger.error(f"mw_kb_remove error: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
@@ -202,9 +478,18 @@ def mw_kb_search(
     params: MwKbSearchParams,
 ) -> Dict[str, Any]:
     try:
-        searcher = get_searcher()
-        results = searcher.search(params.query, top_k=10)
-        return {
+        with collect_timings(params.debug_timings) as timings:
+            searcher = get_searcher(config)
+            results = searcher.search(
+                params.query,
+                top_k=params.top_k,
+                domain=params.domain,
+                breadcrumb_prefix=params.breadcrumb_prefix,
+                view_types=params.view_types,
+                fusion=params.fusion,
+                rerank=params.rerank,
+            )
+        response = {
             "query": params.query,
             "total_results": len(results),
             "results": [
@@ -214,11 +499,104 @@ def mw_kb_search(
                     "title": r["title"],
                     "navigation_path": r["breadcrumb"],
                     "relevance_score": r["score"],
+                    **({"rerank_score": r["rerank_score"]} if "rerank_score" in r else {}),
                     "content": r["content"],
                 }
                 for i, r in enumerate(results)
             ],
         }
+        if timings is not None:
+            response["debug_timings"] = timings.as_dict()
+        return response
     except Exception as e:
         logger.error(f"mw_kb_search error: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
+
+
+def mw_kb_search_batch(
+    config: ServerConfig,
+    auth_manager: AuthManager,
+    params: MwKbSearchBatchParams,
+) -> Dict[str, Any]:
+    try:
+        searcher = get_searcher(config)
+        queries = list(dict.fromkeys(q.strip() for q in params.queries if q.strip()))
+        if not queries:
+            return {"status": "error", "message": "queries must contain at least one non-empty query"}
+
+        with collect_timings(params.debug_timings) as timings:
+            results_per_query = searcher.search_many(
+                queries,
+                top_k=params.top_k,
+                domain=params.domain,
+                breadcrumb_prefix=params.breadcrumb_prefix,
+                view_types=params.view_types,
+                fusion=params.fusion,
+                rerank=params.rerank,
+            )
+
+        # Each page's content is returned once, however many queries matched it
+        pages: Dict[str, Dict[str, Any]] = {}
+        query_results = []
+        for query, results in zip(queries, results_per_query):
+            hits = []
+            for i, r in enumerate(results):
+                pages.setdefault(r["url"], {
+                    "title": r["title"],
+                    "navigation_path": r["breadcrumb"],
+                    "content": r["content"],
+                })
+                hit = {"rank": i + 1, "url": r["url"], "relevance_score": r["score"]}
+                if "rerank_score" in r:
+                    hit["rerank_score"] = r["rerank_score"]
+                hits.append(hit)
+            query_results.append({"query": query, "results": hits})
+
+        response = {
+            "total_queries": len(queries),
+            "total_pages": len(pages),
+            "queries": query_results,
+            "pages": pages,
+        }
+        if timings is not None:
+            response["debug_timings"] = timings.as_dict()
+        return response
+    except Exception as e:
+        logger.error(f"mw_kb_search_batch error: {e}", exc_info=True)
+        return {"status": "error", "message": str(e)}
+
+
+# Batch hits refer to pages returned once; a truncated batch is split by query
+LINKED_RESULTS = {
+    "mw_kb_search_batch": LinkedItems(
+        items="queries", shared="pages", refs=lambda query: [hit["url"] for hit in query["results"]]
+    ),
+}
+
+
+async def mw_kb_index_admin(
+    config: ServerConfig,
+    auth_manager: AuthManager,
+    params: MwKbIndexAdminParams,
+) -> Dict[str, Any]:
+    try:
+        indexer = get_indexer(config)
+        if params.action == "stats":
+            return {"status": "success", "collections": indexer.index_stats()}
+        if params.action != "rebuild":
+            return {"status": "error", "message": f"Unknown action '{params.action}'. Valid actions: ['stats', 'rebuild']"}
+
+        targets = ["chunks", "pages"] if params.collection == "all" else [params.collection]
+        rebuilt = []
+        for target in targets:
+            # Copying every vector can take a while; keep the event loop responsive
+            rebuilt.append(await asyncio.to_thread(indexer.rebuild_collection, target))
+        logger.info(f"mw_kb_index_admin: rebuilt {rebuilt}")
+        return {
+            "status": "success",
+            "rebuilt": rebuilt,
+            "collections": indexer.index_stats(),
+        }
+    except Exception as e:
+        logger.error(f"mw_kb_index_admin error: {e}", exc_info=True)
+        return {"status": "error", "message": str(e)}
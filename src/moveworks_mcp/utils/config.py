@@ -1,7 +1,92 @@
+from typing import Dict, List, Optional
+
 from pydantic import BaseModel
 
+from moveworks_mcp.kb.dedup import DEFAULT_STRIP_QUERY_PARAMS
+from moveworks_mcp.kb.indexer import DB_PATH
+from moveworks_mcp.kb.embeddings import EMBEDDING_MODEL
+from moveworks_mcp.kb.rerank import RERANK_MODEL
+from moveworks_mcp.kb.search import DEFAULT_VIEW_WEIGHTS
+
 
 class ServerConfig(BaseModel):
     debug: bool = False
     timeout: int = 30
     docs_base_url: str = "https://help.moveworks.com/docs"
+    # Tool result encoding: "compact" (minimal JSON) or "pretty" (indented)
+    output_format: str = "compact"
+    # Response budget in bytes (0 = unlimited), per-tool overrides, how long
+    # the remainder of a truncated response stays available to fetch_continuation
+    # and the total size of the remainders kept
+    max_response_bytes: int = 0
+    response_budgets: Dict[str, int] = {}
+    continuation_ttl_seconds: int = 300
+    continuation_max_bytes: int = 64_000_000
+    # Build and check every tool schema at startup instead of on the first list_tools
+    validate_tools: bool = False
+
+    # Shared crawler HTTP client
+    crawler_max_connections: int = 100
+    crawler_limit_per_host: int = 8
+    crawler_dns_cache_ttl: int = 300
+    crawler_keepalive_timeout: float = 30.0
+
+    # Location of the persistent Chroma store
+    db_path: str = DB_PATH
+
+    # HNSW settings of the vector collections; None keeps Chroma's default.
+    # Build parameters apply to new collections and to mw_kb_index_admin rebuilds.
+    hnsw_m: Optional[int] = None
+    hnsw_construction_ef: Optional[int] = None
+    hnsw_search_ef: Optional[int] = None
+    hnsw_batch_size: Optional[int] = None
+    hnsw_sync_threshold: Optional[int] = None
+    hnsw_num_threads: Optional[int] = None
+
+    # Chunk vector search: "chroma" (HNSW) or "numpy" (exact, memory-mapped matrix)
+    vector_backend: str = "chroma"
+    vector_dtype: str = "float32"
+
+    # Duplicate detection during indexing
+    dedup_strip_query_params: List[str] = list(DEFAULT_STRIP_QUERY_PARAMS)
+    near_duplicate_distance: int = 3
+
+    # Embedding model shared by indexing and search
+    embedding_backend: str = "torch"
+    embedding_model: str = EMBEDDING_MODEL
+    embedding_model_file: Optional[str] = None
+    embedding_batch_size: int = 32
+
+    # Hybrid search ranking (see KBSearch)
+    search_fusion: str = "linear"
+    search_rrf_k: int = 60
+    search_vector_depth: int = 40
+    search_lexical_depth: int = 40
+    search_vector_weight: float = 0.7
+    search_lexical_weight: float = 0.3
+    search_view_weights: Dict[str, float] = dict(DEFAULT_VIEW_WEIGHTS)
+
+    # Optional cross-encoder re-ranking of the top fused candidates
+    rerank: bool = False
+    rerank_model: str = RERANK_MODEL
+    rerank_backend: str = "torch"
+    rerank_candidates: int = 20
+    rerank_budget_ms: float = 60.0
+    rerank_batch_size: int = 16
+    rerank_cache_size: int = 4096
+
+    # Load the store and embedding model in the background at startup
+    warmup: bool = False
+
+    # Report KB search, indexing and crawl stages as OpenTelemetry spans
+    # (needs opentelemetry-api and a tracer provider set up by the host)
+    tracing: bool = False
+
+    # Opt-in profiling of tool calls (mcp_common/profiling.py): the fraction of
+    # calls profiled, how, where the files go and how many are kept per tool.
+    # Setting a directory or a rate also offers the server_profiler tool.
+    profile_dir: Optional[str] = None
+    profile_rate: float = 0.0
+    profile_mode: str = "sample"
+    profile_keep: int = 20
+    profile_min_ms: float = 0.0
@@ -0,0 +1,4 @@
+from mcp_common.metrics import ToolMetrics
+
+# Tool-call metrics, served on /metrics and by the server_metrics tool
+METRICS = ToolMetrics("moveworks_mcp")
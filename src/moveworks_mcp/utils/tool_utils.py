@@ -3,14 +3,18 @@ from typing import Any, Callable, Dict, Tuple, Type
 from moveworks_mcp.tools.kb_tools import (
     MwKbIndexPagesParams,
     MwKbIndexDomainParams,
+    MwKbIndexAdminParams,
     MwKbListParams,
     MwKbRemoveParams,
+    MwKbSearchBatchParams,
     MwKbSearchParams,
     mw_kb_index_pages,
     mw_kb_index_domain,
+    mw_kb_index_admin,
     mw_kb_list,
     mw_kb_remove,
     mw_kb_search,
+    mw_kb_search_batch,
 )
 
 ParamsModel = Type[Any]
@@ -38,7 +42,8 @@ def get_tool_definitions() -> Dict[str, ToolDefinition]:
             (
                 "Crawl and index an entire documentation domain into the Moveworks knowledge base. "
                 "Parses sitemap.xml first for fast URL discovery, then crawls concurrently in batches of 10. "
-                "Stays within the domain boundary. Creates 3 semantic vectors per page "
+                "Stays within the domain boundary, canonicalizes URLs and skips near-duplicate pages. "
+                "Creates 3 semantic vectors per page "
                 "(breadcrumb-only, title+breadcrumb, full content) backed by a ChromaDB persistent store. "
                 "Use this once to build the full KB for a site like help.moveworks.com."
             ),
@@ -49,9 +54,11 @@ def get_tool_definitions() -> Dict[str, ToolDefinition]:
             MwKbListParams,
             Dict[str, Any],
             (
-                "List all pages currently indexed in the Moveworks knowledge base, grouped by domain. "
+                "List pages currently indexed in the Moveworks knowledge base, grouped by domain. "
                 "Each entry shows the URL, title, and navigation_path (breadcrumb hierarchy). "
-                "Pass an optional domain filter to scope results. "
+                "Pass an optional domain, url_prefix or breadcrumb_prefix filter to scope results. "
+                "Results are paginated: when next_cursor is set, call again with cursor=next_cursor "
+                "for the next page. Set counts_only=true to get just the page count per domain. "
                 "Use this to explore what documentation is available before searching."
             ),
             "raw_dict",
@@ -75,12 +82,44 @@ def get_tool_definitions() -> Dict[str, ToolDefinition]:
             (
                 "Search the Moveworks knowledge base using hybrid semantic + BM25 retrieval. "
                 "Encodes the query with sentence-transformers, queries all 3 vector types "
-                "(breadcrumb, title_path, full_content), deduplicates by URL, "
-                "re-ranks with BM25 (30%) blended with vector similarity (70%), "
-                "and returns the top 10 full pages with rank, title, navigation_path, "
+                "(breadcrumb, title_path, full_content), runs a BM25 keyword query over page text, "
+                "fuses both rankings by URL (weighted scores by default, or reciprocal rank fusion with fusion='rrf'), "
+                "and returns the top_k (default 10) full pages with rank, title, navigation_path, "
                 "relevance score, and complete content. "
-                "Use this after indexing to answer questions about Moveworks features."
-                "For best results search one topic/term at a time in repeated way to get more knowledge"
+                "Optionally scope the search with domain, breadcrumb_prefix (a navigation subtree "
+                "such as 'Agent Studio > Actions') or view_types. "
+                "Use this after indexing to answer questions about Moveworks features. "
+                "For best results search one topic/term per query; to research several topics, "
+                "use mw_kb_search_batch instead of calling this tool repeatedly."
+            ),
+            "raw_dict",
+        ),
+        "mw_kb_search_batch": (
+            mw_kb_search_batch,
+            MwKbSearchBatchParams,
+            Dict[str, Any],
+            (
+                "Run several Moveworks knowledge base searches in one call (up to 20 queries). "
+                "Each query is searched exactly like mw_kb_search, with the same optional filters, "
+                "but all queries share one embedding pass and one vector query. "
+                "Returns 'queries' (each query's ranked results as url + relevance score) and "
+                "'pages' (title, navigation_path and full content of every matched page, keyed by URL "
+                "and included once even when several queries match it). "
+                "Prefer this over repeated mw_kb_search calls when researching multiple topics or terms."
+            ),
+            "raw_dict",
+        ),
+        "mw_kb_index_admin": (
+            mw_kb_index_admin,
+            MwKbIndexAdminParams,
+            Dict[str, Any],
+            (
+                "Administer the Moveworks knowledge base vector index. "
+                "action='stats' reports record counts and the HNSW settings (space, M, ef_construction, "
+                "ef_search) of each collection. action='rebuild' copies a collection ('chunks', 'pages' "
+                "or 'all') into a fresh index built with the server's configured HNSW settings, "
+                "reclaiming space left by removed pages; stored vectors are reused, nothing is re-embedded. "
+                "Indexing and removal wait while a rebuild runs."
             ),
             "raw_dict",
         ),
@@ -3,9 +3,9 @@ import logging
 import os
 from typing import Dict, Optional
 
-import requests
 from requests.auth import HTTPBasicAuth
 
+from servicenow_mcp.utils import http_client
 from servicenow_mcp.utils.config import AuthConfig, AuthType
 
 
@@ -77,7 +77,7 @@ class AuthManager:
         }
         
         logger.info("Attempting client_credentials grant...")
-        response = requests.post(token_url, headers=headers, data=data_client_credentials)
+        response = http_client.post(token_url, headers=headers, data=data_client_credentials)
         
         logger.info(f"client_credentials response status: {response.status_code}")
         logger.info(f"client_credentials response body: {response.text}")
@@ -96,7 +96,7 @@ class AuthManager:
             }
             
             logger.info("Attempting password grant...")
-            response = requests.post(token_url, headers=headers, data=data_password)
+            response = http_client.post(token_url, headers=headers, data=data_password)
             
             logger.info(f"password grant response status: {response.status_code}")
             logger.info(f"password grant response body: {response.text}")
@@ -7,6 +7,9 @@ import anyio
 from dotenv import load_dotenv
 from mcp.server.stdio import stdio_server
 
+from mcp_common.profiling import PROFILE_MODES
+from mcp_common.response_budget import parse_budgets
+from mcp_common.serialization import OUTPUT_FORMATS
 from servicenow_mcp.server import ServiceNowMCP
 from servicenow_mcp.utils.config import (
     ApiKeyConfig,
@@ -44,6 +47,98 @@ def parse_args():
         help="Request timeout in seconds",
         default=int(os.environ.get("SERVICENOW_TIMEOUT", "30")),
     )
+    parser.add_argument(
+        "--output-format",
+        choices=list(OUTPUT_FORMATS),
+        help="Encoding of tool results: compact JSON, or indented JSON for reading by eye",
+        default=os.environ.get("SERVICENOW_OUTPUT_FORMAT", "compact"),
+    )
+    parser.add_argument(
+        "--validate-tools",
+        action="store_true",
+        help="Build and check every tool schema at startup, failing fast on an invalid one",
+        default=os.environ.get("SERVICENOW_VALIDATE_TOOLS", "false").lower() == "true",
+    )
+
+    budget_group = parser.add_argument_group("Response budget")
+    budget_group.add_argument(
+        "--max-response-bytes",
+        type=int,
+        help="Largest tool response in bytes; bigger results are truncated with a continuation token (0 = unlimited)",
+        default=int(os.environ.get("SERVICENOW_MAX_RESPONSE_BYTES", "0")),
+    )
+    budget_group.add_argument(
+        "--response-budgets",
+        type=parse_budgets,
+        help="Per-tool byte budgets as 'tool=bytes,...', overriding --max-response-bytes",
+        default=os.environ.get("SERVICENOW_RESPONSE_BUDGETS", ""),
+    )
+    budget_group.add_argument(
+        "--continuation-ttl",
+        type=int,
+        help="Seconds the remainder of a truncated response can be fetched with fetch_continuation",
+        default=int(os.environ.get("SERVICENOW_CONTINUATION_TTL", "300")),
+    )
+    budget_group.add_argument(
+        "--continuation-max-bytes",
+        type=int,
+        help="Total size of the truncated-response remainders kept for fetch_continuation; oldest evicted first",
+        default=int(os.environ.get("SERVICENOW_CONTINUATION_MAX_BYTES", "64000000")),
+    )
+
+    http_group = parser.add_argument_group("ServiceNow HTTP")
+    http_group.add_argument(
+        "--http-retries",
+        type=int,
+        help="Retries of REST reads on 429/502/503/504 or connection errors (0 = no retries)",
+        default=int(os.environ.get("SERVICENOW_HTTP_RETRIES", "0")),
+    )
+    http_group.add_argument(
+        "--http-retry-backoff",
+        type=float,
+        help="Base delay in seconds between retries, doubled each attempt (Retry-After wins when sent)",
+        default=float(os.environ.get("SERVICENOW_HTTP_RETRY_BACKOFF", "0.5")),
+    )
+    http_group.add_argument(
+        "--http-pool-size",
+        type=int,
+        help="Keep-alive connections kept open to the instance",
+        default=int(os.environ.get("SERVICENOW_HTTP_POOL_SIZE", "10")),
+    )
+
+    profile_group = parser.add_argument_group(
+        "Profiling",
+        "Profile a fraction of tool calls and write one file per call; off unless a directory or rate is set.",
+    )
+    profile_group.add_argument(
+        "--profile-dir",
+        help="Directory for profile files; also offers the server_profiler admin tool",
+        default=os.environ.get("SERVICENOW_PROFILE_DIR"),
+    )
+    profile_group.add_argument(
+        "--profile-rate",
+        type=float,
+        help="Fraction of tool calls to profile from startup (0-1)",
+        default=float(os.environ.get("SERVICENOW_PROFILE_RATE", "0")),
+    )
+    profile_group.add_argument(
+        "--profile-mode",
+        choices=list(PROFILE_MODES),
+        help="'sample': wall-clock stack samples (.collapsed); 'cprofile': cProfile stats (.pstats)",
+        default=os.environ.get("SERVICENOW_PROFILE_MODE", "sample"),
+    )
+    profile_group.add_argument(
+        "--profile-keep",
+        type=int,
+        help="Profile files kept per tool; older ones are deleted",
+        default=int(os.environ.get("SERVICENOW_PROFILE_KEEP", "20")),
+    )
+    profile_group.add_argument(
+        "--profile-min-ms",
+        type=float,
+        help="Only keep profiles of calls that took at least this long",
+        default=float(os.environ.get("SERVICENOW_PROFILE_MIN_MS", "0")),
+    )
 
     auth_group = parser.add_argument_group("Authentication")
     auth_group.add_argument(
@@ -184,6 +279,20 @@ def create_config(args) -> ServerConfig:
         auth=final_auth_config,
         debug=args.debug,
         timeout=args.timeout,
+        output_format=args.output_format,
+        max_response_bytes=args.max_response_bytes,
+        response_budgets=args.response_budgets,
+        continuation_ttl_seconds=args.continuation_ttl,
+        continuation_max_bytes=args.continuation_max_bytes,
+        validate_tools=args.validate_tools,
+        http_retries=args.http_retries,
+        http_retry_backoff=args.http_retry_backoff,
+        http_pool_size=args.http_pool_size,
+        profile_dir=args.profile_dir,
+        profile_rate=args.profile_rate,
+        profile_mode=args.profile_mode,
+        profile_keep=args.profile_keep,
+        profile_min_ms=args.profile_min_ms,
         script_execution_api_resource_path=script_execution_api_resource_path,
     )
 
@@ -4,16 +4,34 @@ ServiceNow MCP Server
 This module provides the main implementation of the ServiceNow MCP server.
 """
 
-import json
+import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 import mcp.types as types
 import yaml
 from mcp.server.lowlevel import Server
 from pydantic import ValidationError
 
+from mcp_common.metrics import METRICS_TOOL, METRICS_TOOL_DESCRIPTION, METRICS_TOOL_SCHEMA
+from mcp_common.profiling import (
+    PROFILER_TOOL,
+    PROFILER_TOOL_DESCRIPTION,
+    PROFILER_TOOL_SCHEMA,
+    ToolProfiler,
+)
+from mcp_common.response_budget import (
+    BUDGET_ARGUMENT,
+    CONTINUATION_TOOL,
+    FETCH_CONTINUATION_DESCRIPTION,
+    FETCH_CONTINUATION_SCHEMA,
+    ContinuationCache,
+    ResponseBudget,
+    with_budget_argument,
+)
+from mcp_common.serialization import serialize_tool_output
+from mcp_common.streaming import ProgressSink, progress_sink
 from servicenow_mcp.auth.auth_manager import AuthManager
 from servicenow_mcp.tools.knowledge_base import (
     create_category as create_kb_category_tool,
@@ -22,6 +40,8 @@ from servicenow_mcp.tools.knowledge_base import (
     list_categories as list_kb_categories_tool,
 )
 from servicenow_mcp.utils.config import ServerConfig
+from servicenow_mcp.utils.http_client import configure_http
+from servicenow_mcp.utils.metrics import METRICS
 from servicenow_mcp.utils.tool_utils import get_tool_definitions
 
 logging.basicConfig(level=logging.INFO)
@@ -29,36 +49,8 @@ logger = logging.getLogger(__name__)
 
 TOOL_PACKAGE_CONFIG_PATH = os.getenv("TOOL_PACKAGE_CONFIG_PATH", "config/tool_packages.yaml")
 
-
-def serialize_tool_output(result: Any, tool_name: str) -> str:
-    try:
-        if isinstance(result, str):
-            try:
-                parsed = json.loads(result)
-                return json.dumps(parsed, indent=2)
-            except json.JSONDecodeError:
-                return result
-        elif isinstance(result, dict):
-            return json.dumps(result, indent=2)
-        elif hasattr(result, "model_dump_json"):
-            try:
-                return result.model_dump_json(indent=2)
-            except TypeError:
-                return json.dumps(result.model_dump(), indent=2)
-        elif hasattr(result, "model_dump"):
-            return json.dumps(result.model_dump(), indent=2)
-        elif hasattr(result, "dict"):
-            return json.dumps(result.dict(), indent=2)
-        else:
-            logger.warning(
-                f"Could not serialize result for tool '{tool_name}' to JSON, falling back to str(). Type: {type(result)}"
-            )
-            return str(result)
-    except Exception as e:
-        logger.error(f"Error during serialization for tool '{tool_name}': {e}", exc_info=True)
-        return json.dumps(
-            {"error": f"Serialization failed for tool {tool_name}", "details": str(e)}, indent=2
-        )
+# Served by the server itself in every package except "none"
+BUILTIN_TOOLS = ("list_tool_packages", CONTINUATION_TOOL, METRICS_TOOL, PROFILER_TOOL)
 
 
 class ServiceNowMCP:
@@ -69,7 +61,16 @@ class ServiceNowMCP:
         else:
             self.config = config
 
+        configure_http(self.config.http_retries, self.config.http_retry_backoff, self.config.http_pool_size)
         self.auth_manager = AuthManager(self.config.auth, self.config.instance_url)
+        self.profiler = ToolProfiler(
+            "servicenow_mcp",
+            directory=self.config.profile_dir,
+            rate=self.config.profile_rate,
+            mode=self.config.profile_mode,
+            keep=self.config.profile_keep,
+            min_ms=self.config.profile_min_ms,
+        )
         self.mcp_server = Server("ServiceNow")
         self.name = "ServiceNow"
 
@@ -82,6 +83,19 @@ class ServiceNowMCP:
         self.tool_definitions = get_tool_definitions(
             create_kb_category_tool, list_kb_categories_tool
         )
+        self.response_budget = ResponseBudget(
+            max_response_bytes=self.config.max_response_bytes,
+            budgets=self.config.response_budgets,
+            output_format=self.config.output_format,
+            cache=ContinuationCache(
+                ttl_seconds=self.config.continuation_ttl_seconds,
+                max_bytes=self.config.continuation_max_bytes,
+            ),
+        )
+        self._tool_list: Optional[List[types.Tool]] = None
+        if self.config.validate_tools:
+            self._tool_list = self._build_tool_list(strict=True)
+            logger.info(f"Validated {len(self._tool_list)} tool schemas.")
 
         self._register_handlers()
 
@@ -146,7 +160,14 @@ class ServiceNowMCP:
             f"Loading package '{self.current_package_name}' with {len(self.enabled_tool_names)} tools."
         )
 
-    async def _list_tools_impl(self) -> List[types.Tool]:
+    def _build_tool_list(self, strict: bool = False) -> List[types.Tool]:
+        """Build the tools of the loaded package and their input schemas; strict raises on a broken schema."""
+        if strict:
+            unknown = [n for n in self.enabled_tool_names if n not in self.tool_definitions]
+            if unknown:
+                raise ValueError(
+                    f"Package '{self.current_package_name}' lists unknown tools: {', '.join(unknown)}"
+                )
         tool_list: List[types.Tool] = []
 
         if self.current_package_name != "none":
@@ -166,6 +187,28 @@ class ServiceNowMCP:
                     },
                 )
             )
+            tool_list.append(
+                types.Tool(
+                    name=CONTINUATION_TOOL,
+                    description=FETCH_CONTINUATION_DESCRIPTION,
+                    inputSchema=FETCH_CONTINUATION_SCHEMA,
+                )
+            )
+            tool_list.append(
+                types.Tool(
+                    name=METRICS_TOOL,
+                    description=METRICS_TOOL_DESCRIPTION,
+                    inputSchema=METRICS_TOOL_SCHEMA,
+                )
+            )
+            if self.profiler.available:
+                tool_list.append(
+                    types.Tool(
+                        name=PROFILER_TOOL,
+                        description=PROFILER_TOOL_DESCRIPTION,
+                        inputSchema=PROFILER_TOOL_SCHEMA,
+                    )
+                )
 
         for tool_name, definition in self.tool_definitions.items():
             if tool_name in self.enabled_tool_names:
@@ -173,29 +216,71 @@ class ServiceNowMCP:
                     definition
                 )
                 try:
-                    schema = params_model.model_json_schema()
+                    schema = with_budget_argument(params_model.model_json_schema())
                     tool_list.append(
                         types.Tool(name=tool_name, description=description, inputSchema=schema)
                     )
                 except Exception as e:
+                    if strict:
+                        raise ValueError(f"Invalid schema for tool '{tool_name}': {e}") from e
                     logger.error(
                         f"Failed to generate schema for tool '{tool_name}': {e}", exc_info=True
                     )
 
-        logger.debug(f"Listing {len(tool_list)} tools for package '{self.current_package_name}'.")
         return tool_list
 
+    async def _list_tools_impl(self) -> List[types.Tool]:
+        # The package is chosen at startup, so its tool list is built once
+        if self._tool_list is None:
+            self._tool_list = self._build_tool_list()
+        logger.debug(
+            f"Listing {len(self._tool_list)} tools for package '{self.current_package_name}'."
+        )
+        return self._tool_list
+
+    def track_call(self, name: str):
+        """Record a tool call in the server metrics, however it arrived (MCP or /stream)."""
+        # Unknown names share one label so callers cannot grow the metric series
+        known = name in self.tool_definitions or name in BUILTIN_TOOLS
+        return METRICS.track(name if known else "unknown")
+
     async def _call_tool_impl(self, name: str, arguments: dict) -> list[types.TextContent]:
         logger.info(f"Received call_tool request for tool '{name}'")
+        with self.track_call(name) as call:
+            serialized_string = await self._serialized_tool_call(name, dict(arguments or {}))
+            call.response_bytes = len(serialized_string.encode("utf-8"))
+        return [types.TextContent(type="text", text=serialized_string)]
+
+    async def _serialized_tool_call(self, name: str, arguments: dict) -> str:
+        budget_override = arguments.pop(BUDGET_ARGUMENT, None)
+
+        if name in BUILTIN_TOOLS and self.current_package_name == "none":
+            raise ValueError(f"Tool '{name}' is not available in the 'none' package.")
+
+        if name == CONTINUATION_TOOL:
+            return self.response_budget.fetch(
+                str(arguments.get("continuation", "")), budget_override
+            )
+
         if name == "list_tool_packages":
-            if self.current_package_name == "none":
-                raise ValueError(
-                    "Tool 'list_tool_packages' is not available in the 'none' package."
-                )
             result_dict = self._list_tool_packages_impl()
-            serialized_string = json.dumps(result_dict, indent=2)
-            return [types.TextContent(type="text", text=serialized_string)]
+            return serialize_tool_output(result_dict, name, self.config.output_format)
+
+        if name == METRICS_TOOL:
+            result = METRICS.tool_output(arguments.get("format", "summary"))
+        elif name == PROFILER_TOOL:
+            result = self.profiler.tool_output(arguments)
+        else:
+            result = await self.run_tool(name, arguments, self._mcp_progress_sink())
 
+        serialized_string = self.response_budget.render(name, result, budget_override)
+        logger.debug(f"Serialized value for tool '{name}': {serialized_string[:500]}...")
+        return serialized_string
+
+    async def run_tool(
+        self, name: str, arguments: dict, progress: Optional[ProgressSink] = None
+    ) -> Any:
+        """Validate arguments and run an enabled tool, returning its raw result; progress receives its updates."""
         if name not in self.tool_definitions:
             raise ValueError(f"Unknown tool: {name}")
         if name not in self.enabled_tool_names:
@@ -219,16 +304,33 @@ class ServiceNowMCP:
             raise ValueError(f"Failed to parse arguments for tool '{name}': {e}")
 
         try:
-            result = impl_func(self.config, self.auth_manager, params)
+            with progress_sink(progress):
+                # Tools make blocking REST calls; keep them off the event loop other sessions share,
+                # and profile them in their own thread
+                result = await asyncio.to_thread(
+                    self.profiler.wrap(name, impl_func), self.config, self.auth_manager, params
+                )
             logger.debug(f"Raw result type from tool '{name}': {type(result)}")
         except Exception as e:
             logger.error(f"Error executing tool '{name}': {e}", exc_info=True)
             raise RuntimeError(f"Error during execution of tool '{name}': {e}") from e
 
-        serialized_string = serialize_tool_output(result, name)
-        logger.debug(f"Serialized value for tool '{name}': {serialized_string[:500]}...")
+        return result
 
-        return [types.TextContent(type="text", text=serialized_string)]
+    def _mcp_progress_sink(self) -> Optional[ProgressSink]:
+        """Forward tool progress as MCP progress notifications when the request asked for them."""
+        try:
+            context = self.mcp_server.request_context
+        except LookupError:
+            return None
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None
+
+        async def send(progress: float, total: Optional[float], message: Optional[str]):
+            await context.session.send_progress_notification(token, progress, total)
+
+        return send
 
     def _list_tool_packages_impl(self) -> Dict[str, Any]:
         available_packages = list(self.package_definitions.keys())
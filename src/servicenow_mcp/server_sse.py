@@ -11,8 +11,10 @@ from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.routing import Mount, Route
 
+from mcp_common.response_budget import parse_budgets
 from servicenow_mcp.server import ServiceNowMCP
 from servicenow_mcp.utils.config import AuthConfig, AuthType, BasicAuthConfig, ServerConfig
+from servicenow_mcp.utils.metrics import METRICS
 
 
 def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlette:
@@ -30,13 +32,14 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
                 mcp_server.create_initialization_options(),
             )
 
-    return Starlette(
-        debug=debug,
-        routes=[
-            Route("/sse", endpoint=handle_sse),
-            Mount("/messages/", app=sse.handle_post_message),
-        ],
-    )
+    # No /stream/tools route: ServiceNow tools make one buffered REST call and
+    # report no progress, so streaming their result would not start any sooner
+    routes = [
+        Route("/sse", endpoint=handle_sse),
+        Mount("/messages/", app=sse.handle_post_message),
+        Route("/metrics", endpoint=METRICS.endpoint),
+    ]
+    return Starlette(debug=debug, routes=routes)
 
 
 class ServiceNowSSEMCP(ServiceNowMCP):
@@ -56,7 +59,24 @@ def create_servicenow_mcp(instance_url: str, username: str, password: str):
         type=AuthType.BASIC, basic=BasicAuthConfig(username=username, password=password)
     )
 
-    config = ServerConfig(instance_url=instance_url, auth=auth_config)
+    config = ServerConfig(
+        instance_url=instance_url,
+        auth=auth_config,
+        output_format=os.getenv("SERVICENOW_OUTPUT_FORMAT", "compact"),
+        max_response_bytes=int(os.getenv("SERVICENOW_MAX_RESPONSE_BYTES", "0")),
+        response_budgets=parse_budgets(os.getenv("SERVICENOW_RESPONSE_BUDGETS", "")),
+        continuation_ttl_seconds=int(os.getenv("SERVICENOW_CONTINUATION_TTL", "300")),
+        continuation_max_bytes=int(os.getenv("SERVICENOW_CONTINUATION_MAX_BYTES", "64000000")),
+        validate_tools=os.getenv("SERVICENOW_VALIDATE_TOOLS", "false").lower() == "true",
+        http_retries=int(os.getenv("SERVICENOW_HTTP_RETRIES", "0")),
+        http_retry_backoff=float(os.getenv("SERVICENOW_HTTP_RETRY_BACKOFF", "0.5")),
+        http_pool_size=int(os.getenv("SERVICENOW_HTTP_POOL_SIZE", "10")),
+        profile_dir=os.getenv("SERVICENOW_PROFILE_DIR"),
+        profile_rate=float(os.getenv("SERVICENOW_PROFILE_RATE", "0")),
+        profile_mode=os.getenv("SERVICENOW_PROFILE_MODE", "sample"),
+        profile_keep=int(os.getenv("SERVICENOW_PROFILE_KEEP", "20")),
+        profile_min_ms=float(os.getenv("SERVICENOW_PROFILE_MIN_MS", "0")),
+    )
 
     return ServiceNowSSEMCP(config)
 
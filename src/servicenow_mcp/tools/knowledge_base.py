@@ -5,6 +5,7 @@ import requests
 from pydantic import BaseModel, Field
 
 from servicenow_mcp.auth.auth_manager import AuthManager
+from servicenow_mcp.utils import http_client
 from servicenow_mcp.utils.config import ServerConfig
 
 logger = logging.getLogger(__name__)
@@ -128,7 +129,7 @@ def create_knowledge_base(
         data["workflow_retire"] = params.retire_workflow
 
     try:
-        response = requests.post(
+        response = http_client.post(
             api_url,
             json=data,
             headers=auth_manager.get_headers(),
@@ -176,7 +177,7 @@ def list_knowledge_bases(
         query_params["sysparm_query"] = "^".join(query_parts)
 
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
@@ -284,7 +285,7 @@ def create_category(
     logger.debug(f"Creating category with data: {data}")
 
     try:
-        response = requests.post(
+        response = http_client.post(
             api_url,
             json=data,
             headers=auth_manager.get_headers(),
@@ -338,7 +339,7 @@ def create_article(
         data["keywords"] = params.keywords
 
     try:
-        response = requests.post(
+        response = http_client.post(
             api_url,
             json=data,
             headers=auth_manager.get_headers(),
@@ -386,7 +387,7 @@ def update_article(
         data["keywords"] = params.keywords
 
     try:
-        response = requests.patch(
+        response = http_client.patch(
             api_url,
             json=data,
             headers=auth_manager.get_headers(),
@@ -428,7 +429,7 @@ def publish_article(
         data["workflow_version"] = params.workflow_version
 
     try:
-        response = requests.patch(
+        response = http_client.patch(
             api_url,
             json=data,
             headers=auth_manager.get_headers(),
@@ -486,7 +487,7 @@ def list_articles(
     logger.debug(f"Listing articles with query params: {query_params}")
 
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
@@ -582,7 +583,7 @@ def get_article(
     }
 
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
@@ -694,7 +695,7 @@ def list_categories(
     logger.debug(f"Listing categories with query params: {query_params}")
 
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
@@ -5,6 +5,7 @@ import requests
 from pydantic import BaseModel, Field
 
 from servicenow_mcp.auth.auth_manager import AuthManager
+from servicenow_mcp.utils import http_client
 from servicenow_mcp.utils.config import ServerConfig
 
 logger = logging.getLogger(__name__)
@@ -61,7 +62,7 @@ def list_tables(
         query_params["sysparm_query"] = "^".join(query_parts)
     
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
@@ -113,7 +114,7 @@ def get_table(
     }
     
     try:
-        response = requests.get(
+        response = http_client.get(
             table_api_url,
             params=table_query_params,
             headers=auth_manager.get_headers(),
@@ -138,7 +139,7 @@ def get_table(
             "sysparm_fields": "element,column_label,internal_type,max_length,mandatory,reference,default_value",
         }
         
-        columns_response = requests.get(
+        columns_response = http_client.get(
             columns_api_url,
             params=columns_query_params,
             headers=auth_manager.get_headers(),
@@ -203,7 +204,7 @@ def list_records(
         query_params["sysparm_fields"] = ",".join(params.fields)
     
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
@@ -243,7 +244,7 @@ def get_record(
     }
     
     try:
-        response = requests.get(
+        response = http_client.get(
             api_url,
             params=query_params,
             headers=auth_manager.get_headers(),
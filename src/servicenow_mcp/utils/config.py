@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import BaseModel, Field
 
@@ -46,6 +46,31 @@ class ServerConfig(BaseModel):
     auth: AuthConfig
     debug: bool = False
     timeout: int = 30
+    # Tool result encoding: "compact" (minimal JSON) or "pretty" (indented)
+    output_format: str = "compact"
+    # Response budget in bytes (0 = unlimited), per-tool overrides, how long
+    # the remainder of a truncated response stays available to fetch_continuation
+    # and the total size of the remainders kept
+    max_response_bytes: int = 0
+    response_budgets: Dict[str, int] = {}
+    continuation_ttl_seconds: int = 300
+    continuation_max_bytes: int = 64_000_000
+    # Build and check every tool schema at startup instead of on the first list_tools
+    validate_tools: bool = False
+    # Retries of REST reads on 429/502/503/504 and connection errors (off by
+    # default), their base backoff in seconds, and the size of the shared pool
+    http_retries: int = 0
+    http_retry_backoff: float = 0.5
+    http_pool_size: int = 10
+
+    # Opt-in profiling of tool calls (mcp_common/profiling.py): the fraction of
+    # calls profiled, how, where the files go and how many are kept per tool.
+    # Setting a directory or a rate also offers the server_profiler tool.
+    profile_dir: Optional[str] = None
+    profile_rate: float = 0.0
+    profile_mode: str = "sample"
+    profile_keep: int = 20
+    profile_min_ms: float = 0.0
 
     @property
     def api_url(self) -> str:
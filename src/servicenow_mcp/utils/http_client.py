@@ -0,0 +1,160 @@
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from servicenow_mcp.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Only reads are retried: a repeated write may have been applied already
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+HTTP_REQUESTS = METRICS.registry.counter(
+    f"{METRICS.prefix}_http_requests_total",
+    "ServiceNow REST attempts by status code, or exception type when no response arrived",
+    ("method", "endpoint", "status"),
+)
+HTTP_DURATION = METRICS.registry.histogram(
+    f"{METRICS.prefix}_http_request_duration_seconds",
+    "ServiceNow REST latency per attempt",
+    ("method", "endpoint"),
+)
+HTTP_RETRIES = METRICS.registry.counter(
+    f"{METRICS.prefix}_http_retries_total", "Retried ServiceNow REST attempts", ("method", "endpoint")
+)
+
+
+class _Settings:
+    retries = 0
+    backoff = 0.5
+    pool_size = 10
+
+
+_settings = _Settings()
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def configure_http(retries: int = 0, backoff: float = 0.5, pool_size: int = 10):
+    """Set the retry policy and connection pool size; the shared session is rebuilt on next use."""
+    global _session
+    _settings.retries = max(0, retries)
+    _settings.backoff = max(0.0, backoff)
+    _settings.pool_size = max(1, pool_size)
+    with _session_lock:
+        old, _session = _session, None
+    if old is not None:
+        old.close()
+
+
+def get_session() -> requests.Session:
+    """
+    The process-wide session, so calls to the instance reuse pooled keep-alive connections.
+
+    Cookies are neither stored nor sent: every call carries its own
+    credentials, and an instance session cookie picked up by one call must
+    not authenticate the next one, which may be made on behalf of another
+    user.
+    """
+    global _session
+    session = _session
+    if session is None:
+        with _session_lock:
+            if _session is None:
+                _session = requests.Session()
+                _session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_settings.pool_size)
+                _session.mount("https://", adapter)
+                _session.mount("http://", adapter)
+            session = _session
+    return session
+
+
+def endpoint_label(url: str) -> str:
+    """
+    A low-cardinality name for the called endpoint: record ids are dropped, so
+    .../api/now/table/kb_knowledge/<sys_id> becomes table/kb_knowledge/{id}.
+    """
+    parts = [p for p in urlsplit(url).path.split("/") if p]
+    if parts[:2] == ["api", "now"]:
+        parts = parts[2:]
+    if len(parts) > 2:
+        parts = parts[:2] + ["{id}"]
+    return "/".join(parts) or "/"
+
+
+def _retry_delay(attempt: int, response: Optional[requests.Response]) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            pass  # An HTTP date; fall back to exponential backoff
+    return _settings.backoff * (2 ** (attempt - 1))
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request on the shared session, recording status, latency and retries.
+
+    With retries configured (off by default), reads are retried on
+    429/502/503/504 and connection errors, honouring Retry-After. The wait
+    blocks the calling thread; the server runs tools in worker threads, so
+    it does not block other sessions. Once retries run out the last
+    response is returned (or the error raised) as requests would, so
+    callers keep using raise_for_status() and requests.RequestException.
+    """
+    method = method.upper()
+    endpoint = endpoint_label(url)
+    retries = _settings.retries if method in IDEMPOTENT_METHODS else 0
+    session = get_session()
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        response: Optional[requests.Response] = None
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.ConnectionError as e:
+            HTTP_REQUESTS.inc(method=method, endpoint=endpoint, status=type(e).__name__)
+            if attempt >= retries:
+                raise
+        except requests.RequestException as e:
+            HTTP_REQUESTS.inc(method=method, endpoint=endpoint, status=type(e).__name__)
+            raise
+        finally:
+            HTTP_DURATION.observe(time.perf_counter() - start, method=method, endpoint=endpoint)
+
+        if response is not None:
+            HTTP_REQUESTS.inc(method=method, endpoint=endpoint, status=str(response.status_code))
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            response.close()
+
+        attempt += 1
+        delay = _retry_delay(attempt, response)
+        HTTP_RETRIES.inc(method=method, endpoint=endpoint)
+        logger.warning(
+            f"{method} {endpoint} failed ({response.status_code if response is not None else 'connection error'}); "
+            f"retry {attempt}/{retries} in {delay:.2f}s"
+        )
+        time.sleep(delay)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def patch(url: str, **kwargs) -> requests.Response:
+    return request("PATCH", url, **kwargs)
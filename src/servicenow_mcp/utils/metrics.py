@@ -0,0 +1,4 @@
+from mcp_common.metrics import ToolMetrics
+
+# Tool-call metrics; utils/http_client.py registers its REST metrics in METRICS.registry
+METRICS = ToolMetrics("servicenow_mcp")
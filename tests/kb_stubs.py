@@ -0,0 +1,43 @@
+"""
+Shared fixtures for the KB behaviour tests: a small deterministic embedder
+and synthetic documentation pages.
+"""
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.embeddings import EmbeddingBackend
+
+DIM = 128
+
+
+class HashEmbedder(EmbeddingBackend):
+    """Bag of hashed words: texts sharing words get close vectors, the same text the same vector."""
+
+    name = "hash"
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+TOPICS = ["vpn", "password", "laptop", "wifi", "printer", "badge", "email", "payroll"]
+
+
+def make_page(i: int, domain: str = "docs.example.com") -> dict:
+    topic = TOPICS[i % len(TOPICS)]
+    return {
+        "url": f"https://{domain}/{topic}/{i}",
+        "title": f"{topic.title()} guide {i}",
+        "breadcrumb": f"Help > {topic.title()} > Guide {i}",
+        # Distinct wording per page so near-duplicate detection keeps them all
+        "content": f"How to fix {topic} issues, case {i}. " + " ".join(f"step{i}x{j}" for j in range(40)),
+    }
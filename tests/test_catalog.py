@@ -0,0 +1,110 @@
+"""
+Unit tests for the SQLite page catalog: keyset pagination, filters and
+lexical search.
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.catalog import CATALOG_FILE, PageCatalog
+
+ROWS = [
+    {"url": f"https://{domain}/{section}/{i:02d}", "domain": domain, "title": f"{section} {i}",
+     "breadcrumb": f"{crumb} > Page {i}", "simhash": f"{i:016x}", "text": f"{section} page {i} text"}
+    for domain, section, crumb in [
+        ("docs.example.com", "admin", "Admin > Users"),
+        ("docs.example.com", "guides", "Guides > 100% Coverage"),
+        ("help.other.com", "guides", "Guides > Start_Here"),
+    ]
+    for i in range(5)
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = PageCatalog(str(tmp_path))
+    catalog.upsert(ROWS)
+    yield catalog
+    catalog.close()
+
+
+def list_all(catalog: PageCatalog, limit: int, **filters) -> list[str]:
+    """Follow the keyset cursor to the end, checking every page is at most limit rows."""
+    urls, cursor = [], None
+    while True:
+        rows = catalog.list_pages(**filters, after=cursor, limit=limit)
+        assert len(rows) <= limit
+        if not rows:
+            return urls
+        urls += [row["url"] for row in rows]
+        cursor = rows[-1]["url"]
+
+
+class TestListing:
+    def test_keyset_pages_cover_every_row_once_in_url_order(self, catalog):
+        urls = list_all(catalog, limit=4)
+        assert urls == sorted(row["url"] for row in ROWS)
+        assert list_all(catalog, limit=3, domain="help.other.com") == [
+            row["url"] for row in ROWS if row["domain"] == "help.other.com"
+        ]
+        # Rows added behind the cursor do not shift the pages after it
+        first = catalog.list_pages(limit=5)
+        catalog.upsert([{**ROWS[0], "url": "https://docs.example.com/aaa"}])
+        after = catalog.list_pages(after=first[-1]["url"], limit=5)
+        assert after[0]["url"] == sorted(row["url"] for row in ROWS)[5]
+
+    def test_filters(self, catalog):
+        assert len(catalog.urls(breadcrumb_prefix="admin > users")) == 5  # case-insensitive
+        # LIKE wildcards in a prefix are matched literally
+        assert len(catalog.urls(breadcrumb_prefix="Guides > 100%")) == 5
+        assert catalog.urls(breadcrumb_prefix="Guides > 100_") == []
+        assert len(catalog.urls(breadcrumb_prefix="Guides > Start_")) == 5
+        assert catalog.counts(breadcrumb_prefix="Guides") == {"docs.example.com": 5, "help.other.com": 5}
+        assert catalog.counts(url_prefix="https://docs.example.com/admin/") == {"docs.example.com": 5}
+        assert catalog.urls(domain="help.other.com", breadcrumb_prefix="Admin") == []
+
+    def test_search_text_applies_filters(self, catalog):
+        hits = catalog.search_text("guides page", limit=20, domain="help.other.com")
+        assert hits and all(url.startswith("https://help.other.com/") for url, _ in hits)
+        hits = catalog.search_text("page", limit=20, breadcrumb_prefix="Admin")
+        assert {url.split("/")[3] for url, _ in hits} == {"admin"}
+        assert catalog.search_text("   ", limit=5) == []
+
+
+class TestTextIndex:
+    def test_text_is_indexed_but_not_stored(self, catalog, tmp_path):
+        with sqlite3.connect(str(tmp_path / CATALOG_FILE)) as conn:
+            bodies = {row[0] for row in conn.execute("SELECT body FROM page_text")}
+        assert bodies == {None}
+        assert catalog.search_text("admin", limit=20)
+
+    def test_replaced_and_deleted_text_leaves_the_index(self, catalog):
+        first, second = ROWS[0], ROWS[1]
+        catalog.upsert([{**first, "text": "rotate certificates"}], previous={first["url"]: first["text"]})
+        assert [url for url, _ in catalog.search_text("certificates", limit=5)] == [first["url"]]
+        assert first["url"] not in {url for url, _ in catalog.search_text("admin", limit=20)}
+
+        catalog.delete([first["url"], second["url"]], previous={first["url"]: "rotate certificates"})
+        assert catalog.search_text("certificates", limit=5) == []
+        # Without its previous text a page's entry is orphaned, never matched again
+        catalog.upsert([{**second, "text": "rotate certificates"}])
+        assert [url for url, _ in catalog.search_text("certificates", limit=5)] == [second["url"]]
+        assert second["url"] not in {url for url, _ in catalog.search_text("admin", limit=20)}
+
+
+class TestMaintenance:
+    def test_delete_and_schema_change(self, catalog, tmp_path):
+        catalog.delete([ROWS[0]["url"], "https://docs.example.com/missing"])
+        assert len(catalog) == len(ROWS) - 1
+        assert ROWS[0]["url"] not in catalog.pages([row["url"] for row in ROWS])
+        catalog.close()
+
+        with sqlite3.connect(str(tmp_path / CATALOG_FILE)) as conn:
+            conn.execute("PRAGMA user_version = 0")
+        reopened = PageCatalog(str(tmp_path))
+        assert len(reopened) == 0  # an older schema is dropped, for KBIndexer to rebuild
+        reopened.close()
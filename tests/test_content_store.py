@@ -0,0 +1,80 @@
+"""
+Unit tests for the compressed page text store.
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb import content_store
+from moveworks_mcp.kb.content_store import CONTENT_FILE, ContentStore
+
+TEXT = "Navigation: Docs > Agent Studio\nTitle: Compound actions\n\n" + "Compound actions chain steps. " * 200
+
+
+class TestContentStore:
+    def test_round_trip_and_compression(self, tmp_path):
+        store = ContentStore(str(tmp_path))
+        store.put({"https://example.com/a": TEXT})
+        assert store.get(["https://example.com/a", "https://example.com/missing"]) == {
+            "https://example.com/a": TEXT
+        }
+        stats = store.stats()
+        assert stats["raw_bytes"] == len(TEXT.encode())
+        assert stats["stored_bytes"] < stats["raw_bytes"] / 4
+
+    def test_identical_text_is_stored_once(self, tmp_path):
+        store = ContentStore(str(tmp_path))
+        store.put({"https://example.com/a": TEXT, "https://example.com/a?print=1": TEXT})
+        assert store.stats()["blobs"] == 1
+
+        store.delete(["https://example.com/a"])
+        assert store.get(["https://example.com/a?print=1"]) == {"https://example.com/a?print=1": TEXT}
+        store.delete(["https://example.com/a?print=1"])
+        assert store.stats()["blobs"] == 0
+
+    def test_replacing_text_drops_the_old_blob(self, tmp_path):
+        store = ContentStore(str(tmp_path))
+        store.put({"https://example.com/a": TEXT})
+        store.put({"https://example.com/a": TEXT + " Updated."})
+        assert store.stats()["blobs"] == 1
+        assert store.get(["https://example.com/a"])["https://example.com/a"].endswith("Updated.")
+
+    def test_zlib_fallback_without_zstandard(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+        store = ContentStore(str(tmp_path))
+        assert store.codec == "zlib"
+        store.put({"https://example.com/a": TEXT})
+        assert store.get(["https://example.com/a"]) == {"https://example.com/a": TEXT}
+
+
+class TestSchemaVersions:
+    def test_older_stores_are_migrated_in_place(self, tmp_path, monkeypatch):
+        store = ContentStore(str(tmp_path))
+        store.put({"https://example.com/a": TEXT})
+        store.close()
+
+        monkeypatch.setattr(content_store, "SCHEMA_VERSION", 2)
+        monkeypatch.setitem(content_store._MIGRATIONS, 1, "ALTER TABLE blobs ADD COLUMN note TEXT")
+        migrated = ContentStore(str(tmp_path))
+        assert migrated.get(["https://example.com/a"]) == {"https://example.com/a": TEXT}
+        migrated.close()
+        with sqlite3.connect(str(tmp_path / CONTENT_FILE)) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+            assert "note" in {row[1] for row in conn.execute("PRAGMA table_info(blobs)")}
+
+    def test_unknown_versions_are_refused_and_left_alone(self, tmp_path, monkeypatch):
+        ContentStore(str(tmp_path)).put({"https://example.com/a": TEXT})
+        with sqlite3.connect(str(tmp_path / CONTENT_FILE)) as conn:
+            conn.execute("PRAGMA user_version = 7")
+        with pytest.raises(RuntimeError, match="newer"):
+            ContentStore(str(tmp_path))
+
+        monkeypatch.setattr(content_store, "SCHEMA_VERSION", 9)
+        with pytest.raises(RuntimeError, match="cannot be migrated"):
+            ContentStore(str(tmp_path))
+        with sqlite3.connect(str(tmp_path / CONTENT_FILE)) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM page_content").fetchone()[0] == 1
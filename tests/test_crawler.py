@@ -0,0 +1,69 @@
+"""
+Tests of the shared crawler HTTP client against a local aiohttp site.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.crawler import CrawlerClient, DocCrawler
+
+PAGE = (
+    "<html><head><title>{name}</title></head><body>"
+    '<nav aria-label="breadcrumb"><a href="/">Docs</a><a href="/guides">Guides</a></nav>'
+    "<main><p>How to use {name}.</p></main></body></html>"
+)
+
+
+async def serve_site():
+    """Start a small site that records the client port of every request; returns (runner, base url, ports)."""
+    ports = []
+
+    async def page(request):
+        ports.append(request.transport.get_extra_info("peername")[1])
+        return web.Response(text=PAGE.format(name=request.match_info["name"]), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/guides/{name}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}", ports
+
+
+class TestCrawlerClient:
+    def test_crawlers_share_one_session_and_its_connections(self):
+        async def run():
+            runner, base, ports = await serve_site()
+            client = CrawlerClient()
+            try:
+                first = await DocCrawler(base, client=client).crawl_url(f"{base}/guides/vpn")
+                session = client.get_session()
+                second = await DocCrawler(base, client=client).crawl_url(f"{base}/guides/wifi")
+                assert client.get_session() is session
+                shared_ports = list(ports)
+
+                await client.close()
+                assert client.closed
+                await DocCrawler(base, client=client).crawl_url(f"{base}/guides/email")
+                assert client.get_session() is not session
+
+                # Without a client every crawl opens and closes its own session
+                ports.clear()
+                for name in ("vpn", "wifi"):
+                    await DocCrawler(base).crawl_url(f"{base}/guides/{name}")
+                return first, second, shared_ports, list(ports)
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        first, second, shared_ports, throwaway_ports = asyncio.run(run())
+        assert first["title"] == "vpn" and first["breadcrumb"] == "Docs > Guides"
+        assert second["url"].endswith("/guides/wifi")
+        assert len(shared_ports) == 2 and len(set(shared_ports)) == 1
+        assert len(set(throwaway_ports)) == 2
@@ -0,0 +1,83 @@
+"""
+Unit tests for URL canonicalization and SimHash near-duplicate detection.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.dedup import (
+    FingerprintIndex,
+    canonicalize_url,
+    hamming_distance,
+    simhash,
+)
+
+PAGE_TEXT = (
+    "Compound actions let you chain multiple actions together. Each step can read "
+    "the output of previous steps, branch with switch statements, loop over lists "
+    "and return a final result to the plugin that invoked the compound action. "
+    "Use compound actions when a single HTTP or script action is not enough."
+)
+
+
+class TestCanonicalizeUrl:
+    def test_strips_fragment_trailing_slash_and_case(self):
+        assert (
+            canonicalize_url("HTTPS://Help.Moveworks.com/docs/switch/#usage")
+            == "https://help.moveworks.com/docs/switch"
+        )
+
+    def test_drops_default_port_and_keeps_custom_port(self):
+        assert canonicalize_url("https://example.com:443/a") == "https://example.com/a"
+        assert canonicalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+
+    def test_strips_tracking_params_and_sorts_the_rest(self):
+        url = "https://example.com/docs?utm_source=x&v=2&print=true&lang=en"
+        assert canonicalize_url(url) == "https://example.com/docs?lang=en&v=2"
+
+    def test_wildcard_strips_whole_query(self):
+        assert canonicalize_url("https://example.com/docs?v=2", ["*"]) == "https://example.com/docs"
+
+
+class TestSimhash:
+    def test_identical_text_has_identical_fingerprint(self):
+        assert simhash(PAGE_TEXT) == simhash(PAGE_TEXT)
+
+    def test_small_edit_stays_close(self):
+        edited = PAGE_TEXT.replace("final result", "final value")
+        assert hamming_distance(simhash(PAGE_TEXT), simhash(edited)) <= 10
+
+    def test_unrelated_text_is_far(self):
+        other = (
+            "Configure single sign-on by registering the bot as an enterprise application, "
+            "uploading the signing certificate and mapping user attributes to claims."
+        )
+        assert hamming_distance(simhash(PAGE_TEXT), simhash(other)) > 10
+
+
+class TestFingerprintIndex:
+    def test_finds_near_match_and_excludes_self(self):
+        index = FingerprintIndex(max_distance=3)
+        fp = simhash(PAGE_TEXT)
+        index.add("https://example.com/a", fp)
+
+        assert index.find(fp ^ 0b101) == "https://example.com/a"
+        assert index.find(fp, exclude="https://example.com/a") is None
+
+    def test_exact_mode_requires_identical_fingerprint(self):
+        index = FingerprintIndex(max_distance=3)
+        fp = simhash(PAGE_TEXT)
+        index.add("https://example.com/a", fp)
+
+        assert index.find(fp ^ 1, exact=True) is None
+        assert index.find(fp, exact=True) == "https://example.com/a"
+
+    def test_discard_removes_fingerprint(self):
+        index = FingerprintIndex(max_distance=3)
+        fp = simhash(PAGE_TEXT)
+        index.add("https://example.com/a", fp)
+        index.discard("https://example.com/a")
+
+        assert len(index) == 0
+        assert index.find(fp) is None
@@ -0,0 +1,205 @@
+"""
+Behaviour tests for KBIndexer and the KB tools on a temporary store, with
+the stub embedder from kb_stubs standing in for the sentence-transformers
+model.
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from kb_stubs import HashEmbedder, make_page
+from moveworks_mcp.kb import indexer as indexer_module
+from moveworks_mcp.kb.indexer import KBIndexer, chunk_id
+from moveworks_mcp.kb.search import KBSearch
+from moveworks_mcp.tools import kb_tools
+from moveworks_mcp.utils.config import ServerConfig
+
+
+@pytest.fixture
+def indexer(tmp_path):
+    indexer = KBIndexer(embedder=HashEmbedder(), db_path=str(tmp_path / "db"))
+    yield indexer
+    indexer.close()
+
+
+class TestBulkWrites:
+    def test_index_in_batches_skipping_existing_and_duplicates(self, indexer, monkeypatch):
+        monkeypatch.setattr(indexer_module, "WRITE_BATCH_PAGES", 4)
+        pages = {page["url"]: page for page in map(make_page, range(10))}
+        copy = {**make_page(3), "url": "https://docs.example.com/mirror/3"}
+        progress = []
+
+        result = indexer.index_pages({**pages, copy["url"]: copy}, on_progress=lambda *p: progress.append(p))
+        assert result["indexed"] == list(pages)
+        assert result["duplicates"] == [{"url": copy["url"], "duplicate_of": make_page(3)["url"]}]
+        assert progress == [(4, 10), (8, 10), (10, 10)]
+        stats = indexer.index_stats()
+        assert stats["pages"]["count"] == 10 and stats["chunks"]["count"] == 30
+        assert len(indexer.catalog) == 10 and len(indexer.content) == 10
+
+        again = indexer.index_pages({url: pages[url] for url in list(pages)[:3]})
+        assert again["indexed"] == [] and again["skipped"] == list(pages)[:3]
+        forced = indexer.index_pages({url: pages[url] for url in list(pages)[:3]}, force=True)
+        assert forced["indexed"] == list(pages)[:3]
+
+    def test_remove_pages_and_domain(self, indexer):
+        ours = [make_page(i) for i in range(6)]
+        theirs = [make_page(i, "help.other.com") for i in range(6, 10)]
+        indexer.index_pages({page["url"]: page for page in ours + theirs})
+
+        gone = [ours[0]["url"], ours[1]["url"]]
+        assert indexer.remove_pages(gone + ["https://docs.example.com/missing"]) == gone
+        assert not indexer.existing_urls(gone)
+        assert indexer.get_pages(gone) == {}
+        assert not indexer.chunks.get(ids=[chunk_id(url, view) for url in gone for view in range(3)])["ids"]
+        # A removed page no longer counts as the original of a near-duplicate
+        assert indexer.find_duplicate("https://docs.example.com/again", ours[0]["content"]) is None
+
+        removed = indexer.remove_domain("help.other.com")
+        assert sorted(removed) == sorted(page["url"] for page in theirs)
+        assert indexer.page_counts() == {"docs.example.com": 4}
+        assert indexer.index_stats()["chunks"]["count"] == 12 and len(indexer.content) == 4
+
+
+class TestContentMigration:
+    def test_page_text_stored_in_chroma_moves_to_the_content_store(self, tmp_path):
+        db_path = str(tmp_path / "old-db")
+        pages = [make_page(i) for i in range(5)]
+        old = KBIndexer(embedder=HashEmbedder(), db_path=db_path)
+        old.index_pages({page["url"]: page for page in pages})
+        # Lay the store out as older versions did: text as Chroma documents, none in the content store
+        urls = [page["url"] for page in pages]
+        texts = {url: f"Stored in Chroma: {url}" for url in urls}
+        stored = old.pages.get(ids=urls, include=["embeddings"])
+        old.pages.update(
+            ids=stored["ids"],
+            embeddings=stored["embeddings"],
+            documents=[texts[url] for url in stored["ids"]],
+        )
+        old.content.delete(urls)
+        old.close()
+
+        migrated = KBIndexer(embedder=HashEmbedder(), db_path=db_path)
+        try:
+            assert len(migrated.content) == 5
+            assert {url: page["content"] for url, page in migrated.get_pages(urls).items()} == texts
+            assert migrated.rebuild_collection("pages")["records"] == 5
+            assert not any(migrated.pages.get(ids=urls, include=["documents"])["documents"])
+            assert migrated.get_full_page(urls[0]) == texts[urls[0]]
+        finally:
+            migrated.close()
+
+        # Text already in the content store is not overwritten on later starts
+        reopened = KBIndexer(embedder=HashEmbedder(), db_path=db_path)
+        try:
+            assert reopened.get_full_page(urls[0]) == texts[urls[0]]
+        finally:
+            reopened.close()
+
+
+class TestVectorBackends:
+    def test_switching_backends_resyncs_the_chunk_vectors(self, tmp_path):
+        db_path = str(tmp_path / "db")
+        pages = [make_page(i) for i in range(8)]
+
+        def reopen(backend: str) -> KBIndexer:
+            return KBIndexer(embedder=HashEmbedder(), db_path=db_path, vector_backend=backend)
+
+        def chunk_ids(indexer: KBIndexer) -> set[str]:
+            return set(indexer.chunks.get(include=[])["ids"])
+
+        def expected(urls) -> set[str]:
+            return {chunk_id(url, view) for url in urls for view in range(3)}
+
+        indexer = reopen("chroma")
+        indexer.index_pages({page["url"]: page for page in pages[:4]})
+        indexer.close()
+
+        # Pages indexed or removed under one backend show up after switching to the other
+        indexer = reopen("numpy")
+        assert chunk_ids(indexer) == expected(p["url"] for p in pages[:4])
+        indexer.index_pages({page["url"]: page for page in pages[4:6]})
+        indexer.remove_pages([pages[0]["url"]])
+        indexer.close()
+
+        indexer = reopen("chroma")
+        assert chunk_ids(indexer) == expected(p["url"] for p in pages[1:6])
+        indexer.index_pages({page["url"]: page for page in pages[6:]})
+        indexer.remove_pages([pages[1]["url"]])
+        indexer.close()
+
+        indexer = reopen("numpy")
+        try:
+            assert chunk_ids(indexer) == expected(p["url"] for p in pages[2:])
+            hits = KBSearch(indexer=indexer).search(pages[7]["title"], top_k=1)
+            assert hits[0]["url"] == pages[7]["url"]
+        finally:
+            indexer.close()
+
+
+@pytest.fixture
+def tool_config(tmp_path, monkeypatch):
+    """Config for calling the KB tools directly, with the stub embedder behind their shared indexer."""
+    asyncio.run(kb_tools.close_resources())
+    monkeypatch.setattr(kb_tools, "_embedder", HashEmbedder())
+    yield ServerConfig(db_path=str(tmp_path / "tool-db"))
+    asyncio.run(kb_tools.close_resources())
+
+
+class TestRemoveTool:
+    def test_urls_are_canonicalized_like_indexed_ones(self, tool_config):
+        pages = [make_page(i) for i in range(4)]
+        kb_tools.get_indexer(tool_config).index_pages({page["url"]: page for page in pages})
+
+        params = kb_tools.MwKbRemoveParams(urls=[
+            pages[0]["url"] + "/",
+            pages[1]["url"] + "?utm_source=newsletter&utm_medium=email",
+            pages[2]["url"].replace("docs.example.com", "Docs.Example.COM"),
+            "https://docs.example.com/never/indexed",
+        ])
+        result = asyncio.run(kb_tools.mw_kb_remove(tool_config, None, params))
+        assert result["removed"] == [page["url"] for page in pages[:3]]
+        assert result["not_found"] == ["https://docs.example.com/never/indexed"]
+        assert kb_tools.get_indexer(tool_config).existing_urls([p["url"] for p in pages]) == {pages[3]["url"]}
+
+        params = kb_tools.MwKbRemoveParams(domain="DOCS.example.com")
+        result = asyncio.run(kb_tools.mw_kb_remove(tool_config, None, params))
+        assert result["removed"] == ["all pages from domain: DOCS.example.com (1 pages)"]
+
+
+class TestRebuild:
+    def test_searches_keep_working_while_collections_are_rebuilt(self, indexer):
+        pages = [make_page(i) for i in range(40)]
+        indexer.index_pages({page["url"]: page for page in pages})
+        search = KBSearch(indexer=indexer)
+        stop = threading.Event()
+        errors, counts = [], []
+
+        def searcher():
+            try:
+                while not stop.is_set():
+                    counts.append(len(search.search("vpn issues", top_k=5)))
+                    indexer.existing_urls([page["url"] for page in pages])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=searcher) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        try:
+            for which in ("chunks", "pages", "chunks"):
+                assert indexer.rebuild_collection(which)["records"] > 0
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        assert not errors and counts and set(counts) == {5}
+        assert indexer.existing_urls([page["url"] for page in pages]) == {page["url"] for page in pages}
+        assert indexer.index_stats()["chunks"]["name"] == "mw_chunks"
@@ -149,7 +149,7 @@ def main():
     print(f"{'═' * 70}")
 
     indexer = KBIndexer()
-    searcher = KBSearch()
+    searcher = KBSearch(indexer)
 
     # Pre-cleanup: remove any leftovers from a previous interrupted run
     leftover = indexer.list_pages(domain=DOMAIN)
@@ -0,0 +1,92 @@
+"""
+Tests of the resources behind the KB tools: the embedding model loads lazily
+(or at start with --warmup), and the index tools and search share one
+KBIndexer. The stub embedder from kb_stubs stands in for the model.
+"""
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+SRC = str(Path(__file__).parent.parent / "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from kb_stubs import HashEmbedder, make_page
+from moveworks_mcp.cli import create_config, parse_args
+from moveworks_mcp.server import MoveworksMCP
+from moveworks_mcp.tools import kb_tools
+
+
+@pytest.fixture
+def model_loads(monkeypatch):
+    """Record every embedding model load; each one returns the stub embedder."""
+    asyncio.run(kb_tools.close_resources())
+    loads = []
+
+    def create_embedding_backend(**options):
+        loads.append(options)
+        return HashEmbedder()
+
+    monkeypatch.setattr(kb_tools, "create_embedding_backend", create_embedding_backend)
+    yield loads
+    asyncio.run(kb_tools.close_resources())
+
+
+def call_tool(server: MoveworksMCP, name: str, arguments: dict) -> dict:
+    return json.loads(asyncio.run(server._call_tool_impl(name, arguments))[0].text)
+
+
+class TestLazyLoading:
+    def test_building_the_server_imports_no_model_or_store_library(self, tmp_path):
+        code = (
+            "import sys\n"
+            f"sys.path.insert(0, {SRC!r})\n"
+            "from moveworks_mcp.server import MoveworksMCP\n"
+            f"MoveworksMCP({{'db_path': {str(tmp_path)!r}}}).start()\n"
+            "heavy = ('sentence_transformers', 'torch', 'onnxruntime', 'chromadb')\n"
+            "print(sorted(name for name in heavy if name in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "[]"
+
+    def test_model_loads_on_the_first_search(self, tmp_path, model_loads):
+        server = MoveworksMCP({"db_path": str(tmp_path / "db")})
+        server.start()
+        assert call_tool(server, "mw_kb_list", {})["total_pages"] == 0
+        assert model_loads == [] and not kb_tools.get_indexer(server.config).embedder_loaded
+
+        call_tool(server, "mw_kb_search", {"query": "vpn"})
+        call_tool(server, "mw_kb_search", {"query": "wifi"})
+        assert len(model_loads) == 1
+
+    def test_warmup_flag_loads_the_model_at_start(self, tmp_path, model_loads, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["moveworks-mcp", "--warmup", "--db-path", str(tmp_path / "db")])
+        server = MoveworksMCP(create_config(parse_args()))
+        server.start()
+        for thread in threading.enumerate():
+            if thread.name == "kb-warmup":
+                thread.join(timeout=30)
+        assert len(model_loads) == 1 and kb_tools.get_indexer(server.config).embedder_loaded
+
+        call_tool(server, "mw_kb_search", {"query": "vpn"})
+        assert len(model_loads) == 1
+
+
+class TestSharedIndexer:
+    def test_index_tools_and_search_read_one_store(self, tmp_path, model_loads):
+        server = MoveworksMCP({"db_path": str(tmp_path / "db")})
+        pages = [make_page(i) for i in range(6)]
+        indexer = kb_tools.get_indexer(server.config)
+        indexer.index_pages({page["url"]: page for page in pages})
+        assert kb_tools.get_searcher(server.config).indexer is indexer
+
+        query = {"query": pages[2]["title"], "top_k": 1}
+        assert call_tool(server, "mw_kb_search", query)["results"][0]["url"] == pages[2]["url"]
+        call_tool(server, "mw_kb_remove", {"urls": [pages[2]["url"]]})
+        assert pages[2]["url"] not in {r["url"] for r in call_tool(server, "mw_kb_search", query)["results"]}
+        assert len(model_loads) == 1
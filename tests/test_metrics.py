@@ -0,0 +1,143 @@
+"""
+Unit tests for the metrics registry, tool-call instrumentation and the
+ServiceNow HTTP client's retries.
+"""
+import io
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_common.metrics import MetricsRegistry, ToolMetrics
+from servicenow_mcp.utils import http_client
+
+
+class TestRegistry:
+    def test_text_exposition(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls", ("tool",))
+        calls.inc(tool='say "hi"')
+        latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, tool="t")
+
+        text = registry.render()
+        assert '# TYPE calls_total counter\ncalls_total{tool="say \\"hi\\""} 1\n' in text
+        assert 'latency_seconds_bucket{tool="t",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{tool="t",le="1"} 2' in text
+        assert 'latency_seconds_bucket{tool="t",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{tool="t"} 3' in text
+        assert registry.counter("calls_total", "Calls", ("tool",)) is calls
+
+    def test_quantiles_interpolate_within_buckets(self):
+        latency = MetricsRegistry().histogram("h", "h", buckets=(1.0, 2.0))
+        for value in (0.5, 1.5, 1.5, 1.5):
+            latency.observe(value)
+        counts = latency.items()[0][1][0]
+        assert latency.quantile(0.5, counts) == pytest.approx(1 + 1 / 3)
+        assert latency.quantile(0.5, [0, 0, 0]) is None
+
+
+class TestToolCalls:
+    def test_errors_and_response_sizes_are_recorded(self):
+        metrics = ToolMetrics("test_mcp")
+        with metrics.track("metrics_test_tool") as call:
+            call.response_bytes = 2048
+        with pytest.raises(RuntimeError):
+            with metrics.track("metrics_test_tool"):
+                raise RuntimeError("boom")
+
+        assert metrics.calls.value(tool="metrics_test_tool", status="error") == 1
+        assert "test_mcp_tool_calls_total{" in metrics.tool_output("prometheus")
+        summary = metrics.summary()["metrics_test_tool"]
+        assert summary["calls"] == 2 and summary["errors"] == 1 and summary["in_flight"] == 0
+        assert summary["mean_response_bytes"] == 2048
+        assert set(summary["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+
+
+class FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.raw = io.BytesIO(b"")
+        return response
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    def install(*outcomes):
+        session = FakeSession(outcomes)
+        monkeypatch.setattr(http_client, "_session", session)
+        monkeypatch.setattr(http_client._settings, "backoff", 0.0)
+        monkeypatch.setattr(http_client._settings, "retries", 2)
+        return session
+
+    return install
+
+
+class TestHttpClient:
+    def test_endpoint_labels_drop_record_ids(self):
+        assert http_client.endpoint_label("https://x.service-now.com/api/now/table/kb_knowledge/0a1b") == "table/kb_knowledge/{id}"
+        assert http_client.endpoint_label("https://x.service-now.com/api/now/table/kb_category?q=1") == "table/kb_category"
+        assert http_client.endpoint_label("https://x.service-now.com/oauth_token.do") == "oauth_token.do"
+
+    def test_idempotent_requests_retry_until_success(self, fake_session):
+        session = fake_session(503, requests.ConnectionError("reset"), 200)
+        url = "https://x.service-now.com/api/now/table/retry_test"
+        retries = http_client.HTTP_RETRIES.value(method="GET", endpoint="table/retry_test")
+
+        assert http_client.get(url).status_code == 200
+        assert session.calls == 3
+        assert http_client.HTTP_RETRIES.value(method="GET", endpoint="table/retry_test") == retries + 2
+        assert http_client.HTTP_REQUESTS.value(method="GET", endpoint="table/retry_test", status="503") >= 1
+
+    def test_writes_and_exhausted_retries_return_the_last_response(self, fake_session):
+        for method in ("POST", "PATCH", "PUT", "DELETE"):
+            session = fake_session(503)
+            assert http_client.request(method, "https://x.service-now.com/api/now/table/kb_knowledge").status_code == 503
+            assert session.calls == 1
+
+        session = fake_session(429, 429, 429)
+        assert http_client.get("https://x.service-now.com/api/now/table/kb_knowledge").status_code == 429
+        assert session.calls == 3
+
+    def test_cookies_are_not_carried_between_requests(self, monkeypatch):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                received.append(self.headers.get("Cookie"))
+                self.send_response(200)
+                self.send_header("Set-Cookie", "JSESSIONID=abc123; Path=/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setattr(http_client, "_session", None)
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/api/now/table/kb_knowledge"
+            assert http_client.get(url).cookies["JSESSIONID"] == "abc123"
+            assert http_client.get(url).status_code == 200
+        finally:
+            http_client.get_session().close()
+            server.shutdown()
+            server.server_close()
+        assert received == [None, None]
+        assert not http_client.get_session().cookies
@@ -0,0 +1,144 @@
+"""
+Unit tests for the opt-in tool-call profiler and the server_profiler tool.
+"""
+import asyncio
+import json
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_common.profiling import PROFILER_TOOL, ToolProfiler
+from moveworks_mcp.kb.dedup import simhash
+from moveworks_mcp.server import MoveworksMCP
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestToolProfiler:
+    def test_samples_worker_threads_and_keeps_newest_files(self, tmp_path):
+        profiler = ToolProfiler("moveworks_mcp", directory=str(tmp_path), rate=1.0, keep=2, interval_ms=1)
+        idle = threading.Event()
+        bystander = threading.Thread(target=idle.wait, name="idle-thread")
+        bystander.start()
+
+        def index_work():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                simhash("lorem ipsum dolor sit amet " * 50)
+
+        for _ in range(3):
+            with profiler.profile("mw_kb_search"):
+                worker = threading.Thread(target=index_work, name="kb-worker")
+                worker.start()
+                worker.join()
+        idle.set()
+        bystander.join()
+
+        files = sorted(tmp_path.glob("mw_kb_search-*.collapsed"))
+        assert len(files) == 2 and profiler.written == 3
+        stacks = files[-1].read_text().splitlines()
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+        assert any(line.startswith("thread kb-worker;") and "simhash (kb/dedup.py" in line for line in stacks)
+        assert not any(line.startswith("thread idle-thread") for line in stacks)
+
+    def test_wrapped_sync_tools_see_only_their_own_thread(self, tmp_path):
+        profiler = ToolProfiler("moveworks_mcp", directory=str(tmp_path), rate=1.0, interval_ms=1)
+        stop = threading.Event()
+
+        def other_session():
+            while not stop.is_set():
+                simhash("lorem ipsum dolor sit amet " * 50)
+
+        def search_work():
+            busy(0.05)
+
+        neighbour = threading.Thread(target=other_session, name="other-session")
+        neighbour.start()
+        try:
+            worker = threading.Thread(target=profiler.wrap("mw_kb_search", search_work), name="tool-worker")
+            worker.start()
+            worker.join()
+        finally:
+            stop.set()
+            neighbour.join()
+
+        (path,) = tmp_path.glob("mw_kb_search-*.collapsed")
+        stacks = path.read_text().splitlines()
+        assert stacks and all(line.startswith("thread tool-worker;") for line in stacks)
+
+    def test_async_profiles_overlapping_other_calls_are_skipped(self, tmp_path):
+        profiler = ToolProfiler("moveworks_mcp", directory=str(tmp_path), rate=1.0, interval_ms=1)
+        profiler.configure(tools=["mw_kb_index_domain"])
+
+        async def call(tool, seconds):
+            with profiler.profile(tool):
+                busy(0.01)
+                await asyncio.sleep(seconds)
+
+        async def run():
+            await asyncio.gather(call("mw_kb_index_domain", 0.05), call("mw_kb_search", 0.01))
+            await call("mw_kb_index_domain", 0.02)
+
+        asyncio.run(run())
+        assert profiler.skipped_overlap == 1 and profiler.written == 1
+        assert profiler.status()["skipped_overlap"] == 1
+
+    def test_cprofile_respects_min_ms_and_tool_filter(self, tmp_path):
+        profiler = ToolProfiler("moveworks_mcp", directory=str(tmp_path), rate=1.0, mode="cprofile", min_ms=20)
+        profiler.configure(tools=["slow_tool"])
+        with profiler.profile("slow_tool"):
+            busy(0.03)
+        with profiler.profile("slow_tool"):
+            pass  # under min_ms
+        with profiler.profile("other_tool"):
+            busy(0.03)
+
+        (path,) = tmp_path.glob("*.pstats")
+        assert path.name.startswith("slow_tool-")
+        assert any(func[2] == "busy" for func in pstats.Stats(str(path)).stats)
+        with pytest.raises(ValueError):
+            profiler.configure(rate=2)
+
+
+class NoParams(BaseModel):
+    pass
+
+
+def slow_tool(config, auth_manager, params: NoParams) -> dict:
+    busy(0.01)
+    return {"ok": True}
+
+
+class TestProfilerTool:
+    def call(self, server, name, **arguments):
+        return json.loads(asyncio.run(server._call_tool_impl(name, arguments))[0].text)
+
+    def test_offered_only_when_configured(self, tmp_path):
+        plain = MoveworksMCP({"db_path": str(tmp_path / "db")})
+        assert PROFILER_TOOL not in [t.name for t in asyncio.run(plain._list_tools_impl())]
+        with pytest.raises(ValueError):
+            asyncio.run(plain._call_tool_impl(PROFILER_TOOL, {}))
+
+        server = MoveworksMCP({"db_path": str(tmp_path / "db"), "profile_dir": str(tmp_path / "profiles")})
+        assert PROFILER_TOOL in [t.name for t in asyncio.run(server._list_tools_impl())]
+        assert self.call(server, PROFILER_TOOL)["enabled"] is False
+        started = self.call(server, PROFILER_TOOL, action="start", mode="cprofile")
+        assert started["enabled"] and started["rate"] == 1.0
+
+        server.tool_definitions["slow_tool"] = (slow_tool, NoParams, dict, "slow", "json_dict")
+        self.call(server, "slow_tool")
+        self.call(server, "server_metrics")  # built-in tools are not profiled
+        status = self.call(server, PROFILER_TOOL, action="stop")
+        assert not status["enabled"]
+        assert [f["file"].split("-")[0] for f in status["recent_files"]] == ["slow_tool"]
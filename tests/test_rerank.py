@@ -0,0 +1,64 @@
+"""
+Unit tests for passage selection, score caching and the latency budget of
+the re-ranking stage.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.rerank import Reranker, best_passage
+
+
+class CountingReranker(Reranker):
+    """Scores a passage by how often it mentions 'switch'; records batch sizes."""
+
+    def __init__(self, delay_s: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.delay_s = delay_s
+        self.batches: list[int] = []
+
+    def score(self, pairs):
+        self.batches.append(len(pairs))
+        time.sleep(self.delay_s)
+        return [float(passage.count("switch")) for _, passage in pairs]
+
+
+class TestBestPassage:
+    def test_short_page_is_returned_whole(self):
+        content = "Navigation: A > B\nTitle: B\n\nshort body"
+        assert best_passage(content, "anything") == content
+
+    def test_picks_window_with_query_terms_and_keeps_header(self):
+        filler = "\n".join(["unrelated filler text " * 10] * 12)
+        content = f"Navigation: A\nTitle: T\n\n{filler}\nthe switch expression picks a case\n{filler}"
+        passage = best_passage(content, "switch expression", max_chars=300)
+
+        assert passage.startswith("Navigation: A\nTitle: T\n\n")
+        assert "switch expression" in passage
+        assert len(passage) <= 300 + len("Navigation: A\nTitle: T\n\n")
+
+
+class TestReranker:
+    def test_scores_in_batches_and_caches(self):
+        reranker = CountingReranker(batch_size=2)
+        passages = ["switch", "none", "switch switch"]
+
+        assert reranker.rerank("q", passages) == [1.0, 0.0, 2.0]
+        assert reranker.batches == [2, 1]
+
+        assert reranker.rerank("q", passages) == [1.0, 0.0, 2.0]
+        assert reranker.batches == [2, 1]
+
+    def test_budget_leaves_remaining_passages_unscored(self):
+        reranker = CountingReranker(delay_s=0.02, batch_size=1)
+        scores = reranker.rerank("q", ["switch"] * 5, budget_ms=10)
+
+        assert scores[0] == 1.0
+        assert scores[1:] == [None] * 4
+
+    def test_cache_is_bounded(self):
+        reranker = CountingReranker(cache_size=2)
+        reranker.rerank("q", ["a", "b", "c"])
+        assert len(reranker._cache) == 2
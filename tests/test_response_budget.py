@@ -0,0 +1,149 @@
+"""
+Unit tests for response budgets and continuation handles.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_common.response_budget import (
+    ContinuationCache,
+    LinkedItems,
+    ResponseBudget,
+    parse_budgets,
+)
+
+RECORDS = {
+    "success": True,
+    "message": "Found 60 records",
+    "records": [{"number": f"INC{i:07d}", "short_description": "Email not syncing " * 5} for i in range(60)],
+}
+ARTICLE = {
+    "success": True,
+    "article": {"id": "kb1", "title": "VPN", "text": "Connect to the VPN — step ünë\n" * 2000},
+}
+
+
+def read_all(budget: ResponseBudget, first: str, key: str) -> tuple[list, int]:
+    """Follow continuation tokens to the end, returning the joined parts and the largest part size."""
+    part = json.loads(first)
+    parts, largest = [part[key]], len(first.encode())
+    while part.get("continuation"):
+        text = budget.fetch(part["continuation"])
+        largest = max(largest, len(text.encode()))
+        part = json.loads(text)
+        parts.append(part[key])
+    return parts, largest
+
+
+class TestRender:
+    def test_small_results_are_untouched(self):
+        budget = ResponseBudget(max_response_bytes=100_000)
+        assert json.loads(budget.render("list_records", RECORDS)) == RECORDS
+        assert len(budget.cache) == 0
+
+    def test_lists_split_at_record_boundaries(self):
+        budget = ResponseBudget(max_response_bytes=2000)
+        first = budget.render("list_records", RECORDS)
+        head = json.loads(first)
+        assert head["truncated"] and head["message"] == RECORDS["message"]
+        assert head["remaining_items"] == 60 - len(head["records"])
+
+        parts, largest = read_all(budget, first, "records")
+        assert largest <= 2000
+        assert [r for part in parts for r in part] == RECORDS["records"]
+        assert len(budget.cache) == 0
+
+    def test_dicts_of_records_split_by_key(self):
+        pages = {f"https://docs/{i}": {"title": str(i), "content": "z" * 300} for i in range(10)}
+        budget = ResponseBudget(max_response_bytes=1000)
+        parts, _ = read_all(budget, budget.render("mw_kb_get_pages", {"pages": pages}), "pages")
+        assert {url: page for part in parts for url, page in part.items()} == pages
+
+    def test_long_text_split_at_line_boundaries(self):
+        budget = ResponseBudget(max_response_bytes=5000)
+        first = budget.render("get_article", ARTICLE)
+        assert json.loads(first)["article"]["text"].endswith("\n")
+
+        part = json.loads(first)
+        text = part["article"]["text"]
+        while part.get("continuation"):
+            part = json.loads(budget.fetch(part["continuation"]))
+            assert part["field"] == "article.text" and len(json.dumps(part, ensure_ascii=False).encode()) <= 5000
+            text += part["text"]
+        assert text == ARTICLE["article"]["text"]
+
+    def test_linked_results_split_by_item_with_their_shared_entries(self):
+        pages = {f"https://docs/{i}": {"content": "z" * 300} for i in range(6)}
+        batch = {
+            "total_queries": 4,
+            "queries": [
+                {"query": f"q{q}", "results": [{"url": f"https://docs/{i}"} for i in (q, q + 1, q + 2)]}
+                for q in range(4)
+            ],
+            "pages": pages,
+        }
+        link = LinkedItems("queries", "pages", lambda query: [hit["url"] for hit in query["results"]])
+        budget = ResponseBudget(max_response_bytes=1500, linked={"mw_kb_search_batch": link})
+
+        part = json.loads(budget.render("mw_kb_search_batch", batch))
+        assert part["truncated"] and part["total_queries"] == 4
+        assert part["remaining_items"] == 4 - len(part["queries"])
+        queries, returned = [], {}
+        while True:
+            referenced = {hit["url"] for query in part["queries"] for hit in query["results"]}
+            # Every hit points at a page returned in this part or an earlier one
+            assert referenced <= set(returned) | set(part["pages"])
+            assert not set(returned) & set(part["pages"])
+            queries += part["queries"]
+            returned.update(part["pages"])
+            if not part.get("continuation"):
+                break
+            part = json.loads(budget.fetch(part["continuation"]))
+        assert queries == batch["queries"] and returned == pages
+
+    def test_per_tool_and_per_call_overrides(self):
+        budget = ResponseBudget(max_response_bytes=2000, budgets={"list_records": 0})
+        assert "continuation" not in json.loads(budget.render("list_records", RECORDS))
+        assert "continuation" in json.loads(budget.render("list_records", RECORDS, 3000))
+        assert "continuation" in json.loads(budget.render("other", RECORDS))
+        assert "continuation" not in json.loads(budget.render("other", RECORDS, 0))
+
+
+class TestContinuationCache:
+    def test_tokens_are_single_use_and_expire(self):
+        budget = ResponseBudget(max_response_bytes=2000, cache=ContinuationCache(ttl_seconds=0))
+        token = json.loads(budget.render("list_records", RECORDS))["continuation"]
+        with pytest.raises(ValueError):
+            budget.fetch(token)
+
+        budget = ResponseBudget(max_response_bytes=2000)
+        token = json.loads(budget.render("list_records", RECORDS))["continuation"]
+        budget.fetch(token)
+        with pytest.raises(ValueError):
+            budget.fetch(token)
+
+    def test_oldest_entries_evicted(self):
+        cache = ContinuationCache(max_entries=2)
+        tokens = [cache.put({"n": i}) for i in range(3)]
+        assert cache.pop(tokens[0]) is None
+        assert cache.pop(tokens[2]) == {"n": 2}
+
+    def test_bounded_by_bytes(self):
+        cache = ContinuationCache(max_bytes=250)
+        tokens = [cache.put({"payload": "x" * 100}) for _ in range(3)]
+        assert cache.pop(tokens[0]) is None and len(cache) == 2 and cache.bytes <= 250
+        assert cache.put({"payload": "x" * 300}) is None
+
+        budget = ResponseBudget(max_response_bytes=2000, cache=ContinuationCache(max_bytes=1000))
+        head = json.loads(budget.render("list_records", RECORDS))
+        assert head["truncated"] and head["continuation"] is None and head["continuation_error"]
+
+
+def test_parse_budgets():
+    assert parse_budgets("list_records=500000, get_article=0,") == {"list_records": 500000, "get_article": 0}
+    with pytest.raises(ValueError):
+        parse_budgets("list_records=lots")
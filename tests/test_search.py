@@ -0,0 +1,68 @@
+"""
+Behaviour tests for KBSearch on a temporary store, with the stub embedder
+from kb_stubs standing in for the sentence-transformers model.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from kb_stubs import TOPICS, HashEmbedder, make_page
+from moveworks_mcp.kb import search as search_module
+from moveworks_mcp.kb.indexer import KBIndexer
+from moveworks_mcp.kb.search import KBSearch
+
+
+@pytest.fixture(scope="module")
+def search(tmp_path_factory):
+    indexer = KBIndexer(embedder=HashEmbedder(), db_path=str(tmp_path_factory.mktemp("db")))
+    pages = [make_page(i) for i in range(48)] + [make_page(i, "help.other.com") for i in range(48, 64)]
+    indexer.index_pages({page["url"]: page for page in pages})
+    yield KBSearch(indexer=indexer)
+    indexer.close()
+
+
+class TestFilters:
+    def test_domain_and_breadcrumb_prefix(self, search):
+        results = search.search("vpn issues", top_k=20, domain="help.other.com")
+        assert results and {r["url"].split("/")[2] for r in results} == {"help.other.com"}
+
+        results = search.search("fix issues", top_k=20, breadcrumb_prefix="help > vpn")
+        assert len(results) == 8
+        assert all(r["breadcrumb"].startswith("Help > Vpn >") for r in results)
+        assert search.search("vpn", breadcrumb_prefix="Help > Nothing") == []
+
+    def test_wide_breadcrumb_filters_match_on_hits_afterwards(self, search, monkeypatch):
+        expected = search.search("fix vpn issues", top_k=10, breadcrumb_prefix="Help > Vpn")
+        monkeypatch.setattr(search_module, "MAX_FILTER_URLS", 2)
+        where, allowed = search._build_where(None, "Help > Vpn", None)
+        assert where == {} and len(allowed) == 8
+        assert search.search("fix vpn issues", top_k=10, breadcrumb_prefix="Help > Vpn") == expected
+
+    def test_view_types(self, search):
+        assert search.search("password", top_k=5, view_types=["title_path"])
+        with pytest.raises(ValueError):
+            search.search("password", view_types=["summary"])
+
+
+class TestSearchMany:
+    def test_matches_one_search_per_query_in_one_store_round(self, search, monkeypatch):
+        queries = [f"fix {topic} issues" for topic in TOPICS[:4]]
+        singles = [search.search(q, top_k=3, domain="docs.example.com") for q in queries]
+
+        encoded = []
+        encode = search.indexer.embedder.encode
+
+        def counting_encode(texts):
+            encoded.append(texts)
+            return encode(texts)
+
+        monkeypatch.setattr(search.indexer.embedder, "encode", counting_encode)
+        batched = search.search_many(queries, top_k=3, domain="docs.example.com")
+        assert batched == singles
+        assert encoded == [queries]
+        assert [results[0]["url"].split("/")[3] for results in batched] == TOPICS[:4]
+        assert search.search_many([]) == []
@@ -0,0 +1,59 @@
+"""
+Unit tests for the rank fusion stage of KBSearch.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.search import KBSearch
+
+VECTOR_HITS = [
+    ("https://example.com/a", "title_path", 0.9),
+    ("https://example.com/b", "title_path", 0.8),
+    ("https://example.com/b", "full_content", 0.7),
+    ("https://example.com/a", "full_content", 0.6),
+]
+LEXICAL_HITS = [("https://example.com/c", 12.0), ("https://example.com/b", 6.0)]
+
+
+def make_search(**kwargs) -> KBSearch:
+    # Fusion never touches the store, so no indexer is needed
+    return KBSearch(indexer=object(), **kwargs)
+
+
+class TestRrfFusion:
+    def test_page_ranked_in_every_list_wins(self):
+        scores = make_search()._fuse_rrf(VECTOR_HITS, LEXICAL_HITS)
+        assert max(scores, key=scores.get) == "https://example.com/b"
+
+    def test_scores_depend_only_on_ranks(self):
+        search = make_search()
+        scaled = [(url, score * 100) for url, score in LEXICAL_HITS]
+        assert search._fuse_rrf(VECTOR_HITS, LEXICAL_HITS) == search._fuse_rrf(VECTOR_HITS, scaled)
+
+    def test_view_weights_shift_vector_contribution(self):
+        search = make_search(view_weights={"title_path": 0.0})
+        scores = search._fuse_rrf(VECTOR_HITS, [])
+        # Only full_content ranks count, where b is ahead of a
+        assert scores["https://example.com/b"] > scores["https://example.com/a"]
+
+
+class TestLinearFusion:
+    def test_blends_best_view_and_scaled_bm25(self):
+        scores = make_search()._fuse_linear(VECTOR_HITS, LEXICAL_HITS)
+        assert scores["https://example.com/a"] == pytest.approx(0.7 * 0.9)
+        assert scores["https://example.com/b"] == pytest.approx(0.7 * 0.8 + 0.3 * 0.5)
+        assert scores["https://example.com/c"] == pytest.approx(0.3)
+
+
+class TestFusionMode:
+    def test_linear_is_the_default(self):
+        assert make_search().fusion == "linear"
+        assert make_search(fusion="rrf").fusion == "rrf"
+
+    def test_unknown_fusion_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            make_search(fusion="borda")
@@ -0,0 +1,48 @@
+"""
+Unit tests for tool output serialization.
+"""
+import json
+import sys
+from pathlib import Path
+
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_common import serialization
+from mcp_common.serialization import serialize_tool_output
+
+RESULT = {"success": True, "records": [{"number": "INC0001", "caller": "Zoë"}], 3: "int key"}
+
+
+class Record(BaseModel):
+    number: str
+    priority: int
+
+
+class TestSerializeToolOutput:
+    def test_compact_round_trips(self):
+        text = serialize_tool_output(RESULT, "t", "compact")
+        assert "\n" not in text and ": " not in text
+        assert json.loads(text) == {**{k: v for k, v in RESULT.items() if k != 3}, "3": "int key"}
+
+    def test_pretty_is_indented(self):
+        assert serialize_tool_output({"a": [1]}, "t", "pretty") == json.dumps({"a": [1]}, indent=2)
+
+    def test_json_strings_pass_through_in_compact_mode(self):
+        raw = '{"a":  1}'
+        assert serialize_tool_output(raw, "t", "compact") is raw
+        assert serialize_tool_output(raw, "t", "pretty") == json.dumps({"a": 1}, indent=2)
+
+    def test_models_and_nested_models(self):
+        assert json.loads(serialize_tool_output(Record(number="INC1", priority=2), "t")) == {
+            "number": "INC1",
+            "priority": 2,
+        }
+        nested = {"record": Record(number="INC1", priority=2)}
+        assert json.loads(serialize_tool_output(nested, "t")) == {"record": {"number": "INC1", "priority": 2}}
+
+    def test_stdlib_fallback_matches_orjson(self, monkeypatch):
+        fast = serialize_tool_output(RESULT, "t", "compact")
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert serialize_tool_output(RESULT, "t", "compact") == fast
@@ -0,0 +1,109 @@
+"""
+End-to-end tests of the ServiceNow tools against the local REST simulator
+in benchmarks/servicenow_sim.py.
+"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from servicenow_mcp.server import ServiceNowMCP
+from servicenow_sim import ServiceNowSimulator, SimulatorConfig
+
+
+@pytest.fixture
+def simulator():
+    sim = ServiceNowSimulator(SimulatorConfig(records=60))
+    server = sim.serve()
+    yield sim
+    server.shutdown()
+    server.server_close()
+
+
+def make_server(monkeypatch, sim, auth="basic", **config):
+    monkeypatch.setenv("MCP_TOOL_PACKAGE", "full")
+    if auth == "oauth":
+        auth_config = {"type": "oauth", "oauth": {
+            "client_id": "sim-client", "client_secret": "sim-secret",
+            "username": "admin", "password": "admin", "token_url": f"{sim.base_url}/oauth_token.do",
+        }}
+    else:
+        auth_config = {"type": "basic", "basic": {"username": "admin", "password": "admin"}}
+    return ServiceNowMCP({"instance_url": sim.base_url, "auth": auth_config, **config})
+
+
+def call(server, name, **arguments):
+    content = asyncio.run(server._call_tool_impl(name, arguments))
+    return json.loads(content[0].text)
+
+
+class TestTableTools:
+    def test_query_fields_and_paging(self, monkeypatch, simulator):
+        server = make_server(monkeypatch, simulator)
+        critical = call(server, "list_records", table_name="incident", query="priority=1", limit=100)
+        assert critical["success"] and critical["count"] > 0
+        assert {r["priority"] for r in critical["records"]} == {"1 - Critical"}
+
+        first = call(server, "list_records", table_name="incident", limit=5, fields=["number", "caller_id"])
+        second = call(server, "list_records", table_name="incident", limit=5, offset=5, fields=["number"])
+        assert set(first["records"][0]) == {"number", "caller_id"}
+        assert first["records"][0]["caller_id"]["display_value"].startswith("User ")
+        assert not {r["number"] for r in first["records"]} & {r["number"] for r in second["records"]}
+
+    def test_get_table_reads_columns(self, monkeypatch, simulator):
+        server = make_server(monkeypatch, simulator)
+        table = call(server, "get_table", table_name="kb_knowledge")["table"]
+        columns = {c["name"]: c for c in table["columns"]}
+        assert "" not in columns  # element!=NULL drops the collection row
+        assert columns["kb_category"]["reference"] == "kb_category"
+
+
+class TestKnowledgeTools:
+    def test_oauth_list_get_and_update(self, monkeypatch, simulator):
+        server = make_server(monkeypatch, simulator, auth="oauth")
+        base_id, base = next(iter(simulator.tables["kb_knowledge_base"].items()))
+        listed = call(server, "list_articles", knowledge_base=base_id, limit=50)
+        expected = sum(1 for a in simulator.tables["kb_knowledge"].values() if a["kb_knowledge_base"] == base_id)
+        assert listed["count"] == min(expected, 50)
+        assert {a["knowledge_base"] for a in listed["articles"]} <= {base["title"]}
+
+        article_id = next(iter(simulator.tables["kb_knowledge"]))
+        assert call(server, "update_article", article_id=article_id, keywords="sim test")["success"]
+        assert call(server, "get_article", article_id=article_id)["article"]["keywords"] == "sim test"
+
+
+class TestFaultInjection:
+    def test_idempotent_calls_retry_then_report_failure(self, monkeypatch, simulator):
+        simulator.config.error_rate = 1.0
+        simulator.config.error_status = 503
+        server = make_server(monkeypatch, simulator, http_retries=2, http_retry_backoff=0)
+        result = call(server, "get_record", table_name="incident", sys_id="missing")
+        assert not result["success"] and "503" in result["message"]
+        assert simulator.stats()["by_status"] == {"503": 3}
+
+
+class TestEventLoop:
+    def test_slow_calls_do_not_block_the_loop(self, monkeypatch, simulator):
+        simulator.config.latency_ms = 300
+        server = make_server(monkeypatch, simulator)
+
+        async def run():
+            largest_gap = 0.0
+            calls = asyncio.gather(
+                *(server._call_tool_impl("list_knowledge_bases", {"limit": 5}) for _ in range(3))
+            )
+            while not calls.done():
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                largest_gap = max(largest_gap, time.perf_counter() - start)
+            return await calls, largest_gap
+
+        results, largest_gap = asyncio.run(run())
+        assert all(json.loads(content[0].text)["success"] for content in results)
+        assert largest_gap < 0.2
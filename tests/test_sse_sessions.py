@@ -0,0 +1,100 @@
+"""
+Tests of the Moveworks SSE session table: the session limit, idle eviction
+and requests in flight, against the app served by uvicorn on localhost.
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.server import MoveworksMCP
+from moveworks_mcp.server_sse import create_starlette_app
+
+
+class NoParams(BaseModel):
+    pass
+
+
+async def slow_tool(config, auth_manager, params: NoParams) -> dict:
+    await asyncio.sleep(1.0)
+    return {"ok": True}
+
+
+async def serve(app) -> tuple[uvicorn.Server, asyncio.Task, str]:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+def run_against_app(tmp_path, scenario, **options):
+    controller = MoveworksMCP({"db_path": str(tmp_path / "db")})
+    controller.tool_definitions["slow_tool"] = (slow_tool, NoParams, dict, "slow", "json_dict")
+    app = create_starlette_app(controller, **options)
+
+    async def run():
+        server, task, url = await serve(app)
+        try:
+            # A session closed under a waiting client would otherwise hang the test
+            return await asyncio.wait_for(scenario(app.state.sessions, url), timeout=15)
+        finally:
+            server.should_exit = True
+            await task
+
+    return asyncio.run(run())
+
+
+class TestSseSessions:
+    def test_limit_and_idle_eviction(self, tmp_path):
+        async def scenario(sessions, url):
+            async with sse_client(f"{url}/sse") as (read, write):
+                async with ClientSession(read, write) as client:
+                    await client.initialize()
+                    assert (await client.list_tools()).tools
+                    async with httpx.AsyncClient() as http:
+                        refused = await http.get(f"{url}/sse")
+                        health = (await http.get(f"{url}/health")).json()
+                    assert refused.status_code == 503 and refused.headers["Retry-After"]
+                    assert health["active_sessions"] == 1 and health["rejected_sessions"] == 1
+
+                    for _ in range(50):
+                        if sessions.evicted_sessions:
+                            break
+                        await asyncio.sleep(0.05)
+            return sessions.stats(), dict(sessions._sessions)
+
+        stats, table = run_against_app(tmp_path, scenario, max_sessions=1, idle_timeout=0.3)
+        assert stats["evicted_sessions"] == 1 and stats["total_sessions"] == 1
+        assert stats["active_sessions"] == 0 and table == {}
+
+    def test_sessions_with_requests_in_flight_are_not_idle(self, tmp_path):
+        async def scenario(sessions, url):
+            async with sse_client(f"{url}/sse") as (read, write):
+                async with ClientSession(read, write) as client:
+                    await client.initialize()
+                    result = await client.call_tool("slow_tool", {})
+                    assert sessions.evicted_sessions == 0
+                    (session,) = sessions._sessions.values()
+                    assert not session.pending
+            return json.loads(result.content[0].text)
+
+        assert run_against_app(tmp_path, scenario, idle_timeout=0.3) == {"ok": True}
+
+    def test_posts_to_unknown_sessions_are_refused(self, tmp_path):
+        async def scenario(sessions, url):
+            async with httpx.AsyncClient() as http:
+                unknown = await http.post(f"{url}/messages/?session_id={'0' * 32}", json={})
+                malformed = await http.post(f"{url}/messages/?session_id=nope", json={})
+            return unknown.status_code, malformed.status_code
+
+        assert run_against_app(tmp_path, scenario) == (404, 404)
@@ -0,0 +1,115 @@
+"""
+Unit tests for tool progress reporting and NDJSON result streaming.
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from pydantic import BaseModel
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_common.streaming import (
+    progress_sink,
+    report_progress,
+    threadsafe_reporter,
+    tool_events,
+    tool_stream_endpoint,
+)
+from moveworks_mcp.server import MoveworksMCP
+from moveworks_mcp.utils.metrics import METRICS
+
+
+def collect(run_tool, name="tool", arguments=None) -> list[dict]:
+    async def run():
+        return [json.loads(line) async for line in tool_events(run_tool, name, arguments or {})]
+
+    return asyncio.run(run())
+
+
+class TestToolEvents:
+    def test_progress_then_items_then_result(self):
+        async def run_tool(name, arguments, progress):
+            with progress_sink(progress):
+                await report_progress(1, 2, "crawled")
+                await report_progress(2, 2, "indexed")
+            return {"status": "success", "total": 3, "results": [{"rank": i} for i in range(3)]}
+
+        events = collect(run_tool)
+        assert [e["event"] for e in events] == ["started", "progress", "progress", "item", "item", "item", "result"]
+        assert events[1] == {"event": "progress", "progress": 1, "total": 2, "message": "crawled"}
+        assert [e["item"]["rank"] for e in events[3:6]] == [0, 1, 2]
+        assert events[-1] == {
+            "event": "result",
+            "result": {"status": "success", "total": 3},
+            "streamed_field": "results",
+            "items": 3,
+        }
+
+    def test_dicts_of_records_stream_with_keys(self):
+        async def run_tool(name, arguments, progress):
+            return json.dumps({"pages": {"u1": {"title": "a"}, "u2": {"title": "b"}}})
+
+        events = collect(run_tool)
+        assert [(e["key"], e["item"]["title"]) for e in events if e["event"] == "item"] == [("u1", "a"), ("u2", "b")]
+
+    def test_unsplittable_results_and_errors(self):
+        async def article(name, arguments, progress):
+            return {"success": True, "article": {"title": "VPN", "text": "..."}}
+
+        assert collect(article)[-1] == {"event": "result", "result": {"success": True, "article": {"title": "VPN", "text": "..."}}}
+
+        async def failing(name, arguments, progress):
+            raise ValueError("Unknown tool: nope")
+
+        assert collect(failing)[-1] == {"event": "error", "message": "Unknown tool: nope"}
+
+
+class EchoParams(BaseModel):
+    count: int
+
+
+def echo(config, auth_manager, params: EchoParams) -> dict:
+    return {"items": list(range(params.count))}
+
+
+class TestStreamEndpoint:
+    def test_streamed_calls_are_counted(self, tmp_path):
+        server = MoveworksMCP({"db_path": str(tmp_path / "db")})
+        server.tool_definitions["stream_echo"] = (echo, EchoParams, dict, "echo", "json_dict")
+        app = Starlette(routes=[
+            Route("/stream/tools/{name}", endpoint=tool_stream_endpoint(server), methods=["POST"]),
+        ])
+        before = METRICS.calls.value(tool="stream_echo", status="ok")
+
+        with TestClient(app) as client:
+            lines = client.post("/stream/tools/stream_echo", json={"count": 3}).text.splitlines()
+            client.post("/stream/tools/no_such_tool", json={})
+        events = [json.loads(line) for line in lines]
+        assert [e["event"] for e in events] == ["started", "item", "item", "item", "result"]
+        assert METRICS.calls.value(tool="stream_echo", status="ok") == before + 1
+        assert METRICS.calls.value(tool="unknown", status="error") >= 1
+
+
+class TestProgress:
+    def test_no_sink_is_a_no_op(self):
+        asyncio.run(report_progress(1, 1))
+
+    def test_reports_from_worker_threads(self):
+        received = []
+
+        async def sink(progress, total, message):
+            received.append((progress, total, message))
+
+        async def run():
+            with progress_sink(sink):
+                report = threadsafe_reporter()
+                await asyncio.to_thread(report, 5, 10, "batch")
+                await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert received == [(5, 10, "batch")]
@@ -0,0 +1,72 @@
+"""
+Unit tests for the precomputed tool lists of both servers.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel, ConfigDict
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.server import MoveworksMCP
+from servicenow_mcp.server import ServiceNowMCP
+
+SERVICENOW_CONFIG = {
+    "instance_url": "https://example.service-now.com",
+    "auth": {"type": "basic", "basic": {"username": "user", "password": "pass"}},
+}
+
+
+class Handle:
+    pass
+
+
+class BrokenParams(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    handle: Handle  # arbitrary types have no JSON schema
+
+
+def list_tools(server):
+    return asyncio.run(server._list_tools_impl())
+
+
+class TestServiceNowToolList:
+    def test_built_once_per_package(self, monkeypatch):
+        monkeypatch.setenv("MCP_TOOL_PACKAGE", "table_explorer")
+        server = ServiceNowMCP(SERVICENOW_CONFIG)
+        first = list_tools(server)
+        assert list_tools(server) is first
+        names = [tool.name for tool in first]
+        assert names[:3] == ["list_tool_packages", "fetch_continuation", "server_metrics"]
+        assert set(names[3:]) == set(server.enabled_tool_names)
+        assert "max_response_bytes" in first[3].inputSchema["properties"]
+
+    def test_validate_tools_builds_at_startup(self, monkeypatch):
+        monkeypatch.setenv("MCP_TOOL_PACKAGE", "full")
+        server = ServiceNowMCP({**SERVICENOW_CONFIG, "validate_tools": True})
+        assert server._tool_list is not None
+        assert list_tools(server) is server._tool_list
+
+    def test_validate_tools_rejects_unknown_package_tools(self, monkeypatch):
+        monkeypatch.setenv("MCP_TOOL_PACKAGE", "full")
+        server = ServiceNowMCP(SERVICENOW_CONFIG)
+        server.enabled_tool_names = server.enabled_tool_names + ["no_such_tool"]
+        with pytest.raises(ValueError, match="no_such_tool"):
+            server._build_tool_list(strict=True)
+
+
+class TestMoveworksToolList:
+    def test_cached_and_strict(self):
+        server = MoveworksMCP({})
+        first = list_tools(server)
+        assert list_tools(server) is first
+        assert len(first) == len(server.tool_definitions) + 2
+
+        name = next(iter(server.tool_definitions))
+        server.tool_definitions[name] = (None, BrokenParams, None, "broken", "json_dict")
+        assert len(server._build_tool_list()) == len(first) - 1
+        with pytest.raises(ValueError, match=name):
+            server._build_tool_list(strict=True)
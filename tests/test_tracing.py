@@ -0,0 +1,50 @@
+"""
+Unit tests for KB stage timings and the no-op span default.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.tracing import collect_timings, span
+
+
+class TestStageTimings:
+    def test_nested_stages_listed_outermost_first(self):
+        with collect_timings() as timings:
+            with span("kb.search", top_k=5):
+                for _ in range(2):
+                    with span("kb.search.lexical"):
+                        pass
+                with span("kb.search.fetch_pages"):
+                    pass
+
+        stages = timings.as_dict()["stages"]
+        assert list(stages) == ["kb.search", "kb.search.lexical", "kb.search.fetch_pages"]
+        assert stages["kb.search.lexical"]["calls"] == 2
+        assert stages["kb.search"]["ms"] >= stages["kb.search.fetch_pages"]["ms"]
+
+    def test_stages_in_worker_threads_are_collected(self):
+        def index():
+            with span("kb.index.embed"):
+                pass
+
+        async def run():
+            with collect_timings() as timings:
+                await asyncio.to_thread(index)
+            return timings
+
+        assert "kb.index.embed" in asyncio.run(run()).as_dict()["stages"]
+
+    def test_disabled_collection_and_spans_are_no_ops(self):
+        with collect_timings(enabled=False) as timings:
+            with span("kb.search"):
+                pass
+        assert timings is None
+
+        with collect_timings() as outer:
+            pass
+        with span("kb.search"):
+            pass
+        assert outer.as_dict()["stages"] == {}
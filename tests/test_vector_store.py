@@ -0,0 +1,126 @@
+"""
+Unit tests for the NumPy exact vector store.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from moveworks_mcp.kb.vector_store import NumpyVectorStore
+
+DIM = 8
+
+
+def make_vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def fill(store: NumpyVectorStore, vectors: np.ndarray):
+    store.upsert(
+        ids=[f"id{i}" for i in range(len(vectors))],
+        embeddings=vectors,
+        metadatas=[{"parity": "even" if i % 2 == 0 else "odd", "i": i} for i in range(len(vectors))],
+    )
+
+
+def exact_top(vectors: np.ndarray, query: np.ndarray, k: int) -> list[str]:
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    return [f"id{i}" for i in np.argsort(-scores)[:k]]
+
+
+class TestQuery:
+    def test_matches_brute_force(self, tmp_path):
+        vectors = make_vectors(200)
+        store = NumpyVectorStore(str(tmp_path), "chunks")
+        fill(store, vectors)
+        found = store.query(query_embeddings=vectors[:2], n_results=10)
+        assert found["ids"][0] == exact_top(vectors, vectors[0], 10)
+        assert found["ids"][1] == exact_top(vectors, vectors[1], 10)
+        assert found["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+
+    def test_where_filters(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path), "chunks")
+        fill(store, make_vectors(50))
+        found = store.query(query_embeddings=make_vectors(1, seed=1), n_results=50, where={"parity": "odd"})
+        assert len(found["ids"][0]) == 25
+        assert all(meta["parity"] == "odd" for meta in found["metadatas"][0])
+
+        where = {"$and": [{"parity": {"$in": ["even"]}}, {"i": {"$in": [2, 3, 4]}}]}
+        found = store.query(query_embeddings=make_vectors(1, seed=1), n_results=10, where=where)
+        assert sorted(found["ids"][0]) == ["id2", "id4"]
+
+
+class TestWrites:
+    def test_upsert_overwrites_in_place(self, tmp_path):
+        vectors = make_vectors(10)
+        store = NumpyVectorStore(str(tmp_path), "chunks")
+        fill(store, vectors)
+        store.upsert(ids=["id3"], embeddings=vectors[7:8])
+        assert store.count() == 10
+        assert store.stats()["rows"] == 10
+        assert store.query(query_embeddings=vectors[7:8], n_results=2)["ids"][0][0] in ("id3", "id7")
+
+    def test_deletes_tombstone_then_compact(self, tmp_path):
+        vectors = make_vectors(100)
+        store = NumpyVectorStore(str(tmp_path), "chunks", compact_ratio=0.5)
+        fill(store, vectors)
+        store.delete([f"id{i}" for i in range(10)] + ["missing"])
+        assert store.count() == 90
+        assert store.stats()["deleted"] == 10
+        assert "id0" not in store.query(query_embeddings=vectors[:1], n_results=90)["ids"][0]
+
+        store.delete([f"id{i}" for i in range(10, 50)])
+        assert store.stats()["rows"] == 50
+        assert store.query(query_embeddings=vectors[60:61], n_results=1)["ids"][0] == ["id60"]
+
+    def test_reopen_keeps_vectors_and_dtype(self, tmp_path):
+        vectors = make_vectors(30)
+        store = NumpyVectorStore(str(tmp_path), "chunks", dtype="float16")
+        fill(store, vectors)
+        store.close()
+
+        store = NumpyVectorStore(str(tmp_path), "chunks")
+        assert store.count() == 30
+        assert store.dtype.name == "float16"
+        assert store.query(query_embeddings=vectors[5:6], n_results=1)["ids"][0] == ["id5"]
+        store.compact()
+        assert store.dtype.name == "float32"
+        assert store.query(query_embeddings=vectors[5:6], n_results=1)["ids"][0] == ["id5"]
+
+
+class TestQuantization:
+    def test_int8_keeps_rank_order(self, tmp_path):
+        vectors = make_vectors(300)
+        store = NumpyVectorStore(str(tmp_path), "chunks", dtype="int8")
+        fill(store, vectors)
+        assert store.bytes_per_vector == DIM + 4
+        for i in (0, 17, 250):
+            found = store.query(query_embeddings=vectors[i:i + 1], n_results=5)["ids"][0]
+            assert found[0] == f"id{i}"
+            assert len(set(found) & set(exact_top(vectors, vectors[i], 5))) >= 4
+
+    def test_dequantized_vectors_are_close(self, tmp_path):
+        vectors = make_vectors(20)
+        store = NumpyVectorStore(str(tmp_path), "chunks", dtype="int8")
+        fill(store, vectors)
+        normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        decoded = store.get(ids=["id3"], include=["embeddings"])["embeddings"][0]
+        assert np.abs(decoded - normed[3]).max() < 0.01
+
+    def test_compact_converts_between_dtypes(self, tmp_path):
+        vectors = make_vectors(40)
+        store = NumpyVectorStore(str(tmp_path), "chunks")
+        fill(store, vectors)
+        store.close()
+
+        store = NumpyVectorStore(str(tmp_path), "chunks", dtype="int8")
+        store.compact()
+        assert store.dtype.name == "int8"
+        assert store.query(query_embeddings=vectors[9:10], n_results=1)["ids"][0] == ["id9"]
+        store.close()
+        store = NumpyVectorStore(str(tmp_path), "chunks", dtype="int8")
+        assert store.query(query_embeddings=vectors[9:10], n_results=1)["ids"][0] == ["id9"]